@@ -0,0 +1,382 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+
+from crm.benchmark.synthetic_data import SyntheticDataGenerator
+from crm.graph_index import KeyIndex
+from crm.graph_loader import GraphLoader
+from crm.graph_relations import RelationBuilder
+from crm.node_query import NodeQuery, TopicNodeQueryService
+from crm.node_table_view import PagedNodeTableView
+from crm.search_index import SearchIndex
+from crm.smartcrm_adapter import SmartCRMAdapter
+from crm.sqlite_db import SQLiteDB
+from crm.version import Version
+from crm.xmi import Model
+from crm.xmi_serializer import ModelSerializer
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    the timings of a benchmark run
+    """
+
+    version: str
+    python: str
+    started: str
+    scale: int
+    seed: int
+    counts: Dict[str, int] = field(default_factory=dict)
+    # seconds by stage and step e.g. fetch/Organization
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def total_secs(self, stage: str) -> float:
+        """
+        get the total seconds of the given stage
+        """
+        return sum(self.stages.get(stage, {}).values())
+
+    def save(self, json_path: str):
+        """
+        save the result as JSON
+        """
+        with open(json_path, "w") as json_file:
+            json.dump(asdict(self), json_file, indent=2)
+
+
+class CrmBenchmark:
+    """
+    times the stages from fetching the SmartCRM records up to
+    rendering a table page on synthetic data of a given scale
+    """
+
+    def __init__(
+        self,
+        generator: SyntheticDataGenerator,
+        work_dir: str,
+        page_size: int = 25,
+    ):
+        """
+        constructor
+
+        Args:
+            generator (SyntheticDataGenerator): the generator of the data to benchmark with
+            work_dir (str): the directory for the generated JSON files and SQLite database
+            page_size (int): the number of rows of a rendered table page
+        """
+        self.generator = generator
+        self.work_dir = work_dir
+        self.page_size = page_size
+        self.topics = SmartCRMAdapter.get_topics()
+        self.db_path = os.path.join(work_dir, "smartcrm.db")
+        self.json_dir = os.path.join(work_dir, "json")
+        self.result = BenchmarkResult(
+            version=Version.version,
+            python=platform.python_version(),
+            started=datetime.now().isoformat(timespec="seconds"),
+            scale=generator.scale,
+            seed=generator.seed,
+        )
+
+    def timed(self, stage: str, step: str, func: Callable, *args) -> Any:
+        """
+        call the given function and record its duration as step of the given stage
+        """
+        start = time.perf_counter()
+        result = func(*args)
+        secs = time.perf_counter() - start
+        self.result.stages.setdefault(stage, {})[step] = secs
+        return result
+
+    def prepare(self):
+        """
+        generate the synthetic data and export it
+        """
+        for topic in self.topics:
+            records = self.timed("generate", topic.name, self.generator.generate, topic)
+            self.result.counts[topic.name] = len(records)
+        self.timed("generate", "json", self.generator.write_json, self.json_dir)
+        self.timed("generate", "sqlite", self.generator.write_sqlite, self.db_path)
+
+    def fetch(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        fetch the records of all topics from the SQLite database and the JSON exports
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: the database records by topic name
+        """
+        db = SQLiteDB(self.db_path)
+        records = {}
+        try:
+            for topic in self.topics:
+                adapter = SmartCRMAdapter(topic=topic)
+                records[topic.name] = self.timed(
+                    "fetch", topic.name, adapter.from_db, db
+                )
+                json_path = os.path.join(self.json_dir, f"{topic.table_name}.json")
+                self.timed("fetch_json", topic.name, adapter.from_json_file, json_path)
+        finally:
+            db.close()
+        return records
+
+    def convert(self, records: Dict[str, List[Dict[str, Any]]]):
+        """
+        convert the fetched records to the dataclass instances
+        record by record and column by column
+        """
+        for topic in self.topics:
+            from_smartcrm = topic.dataclass.from_smartcrm
+            self.timed(
+                "convert",
+                topic.name,
+                lambda lod: [from_smartcrm(record) for record in lod],
+                records[topic.name],
+            )
+            self.timed(
+                "convert_batch",
+                topic.name,
+                topic.dataclass.from_smartcrm_batch,
+                records[topic.name],
+            )
+
+    def build_graph(self, records: Dict[str, List[Dict[str, Any]]]) -> MogwaiGraph:
+        """
+        add the fetched records to a new graph as the GraphLoader does
+        """
+        graph = MogwaiGraph()
+        loader = GraphLoader(graph, db=None)
+        for topic in self.topics:
+
+            def add_records(lod):
+                for record in lod:
+                    loader.upsert_record(topic, record)
+
+            self.timed("graph_build", topic.name, add_records, records[topic.name])
+        return graph
+
+    def load_graph(self) -> MogwaiGraph:
+        """
+        load all topics from the SQLite database with the parallel fetchers
+        and the single graph writer of the GraphLoader
+        """
+        db = SQLiteDB(self.db_path)
+        try:
+            loader = GraphLoader(MogwaiGraph(), db=db)
+            self.timed("graph_load", "parallel", loader.load_topics, self.topics)
+        finally:
+            db.close()
+        return loader.graph
+
+    def build_indices(self, graph: MogwaiGraph) -> Tuple[KeyIndex, SearchIndex]:
+        """
+        build the key index, the relation edges and the search index of the graph
+
+        Returns:
+            Tuple[KeyIndex, SearchIndex]: the key index and the search index of the graph
+        """
+        key_index = KeyIndex({topic.name: topic.key_column for topic in self.topics})
+        self.timed("index_build", "key_index", key_index.rebuild, graph)
+        relation_builder = RelationBuilder(graph, key_index)
+        self.timed("index_build", "relations", relation_builder.build)
+        search_index = SearchIndex()
+        self.timed("index_build", "search_index", search_index.rebuild, graph)
+        return key_index, search_index
+
+    def search(self, search_index: SearchIndex):
+        """
+        query the search index with exact, multi term, prefix, fuzzy and broad
+        queries and add a node to the large index
+        """
+        queries = {
+            "exact": "müller",
+            "terms": "anna müller",
+            "prefix": "schmi",
+            "fuzzy": "schmitd",
+            "broad": SyntheticDataGenerator.WORDS[0],
+        }
+        for name, query in queries.items():
+            self.timed("search", name, search_index.search, query)
+
+        def add_node():
+            search_index.add_node("Person", "benchmark", {"Name": "Zebra"})
+            search_index.flush()
+
+        self.timed("search", "add_node", add_node)
+
+    def render_pages(self, graph: MogwaiGraph, key_index: KeyIndex):
+        """
+        query the SQLite database for the first table page of each topic unsorted,
+        sorted by the key column, filtered by a text and for a page in the middle
+        and convert the rows as the node table does
+        """
+        db = SQLiteDB(self.db_path)
+        query_service = TopicNodeQueryService(graph, db=db, key_index=key_index)
+
+        def render(node_query: NodeQuery):
+            node_page = query_service.query(node_query)
+            rows = [
+                {key: PagedNodeTableView.as_cell(value) for key, value in row.items()}
+                for row in node_page.rows
+            ]
+            return rows
+
+        try:
+            for topic in self.topics:
+                count = self.result.counts.get(topic.name, 0)
+                queries = {
+                    "page": NodeQuery(node_type=topic.name, limit=self.page_size),
+                    "sorted": NodeQuery(
+                        node_type=topic.name,
+                        limit=self.page_size,
+                        sort_by=topic.key_column,
+                        descending=True,
+                    ),
+                    "filtered": NodeQuery(
+                        node_type=topic.name, limit=self.page_size, text="projekt"
+                    ),
+                    "middle": NodeQuery(
+                        node_type=topic.name,
+                        page=max(1, count // self.page_size // 2),
+                        limit=self.page_size,
+                    ),
+                }
+                for name, node_query in queries.items():
+                    self.timed(
+                        "page_render", f"{topic.name}/{name}", render, node_query
+                    )
+        finally:
+            db.close()
+
+    def write_back(self):
+        """
+        write edited contacts back to the SQLite database - a single field
+        of all contacts in place and the complete records as upserts
+        """
+        topic = next(topic for topic in self.topics if topic.name == "Contact")
+        adapter = SmartCRMAdapter(topic=topic)
+        db = SQLiteDB(self.db_path)
+        try:
+            contacts = adapter.from_db(
+                db, converter=topic.dataclass.from_smartcrm_batch
+            )
+            for contact in contacts:
+                contact.responsible = "benchmark"
+            self.timed(
+                "write_back",
+                "Contact/responsible",
+                lambda: adapter.write_db(db, contacts, field_names=["responsible"]),
+            )
+            self.timed("write_back", "Contact/complete", adapter.write_db, db, contacts)
+        finally:
+            db.close()
+
+    def xmi(self):
+        """
+        read a synthetic XMI model with a class per organization, render
+        it as a PlantUML file and serialize it with dataclasses_json
+        and with the precompiled ModelSerializer
+        """
+        json_path = os.path.join(self.work_dir, "model.json")
+        with open(json_path, "w") as json_file:
+            json.dump(self.generator.generate_model(), json_file)
+        model = self.timed("xmi", "from_xmi_json", Model.from_xmi_json, json_path)
+        puml_path = os.path.join(self.work_dir, "model.puml")
+        self.timed("xmi", "plant_uml", model.save_plant_uml, puml_path)
+        self.timed("xmi", "to_json", model.to_json)
+        serializer = ModelSerializer()
+        text = self.timed("xmi", "dumps", serializer.dumps, model)
+        self.timed("xmi", "loads", serializer.loads, text)
+
+    def run(self) -> BenchmarkResult:
+        """
+        run all stages
+
+        Returns:
+            BenchmarkResult: the timings
+        """
+        self.prepare()
+        records = self.fetch()
+        self.convert(records)
+        graph = self.build_graph(records)
+        self.load_graph()
+        key_index, search_index = self.build_indices(graph)
+        self.search(search_index)
+        self.render_pages(graph, key_index)
+        self.xmi()
+        # changes the database - last
+        self.write_back()
+        return self.result
+
+
+def main(argv: list = None):
+    """
+    main call
+    """
+    parser = ArgumentParser(
+        description="benchmark niceSmartCRM on synthetic SmartCRM data"
+    )
+    parser.add_argument(
+        "-s",
+        "--scale",
+        type=int,
+        default=1000,
+        help="number of organizations to generate [default: %(default)s]",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="seed of the random generator [default: %(default)s]",
+    )
+    parser.add_argument(
+        "-bs",
+        "--blob_size",
+        type=int,
+        default=0,
+        help="size of the generated logo, attachment and document values [default: %(default)s]",
+    )
+    parser.add_argument(
+        "-wd",
+        "--work_dir",
+        help="directory for the generated data [default: a temporary directory]",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=f"crm-benchmark-{Version.version}.json",
+        help="JSON file for the results [default: %(default)s]",
+    )
+    args = parser.parse_args(argv)
+    generator = SyntheticDataGenerator(
+        scale=args.scale, seed=args.seed, blob_size=args.blob_size
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        work_dir = args.work_dir or tmp_dir
+        os.makedirs(work_dir, exist_ok=True)
+        benchmark = CrmBenchmark(generator, work_dir)
+        result = benchmark.run()
+    result.save(args.output)
+    for stage in result.stages:
+        print(f"{stage}: {result.total_secs(stage):.3f}s")
+    print(f"results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import json
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from crm.smartcrm_adapter import SmartCRMAdapter, smartCRMTopic
+from crm.sqlite_mirror import SQLiteMirror
+
+
+class SyntheticDataGenerator:
+    """
+    generates reproducible SmartCRM shaped records for all topics
+    and exports them as nested JSON files and as a SQLite database
+    """
+
+    # number of records per organization by topic name
+    RATIOS = {"Organization": 1, "Person": 2, "Contact": 5, "Invoice": 3}
+    # value pools of the low cardinality columns
+    POOLS = {
+        "Land": ["Deutschland", "Österreich", "Schweiz", "Niederlande", "USA"],
+        "Ort": ["Düsseldorf", "Köln", "Berlin", "München", "Hamburg", "Wien", "Zürich"],
+        "Branche": ["IT", "Handel", "Industrie", "Beratung", "Bildung", "Banken"],
+        "ErstelltVon": ["wf", "admin", "import", "sales"],
+        "erstelltVon": ["wf", "admin", "import", "sales"],
+        "DatenHerkunft": ["Messe", "Web", "Empfehlung", "Import"],
+        "art": ["Kunde", "Interessent", "Lieferant", "Partner"],
+        "Art": ["Kunde", "Interessent", "Lieferant", "Partner"],
+        "Kontaktart": ["Telefon", "Email", "Besuch", "Brief"],
+        "Sprache": ["de", "en"],
+        "sex": ["m", "w"],
+        "perDu": ["true", "false"],
+        "Name": ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer"],
+        "Vorname": ["Anna", "Peter", "Maria", "Thomas", "Julia", "Michael"],
+        "Verantwortlicher": ["wf", "admin", "sales"],
+        "zuordnungJahr": ["2022", "2023", "2024", "2025", "2026"],
+        "zuordnungMonat": [f"{month:02d}" for month in range(1, 13)],
+    }
+    WORDS = [
+        "angebot",
+        "rechnung",
+        "projekt",
+        "schulung",
+        "wartung",
+        "lizenz",
+        "termin",
+        "anfrage",
+        "vertrag",
+        "support",
+        "workshop",
+        "migration",
+    ]
+
+    def __init__(
+        self,
+        scale: int = 1000,
+        seed: int = 42,
+        blob_size: int = 0,
+        now: datetime = datetime(2026, 10, 18),
+    ):
+        """
+        constructor
+
+        Args:
+            scale (int): the number of organizations - the other topics are scaled by RATIOS
+            seed (int): the seed of the random generator for reproducible data
+            blob_size (int): the size of the logo, attachment and document values - 0 for None
+            now (datetime): the latest last modified timestamp
+        """
+        self.scale = scale
+        self.seed = seed
+        self.blob_size = blob_size
+        self.now = now
+        self.topics = SmartCRMAdapter.get_topics()
+        self.records: Dict[str, List[Dict[str, Any]]] = {}
+
+    def count(self, topic: smartCRMTopic) -> int:
+        """
+        get the number of records to generate for the given topic
+        """
+        return self.scale * self.RATIOS.get(topic.name, 1)
+
+    @staticmethod
+    def key(topic: smartCRMTopic, index: int) -> str:
+        """
+        get the key column value of the record with the given index
+        """
+        return str(index + 1)
+
+    def random_datetime(self, rng: random.Random, days: int = 3 * 365) -> datetime:
+        """
+        get a random timestamp within the given number of days before now
+        """
+        return self.now - timedelta(seconds=rng.randrange(days * 24 * 3600))
+
+    def random_value(
+        self, rng: random.Random, column: str, column_type: type, index: int
+    ) -> Any:
+        """
+        get a random value for the given column
+        """
+        if column in ("logo", "attachment", "document"):
+            if not self.blob_size:
+                return None
+            return "".join(rng.choices("0123456789abcdef", k=self.blob_size))
+        pool = self.POOLS.get(column)
+        if pool:
+            return rng.choice(pool)
+        if column_type is datetime:
+            return self.random_datetime(rng)
+        if column_type is int:
+            return rng.randrange(1000)
+        if column_type is float:
+            return round(rng.uniform(10, 10000), 2)
+        if column_type is bool:
+            return rng.choice(["true", "false"])
+        return " ".join(rng.choices(self.WORDS, k=3)) + f" {index}"
+
+    def generate(self, topic: smartCRMTopic) -> List[Dict[str, Any]]:
+        """
+        generate the records of the given topic keyed by the SmartCRM columns
+
+        foreign keys refer to existing persons and organizations
+        """
+        records = self.records.get(topic.name)
+        if records is not None:
+            return records
+        # an own generator per topic so that a topic does not depend on the others
+        rng = random.Random(f"{self.seed}-{topic.name}")
+        column_types = SQLiteMirror.column_types(topic)
+        persons = self.scale * self.RATIOS["Person"]
+        records = []
+        for index in range(self.count(topic)):
+            record = {
+                column: self.random_value(rng, column, column_type, index)
+                for column, column_type in column_types.items()
+            }
+            record[topic.key_column] = self.key(topic, index)
+            last_modified = self.random_datetime(rng)
+            record[topic.last_modified_column] = last_modified
+            if "createdAt" in column_types:
+                created_at = last_modified - timedelta(days=rng.randrange(3 * 365))
+                record["createdAt"] = created_at
+            if topic.name == "Person":
+                record["email"] = (
+                    f"{record['Vorname']}.{record['Name']}{index}@example.com".lower()
+                )
+            elif topic.name == "Contact":
+                record["meinePerson_PersonNummer"] = str(rng.randrange(persons) + 1)
+            elif topic.name == "Invoice":
+                record["Auftraggeber_OrganisationNummer"] = str(
+                    rng.randrange(self.scale) + 1
+                )
+                record["brutto"] = round(record["netto"] * 1.19, 2)
+            records.append(record)
+        self.records[topic.name] = records
+        return records
+
+    @staticmethod
+    def to_export_value(value: Any) -> Any:
+        """
+        convert the given value to its export representation - timestamps as ISO text
+        """
+        if isinstance(value, datetime):
+            return value.isoformat(sep=" ")
+        return value
+
+    def write_json(self, json_dir: str) -> Dict[str, str]:
+        """
+        write the records of all topics as nested JSON exports named
+        by the table name as expected by SmartCRMAdapter.from_json_file
+
+        Args:
+            json_dir (str): the directory to write to
+
+        Returns:
+            Dict[str, str]: the path of the JSON file by topic name
+        """
+        os.makedirs(json_dir, exist_ok=True)
+        json_paths = {}
+        for topic in self.topics:
+            manager_name, plural_name, name = topic.node_path.split("/")
+            lod = [
+                {key: self.to_export_value(value) for key, value in record.items()}
+                for record in self.generate(topic)
+            ]
+            export = {manager_name: {plural_name: {name: lod}}}
+            json_path = os.path.join(json_dir, f"{topic.table_name}.json")
+            with open(json_path, "w") as json_file:
+                json.dump(export, json_file)
+            json_paths[topic.name] = json_path
+        return json_paths
+
+    def generate_model(self, class_count: int = None) -> Dict[str, Any]:
+        """
+        generate a UML model in the XMI JSON form xq converts XMI files to
+        with a class per topic and a package of generated classes each
+        having a role to its predecessor
+
+        Args:
+            class_count (int): the number of generated classes - default: the scale
+
+        Returns:
+            Dict[str, Any]: the model as read by Model.from_xmi_dict
+        """
+        if class_count is None:
+            class_count = self.scale
+
+        def element_class(package: str, name: str, columns: List[str]) -> Dict:
+            return {
+                "@name": f"Logical View::{package}::{name}",
+                "@id": f"{package}.{name}",
+                "Documentation": f"the {name} of the {package} package",
+                "attributes": {
+                    "Attribute": [
+                        {
+                            "@name": f"Logical View::{package}::{name}::{column}",
+                            "@id": f"{package}.{name}.{column}",
+                            "@visibility": "private",
+                            "@type": "String",
+                        }
+                        for column in columns
+                    ]
+                },
+            }
+
+        topic_classes = [
+            element_class(
+                "smartCRM",
+                topic.name,
+                list(topic.dataclass.smartcrm_columns.values()),
+            )
+            for topic in self.topics
+        ]
+        generated_classes = []
+        for index in range(class_count):
+            name = f"Class{index}"
+            generated_class = element_class(
+                "generated", name, ["id", "name", "created"]
+            )
+            if index:
+                generated_class["roles"] = {
+                    "Role": {
+                        "@name": f"Logical View::generated::{name}::previous",
+                        "@id": f"generated.{name}.previous",
+                        "@multiplicity": "0..1",
+                        "@type": f"Class{index - 1}",
+                    }
+                }
+            generated_classes.append(generated_class)
+        packages = [
+            {
+                "@name": f"Logical View::{name}",
+                "@id": name,
+                "Documentation": f"the {name} classes",
+                "classes": {"Class": classes},
+            }
+            for name, classes in [
+                ("smartCRM", topic_classes),
+                ("generated", generated_classes),
+            ]
+        ]
+        model = {
+            "Package": {
+                "@name": "Logical View",
+                "@id": "LogicalView",
+                "Documentation": "the synthetic SmartCRM model",
+                "packages": {"Package": packages},
+            }
+        }
+        return model
+
+    def write_sqlite(self, db_path: str):
+        """
+        write the records of all topics to a SQLite database with
+        one table per topic named as in SmartCRM - with the indexes of a SQLiteMirror
+
+        Args:
+            db_path (str): the path of the database file - an existing file is replaced
+        """
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        mirror = SQLiteMirror(db_path, topics=self.topics)
+        connection = sqlite3.connect(db_path)
+        try:
+            for topic in self.topics:
+                columns = list(SQLiteMirror.column_types(topic))
+                mirror.create_table(connection, topic)
+                placeholders = ", ".join("?" for _column in columns)
+                connection.executemany(
+                    f"INSERT INTO {topic.table_name} ({', '.join(columns)}) VALUES ({placeholders})",
+                    (
+                        [self.to_export_value(record[column]) for column in columns]
+                        for record in self.generate(topic)
+                    ),
+                )
+            connection.commit()
+        finally:
+            connection.close()
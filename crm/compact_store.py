@@ -0,0 +1,252 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import sys
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+
+# marks a column a record has no value for
+_MISSING = object()
+
+
+class ColumnTable:
+    """
+    the column names shared by all compact records of a node type
+    and the pool of interned values of the low cardinality columns
+    """
+
+    def __init__(self, node_type: str, intern_columns: Set[str]):
+        """
+        constructor
+
+        Args:
+            node_type (str): the node type of the records
+            intern_columns (Set[str]): the columns whose values are interned
+        """
+        self.node_type = node_type
+        self.intern_columns = intern_columns
+        self.columns: List[str] = []
+        self.positions: Dict[str, int] = {}
+        # the one shared instance of each interned value
+        self.interned: Dict[Any, Any] = {}
+
+    def position(self, column: str) -> int:
+        """
+        get the position of the given column - adding it if it is new
+        """
+        pos = self.positions.get(column)
+        if pos is None:
+            pos = len(self.columns)
+            self.columns.append(column)
+            self.positions[column] = pos
+        return pos
+
+    def intern(self, column: str, value: Any) -> Any:
+        """
+        get the shared instance of the given value if the column is interned
+        """
+        if column in self.intern_columns and isinstance(value, str):
+            value = self.interned.setdefault(value, value)
+        return value
+
+
+class CompactRecord(MutableMapping):
+    """
+    the properties of a node as a slotted list of cells
+    whose column names are kept once per node type in a ColumnTable
+    """
+
+    __slots__ = ("table", "cells")
+
+    def __init__(self, table: ColumnTable, props: Dict[str, Any] = None):
+        self.table = table
+        self.cells: List[Any] = []
+        if props:
+            self.update(props)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        pos = self.table.positions.get(key)
+        if pos is None or pos >= len(self.cells):
+            return default
+        value = self.cells[pos]
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __setitem__(self, key: str, value: Any):
+        pos = self.table.position(key)
+        if pos >= len(self.cells):
+            self.cells.extend([_MISSING] * (pos + 1 - len(self.cells)))
+        self.cells[pos] = self.table.intern(key, value)
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self.cells[self.table.positions[key]] = _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        columns = self.table.columns
+        for pos, value in enumerate(self.cells):
+            if value is not _MISSING:
+                yield columns[pos]
+
+    def __len__(self) -> int:
+        return sum(1 for value in self.cells if value is not _MISSING)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def __reduce__(self):
+        # pickled as a plain dict - compact it again after loading
+        return (dict, (dict(self),))
+
+
+@dataclass
+class TopicMemory:
+    """
+    the memory used by the node properties of a topic
+    """
+
+    topic: str
+    nodes: int = 0
+    record_bytes: int = 0  # the dicts or compact records holding the values
+    value_bytes: int = 0  # the values - shared instances are counted once
+
+    @property
+    def total_bytes(self) -> int:
+        return self.record_bytes + self.value_bytes
+
+
+class CompactStore:
+    """
+    holds the node properties of a graph as CompactRecords
+    with one ColumnTable per node type
+    """
+
+    # columns with few distinct values that are repeated in many records
+    INTERN_COLUMNS = {
+        "Land",
+        "Ort",
+        "Branche",
+        "ErstelltVon",
+        "erstelltVon",
+        "DatenHerkunft",
+    }
+
+    def __init__(self, intern_columns: Set[str] = None):
+        """
+        constructor
+
+        Args:
+            intern_columns (Set[str]): the columns whose values are interned - default: INTERN_COLUMNS
+        """
+        self.intern_columns = (
+            intern_columns if intern_columns is not None else self.INTERN_COLUMNS
+        )
+        self.tables: Dict[str, ColumnTable] = {}
+
+    def table(self, node_type: str) -> ColumnTable:
+        """
+        get the column table of the given node type
+        """
+        table = self.tables.get(node_type)
+        if table is None:
+            table = ColumnTable(node_type, self.intern_columns)
+            self.tables[node_type] = table
+        return table
+
+    def compact_node(self, graph: MogwaiGraph, node_id: Any) -> CompactRecord:
+        """
+        replace the property dict of the given node by a CompactRecord
+
+        networkx keeps the node properties in graph._node - a CompactRecord
+        is a MutableMapping so that graph.nodes[node_id] keeps working
+
+        Args:
+            graph (MogwaiGraph): the graph
+            node_id (Any): the id of the node
+
+        Returns:
+            CompactRecord: the record now holding the node properties
+        """
+        props = graph._node[node_id]
+        if isinstance(props, CompactRecord):
+            return props
+        node_type = props.get(graph.config.label_field)
+        record = CompactRecord(self.table(node_type), props)
+        graph._node[node_id] = record
+        return record
+
+    def compact_graph(self, graph: MogwaiGraph) -> int:
+        """
+        compact all nodes of the given graph
+
+        Returns:
+            int: the number of nodes
+        """
+        for node_id in graph.nodes:
+            self.compact_node(graph, node_id)
+        return len(graph.nodes)
+
+    @staticmethod
+    def memory_report(
+        graph: MogwaiGraph, node_type: Optional[str] = None
+    ) -> Dict[str, TopicMemory]:
+        """
+        get the memory used by the node properties per topic - for
+        plain dicts as well as for compact records
+
+        Args:
+            graph (MogwaiGraph): the graph
+            node_type (str): optional node type to restrict the report to
+
+        Returns:
+            Dict[str, TopicMemory]: the memory usage by node type
+        """
+        report: Dict[str, TopicMemory] = {}
+        seen: Set[int] = set()
+        label_field = graph.config.label_field
+        for _node_id, props in graph.nodes(data=True):
+            topic = props.get(label_field)
+            if node_type is not None and topic != node_type:
+                continue
+            memory = report.get(topic)
+            if memory is None:
+                memory = TopicMemory(topic=topic)
+                report[topic] = memory
+            memory.nodes += 1
+            memory.record_bytes += sys.getsizeof(props)
+            if isinstance(props, CompactRecord):
+                memory.record_bytes += sys.getsizeof(props.cells)
+            for value in props.values():
+                if id(value) not in seen:
+                    seen.add(id(value))
+                    memory.value_bytes += sys.getsizeof(value)
+        return report
+
+    @staticmethod
+    def format_report(report: Dict[str, TopicMemory]) -> str:
+        """
+        get a human readable summary of the given memory report
+        """
+        lines = []
+        for memory in report.values():
+            per_node = memory.total_bytes // memory.nodes if memory.nodes else 0
+            lines.append(
+                f"{memory.topic}: {memory.nodes} nodes {memory.total_bytes/1024/1024:.1f} MB"
+                f" ({per_node} bytes/node)"
+            )
+        return "\n".join(lines)
@@ -29,6 +29,44 @@ class CrmCmd(WebserverCmd):
             default=SmartCRMAdapter.root_path(),
             help="path to example dcm definition files [default: %(default)s]",
         )
+        parser.add_argument(
+            "-pa",
+            "--parallel",
+            type=int,
+            default=4,
+            help="number of SmartCRM topics to load in parallel at startup [default: %(default)s]",
+        )
+        parser.add_argument(
+            "-si",
+            "--sync_interval",
+            type=float,
+            default=60.0,
+            help="seconds between incremental syncs with the SmartCRM database - 0 disables syncing [default: %(default)s]",
+        )
+        parser.add_argument(
+            "-sn",
+            "--snapshot",
+            default=f"{SmartCRMAdapter.root_path()}/crm_graph.snapshot",
+            help="graph snapshot file for a warm start - empty to disable [default: %(default)s]",
+        )
+        parser.add_argument(
+            "-co",
+            "--compact",
+            action="store_true",
+            help="hold the loaded records as compact records with interned values to save memory",
+        )
+        parser.add_argument(
+            "-mi",
+            "--mirror",
+            help="serve the reads from a local SQLite mirror of the SmartCRM database at the given path",
+        )
+        parser.add_argument(
+            "-mf",
+            "--mirror_full",
+            type=int,
+            default=60,
+            help="copy all rows into the mirror on every n-th sync to drop the rows deleted in SmartCRM - 0 disables [default: %(default)s]",
+        )
         return parser
 
 
@@ -4,9 +4,10 @@ Created on 2024-01-12
 @author: wf
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Any, Dict, Optional, TypeVar
+from operator import itemgetter
+from typing import Any, Callable, ClassVar, Dict, Iterable, List, Optional, TypeVar
 
 T = TypeVar("T")
 
@@ -34,7 +35,99 @@ class TypeConverter:
             return 0
 
 
-@dataclass
+class ColumnConverter:
+    """
+    column oriented conversion of SmartCRM records with the
+    same results as the per record TypeConverter calls
+
+    a column of uniformly typed values is converted by mapping the builtin
+    conversion over it - mixed columns fall back to the TypeConverter
+    """
+
+    @staticmethod
+    def to_datetime_column(values: List[Any]) -> List[Optional[datetime]]:
+        """Convert a column of values to datetime objects."""
+        kinds = set(map(type, values))
+        if str not in kinds:
+            # e.g. the database driver already returned datetimes
+            return values
+        if len(kinds) == 1 and "" not in values:
+            return list(map(datetime.fromisoformat, values))
+        return [TypeConverter.to_datetime(value) for value in values]
+
+    @staticmethod
+    def to_int_column(values: List[Any]) -> List[Optional[int]]:
+        """Convert a column of values to integers."""
+        kinds = set(map(type, values))
+        if kinds <= {int, type(None)}:
+            return values
+        if kinds == {str}:
+            try:
+                return list(map(int, values))
+            except ValueError:
+                pass
+        return [TypeConverter.to_int(value) for value in values]
+
+    @staticmethod
+    def to_true_column(values: List[Any]) -> List[bool]:
+        """Convert a column of "true"/"false" strings to booleans."""
+        return [value == "true" for value in values]
+
+    @staticmethod
+    def to_smartcrm_value(value: Any) -> Any:
+        """Convert a field value back to its SmartCRM column value."""
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return value
+
+    @staticmethod
+    def from_rows(cls: type, rows: Iterable[Dict]) -> List[Any]:
+        """
+        convert the given SmartCRM records to instances of the given dataclass
+        by converting each column at once
+
+        Args:
+            cls (type): a dataclass with smartcrm_columns and smartcrm_conversions
+            rows (Iterable[Dict]): the SmartCRM records
+
+        Returns:
+            List[Any]: the dataclass instances
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        if not rows:
+            return []
+        names = [field.name for field in fields(cls)]
+        columns = [cls.smartcrm_columns[name] for name in names]
+        try:
+            # all columns present e.g. in database rows
+            tuples = list(map(itemgetter(*columns), rows))
+        except KeyError:
+            defaults = getattr(cls, "smartcrm_defaults", {})
+            pairs = [
+                (column, defaults.get(name)) for name, column in zip(names, columns)
+            ]
+            tuples = [
+                tuple([row.get(column, default) for column, default in pairs])
+                for row in rows
+            ]
+        converted = {}
+        for index, name in enumerate(names):
+            convert = cls.smartcrm_conversions.get(name)
+            if convert:
+                values = [values[index] for values in tuples]
+                result = convert(values)
+                if result is not values:
+                    converted[index] = result
+        if converted:
+            value_columns = list(zip(*tuples))
+            for index, values in converted.items():
+                value_columns[index] = values
+            tuples = zip(*value_columns)
+        # the values are in field order so the instances can be created positionally
+        return [cls(*values) for values in tuples]
+
+
+@dataclass(slots=True)
 class Organization:
     kind: str
     industry: str
@@ -61,6 +154,48 @@ class Organization:
     website: str
     importance: str
 
+    # SmartCRM column name by field name
+    smartcrm_columns: ClassVar[Dict[str, str]] = {
+        "kind": "art",
+        "industry": "Branche",
+        "created_at": "createdAt",
+        "data_origin": "DatenHerkunft",
+        "created_by": "ErstelltVon",
+        "country": "Land",
+        "last_modified": "lastModified",
+        "logo": "logo",
+        "employee_count": "Mitarbeiterzahl",
+        "organization_number": "OrganisationNummer",
+        "city": "Ort",
+        "postal_code": "PLZ",
+        "po_box": "Postfach",
+        "sales_estimate": "salesEstimate",
+        "sales_rank": "salesRank",
+        "location_name": "Standort",
+        "phone": "Telefon",
+        "revenue": "Umsatz",
+        "revenue_probability": "UmsatzWahrscheinlichkeit",
+        "revenue_potential": "Umsatzpotential",
+        "country_dialing_code": "VorwahlLand",
+        "city_dialing_code": "VorwahlOrt",
+        "website": "Web",
+        "importance": "Wichtigkeit",
+    }
+
+    # column converter by field name for from_smartcrm_batch
+    smartcrm_conversions: ClassVar[Dict[str, Callable]] = {
+        "created_at": ColumnConverter.to_datetime_column,
+        "last_modified": ColumnConverter.to_datetime_column,
+        "employee_count": ColumnConverter.to_int_column,
+        "sales_estimate": ColumnConverter.to_int_column,
+        "sales_rank": ColumnConverter.to_int_column,
+        "revenue": ColumnConverter.to_int_column,
+        "revenue_probability": ColumnConverter.to_int_column,
+        "revenue_potential": ColumnConverter.to_int_column,
+    }
+    # value of a missing column by field name
+    smartcrm_defaults: ClassVar[Dict[str, Any]] = {"logo": ""}
+
     @classmethod
     def from_smartcrm(cls, data: Dict) -> "Organization":
         """Convert SmartCRM data dictionary to Organization instance."""
@@ -93,8 +228,13 @@ class Organization:
             importance=data.get("Wichtigkeit"),
         )
 
+    @classmethod
+    def from_smartcrm_batch(cls, rows: Iterable[Dict]) -> List["Organization"]:
+        """Convert SmartCRM data dictionaries to Organization instances column by column."""
+        return ColumnConverter.from_rows(cls, rows)
+
 
-@dataclass
+@dataclass(slots=True)
 class Person:
     kind: str
     created_at: datetime
@@ -113,6 +253,36 @@ class Person:
     language: str
     subid: int
 
+    # SmartCRM column name by field name
+    smartcrm_columns: ClassVar[Dict[str, str]] = {
+        "kind": "Art",
+        "created_at": "createdAt",
+        "data_origin": "DatenHerkunft",
+        "email": "email",
+        "created_by": "ErstelltVon",
+        "comment": "Kommentar",
+        "last_modified": "lastModified",
+        "name": "Name",
+        "first_name": "Vorname",
+        "personal": "perDu",
+        "person_number": "PersonNummer",
+        "sales_estimate": "salesEstimate",
+        "sales_rank": "salesRank",
+        "gender": "sex",
+        "language": "Sprache",
+        "subid": "subid",
+    }
+
+    # column converter by field name for from_smartcrm_batch
+    smartcrm_conversions: ClassVar[Dict[str, Callable]] = {
+        "created_at": ColumnConverter.to_datetime_column,
+        "last_modified": ColumnConverter.to_datetime_column,
+        "personal": ColumnConverter.to_true_column,
+        "sales_estimate": ColumnConverter.to_int_column,
+        "sales_rank": ColumnConverter.to_int_column,
+        "subid": ColumnConverter.to_int_column,
+    }
+
     @classmethod
     def from_smartcrm(cls, data: Dict) -> "Person":
         """Convert SmartCRM data dictionary to Person instance."""
@@ -135,8 +305,13 @@ class Person:
             subid=TypeConverter.to_int(data.get("subid")),
         )
 
+    @classmethod
+    def from_smartcrm_batch(cls, rows: Iterable[Dict]) -> List["Person"]:
+        """Convert SmartCRM data dictionaries to Person instances column by column."""
+        return ColumnConverter.from_rows(cls, rows)
+
 
-@dataclass
+@dataclass(slots=True)
 class Contact:
     """A CRM contact"""
 
@@ -160,6 +335,32 @@ class Contact:
     followup: Optional[datetime]  # Wiedervorlage
     created_at: Optional[datetime]
 
+    # SmartCRM column name by field name
+    smartcrm_columns: ClassVar[Dict[str, str]] = {
+        "contact_number": "KontaktNummer",
+        "email_id": "eMail_EMailId",
+        "active": "aktiv",
+        "contact_person": "Ansprechpartner",
+        "attachment": "attachment",
+        "date": "Datum",
+        "deleted_at": "deletedAt",
+        "completed": "erledigt",
+        "comment": "Kommentar",
+        "contact_type": "Kontaktart",
+        "last_modified": "lastmodified",
+        "person_number": "meinePerson_PersonNummer",
+        "topic": "Thema",
+        "todo": "todo",
+        "uid": "uid",
+        "responsible": "Verantwortlicher",
+        "action_number": "wgAktion_AktionNummer",
+        "followup": "Wiedervorlage",
+        "created_at": "createdAt",
+    }
+
+    # column converter by field name for from_smartcrm_batch - contacts are taken as is
+    smartcrm_conversions: ClassVar[Dict[str, Callable]] = {}
+
     @classmethod
     def from_smartcrm(cls, data: Dict) -> "Contact":
         """Convert SmartCRM data to Contact instance"""
@@ -185,8 +386,13 @@ class Contact:
             created_at=data.get("createdAt"),
         )
 
+    @classmethod
+    def from_smartcrm_batch(cls, rows: Iterable[Dict]) -> List["Contact"]:
+        """Convert SmartCRM data dictionaries to Contact instances column by column."""
+        return ColumnConverter.from_rows(cls, rows)
+
 
-@dataclass
+@dataclass(slots=True)
 class Invoice:
     invoice_id: str
     organization_number: Optional[str]
@@ -206,6 +412,35 @@ class Invoice:
     payment_statement: Optional[str]
     document: Optional[str]
 
+    # SmartCRM column name by field name
+    smartcrm_columns: ClassVar[Dict[str, str]] = {
+        "invoice_id": "rechnungsID",
+        "organization_number": "Auftraggeber_OrganisationNummer",
+        "comment": "bemerkung",
+        "paid_at": "bezahltAm",
+        "gross_amount": "brutto",
+        "deleted_at": "deletedAt",
+        "created_by": "erstelltVon",
+        "last_modified": "lastmodified",
+        "net_amount": "netto",
+        "invoice_date": "rechnungsdatum",
+        "invoice_number": "rechnungsnummer",
+        "year_assignment": "zuordnungJahr",
+        "month_assignment": "zuordnungMonat",
+        "project_number": "ZuordnungProjekt_ProjektNummer",
+        "division": "zuordnungSparte",
+        "payment_statement": "bezahltAuszug",
+        "document": "document",
+    }
+
+    # column converter by field name for from_smartcrm_batch
+    smartcrm_conversions: ClassVar[Dict[str, Callable]] = {
+        "paid_at": ColumnConverter.to_datetime_column,
+        "deleted_at": ColumnConverter.to_datetime_column,
+        "last_modified": ColumnConverter.to_datetime_column,
+        "invoice_date": ColumnConverter.to_datetime_column,
+    }
+
     @classmethod
     def from_smartcrm(cls, data: Dict) -> "Invoice":
         """Convert SmartCRM data dictionary to Invoice instance."""
@@ -228,3 +463,8 @@ class Invoice:
             payment_statement=data.get("bezahltAuszug"),
             document=data.get("document"),
         )
+
+    @classmethod
+    def from_smartcrm_batch(cls, rows: Iterable[Dict]) -> List["Invoice"]:
+        """Convert SmartCRM data dictionaries to Invoice instances column by column."""
+        return ColumnConverter.from_rows(cls, rows)
@@ -0,0 +1,232 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from crm.crm_core import TypeConverter
+from crm.graph_index import NodeUpdater
+from crm.graph_loader import GraphLoader
+from crm.graph_relations import RelationBuilder
+from crm.smartcrm_adapter import SmartCRMAdapter, smartCRMTopic
+from crm.sqlite_mirror import SQLiteMirror
+
+
+class IncrementalSync:
+    """
+    keeps the graph of a GraphLoader in sync with the SmartCRM database
+    by fetching only the rows modified since the per topic high-water mark
+
+    rows deleted in SmartCRM are not detected by the high-water marks - with a
+    mirror the periodic full refresh drops them and the topics whose number of
+    rows then differs from the number of their nodes are reloaded - without a
+    mirror their nodes stay in the graph until the topic is reloaded e.g. with
+    GraphLoader.reload_topic
+    """
+
+    def __init__(
+        self,
+        loader: GraphLoader,
+        interval: float = 60.0,
+        relations: Optional[RelationBuilder] = None,
+        mirror: Optional[SQLiteMirror] = None,
+        mirror_full_every: int = 0,
+    ):
+        """
+        constructor
+
+        Args:
+            loader (GraphLoader): the loader holding the graph, key lookup and watermarks
+            interval (float): seconds between two background syncs
+            relations (RelationBuilder): optional builder to keep the relation edges up to date
+            mirror (SQLiteMirror): optional mirror the loader reads from - refreshed before each sync
+            mirror_full_every (int): copy all rows into the mirror on every n-th sync
+            to drop the rows deleted in SmartCRM - 0: never
+        """
+        self.loader = loader
+        self.interval = interval
+        self.relations = relations
+        self.mirror = mirror
+        self.mirror_full_every = mirror_full_every
+        self.mirror_refreshes = 0
+        # True if the last refresh of the mirror copied all rows
+        self.mirror_full_refreshed = False
+        self.running = False
+
+    def fetch_changes(self, topic: smartCRMTopic) -> List[Dict]:
+        """
+        fetch the records of the given topic modified since its high-water mark
+
+        Args:
+            topic (smartCRMTopic): the topic to fetch the changes for
+
+        Returns:
+            List[Dict]: the changed raw records
+        """
+        adapter = SmartCRMAdapter(topic=topic)
+        since = self.loader.watermarks.get(topic.name)
+        changes = list(adapter.iter_db(self.loader.db, since=since))
+        return changes
+
+    def is_unchanged(
+        self, topic: smartCRMTopic, record: Dict, watermark: Optional[datetime]
+    ) -> bool:
+        """
+        check whether the given record is a row at the high-water mark that
+        was fetched again without a change - fetch_changes refetches these
+        rows on every sync since rows modified within the same second as
+        the watermark row must not be missed
+        """
+        last_modified = TypeConverter.to_datetime(
+            record.get(topic.last_modified_column)
+        )
+        if watermark is None or last_modified != watermark:
+            return False
+        key = record.get(topic.key_column)
+        node_id = self.loader.key_index.lookup(topic.name, key)
+        if node_id is None:
+            return False
+        changed = NodeUpdater.changed_properties(self.loader.graph, node_id, record)
+        return not changed
+
+    def apply_changes(self, topic: smartCRMTopic, changes: List[Dict]) -> int:
+        """
+        upsert the given changed records into the graph - unchanged rows
+        at the high-water mark are skipped
+
+        Returns:
+            int: the number of records applied
+        """
+        watermark = self.loader.watermarks.get(topic.name)
+        applied = 0
+        for record in changes:
+            if self.is_unchanged(topic, record, watermark):
+                continue
+            node_id = self.loader.upsert_record(topic, record)
+            if self.relations:
+                self.relations.relink(topic.name, node_id)
+            applied += 1
+        return applied
+
+    def refresh_mirror(self) -> Dict[str, int]:
+        """
+        bring the mirror up to date - if the SmartCRM database is unreachable
+        the graph is synced from the mirror as it is
+
+        Returns:
+            Dict[str, int]: the number of copied rows by topic name
+        """
+        if self.mirror is None:
+            return {}
+        self.mirror_refreshes += 1
+        every = self.mirror_full_every
+        full = every > 0 and self.mirror_refreshes % every == 0
+        self.mirror_full_refreshed = False
+        try:
+            counts = self.mirror.refresh(full=full)
+            self.mirror_full_refreshed = full
+            return counts
+        except Exception as ex:
+            self.loader.log.log("❌", "mirror", f"refresh failed: {ex}")
+            return {}
+
+    def row_counts(self) -> Dict[str, int]:
+        """
+        count the rows of the topics of the loader in the database
+
+        Returns:
+            Dict[str, int]: the number of rows by topic name
+        """
+        row_counts = {}
+        for topic in self.loader.topics:
+            query = f"SELECT COUNT(*) AS count FROM {topic.table_name}"
+            row_counts[topic.name] = self.loader.db.execute_query(query)[0]["count"]
+        return row_counts
+
+    def reload_mismatched(self, row_counts: Dict[str, int]) -> List[str]:
+        """
+        reload the topics whose number of nodes differs from the given number
+        of rows e.g. because rows have been deleted
+
+        Args:
+            row_counts (Dict[str, int]): the number of rows by topic name
+
+        Returns:
+            List[str]: the names of the reloaded topics
+        """
+        reloaded = []
+        for topic in list(self.loader.topics):
+            row_count = row_counts.get(topic.name)
+            node_count = len(self.loader.topic_node_ids(topic.name))
+            if row_count is None or row_count == node_count:
+                continue
+            self.loader.log.log(
+                "⚠️",
+                "sync",
+                f"{topic.name}: {node_count} nodes but {row_count} rows - reloading",
+            )
+            self.loader.reload_topic(topic)
+            if self.relations:
+                self.relations.relink_topic(topic.name)
+            reloaded.append(topic.name)
+        return reloaded
+
+    def sync(self) -> Dict[str, int]:
+        """
+        synchronize all topics of the loader
+
+        Returns:
+            Dict[str, int]: the number of changed records by topic name
+        """
+        self.refresh_mirror()
+        counts = {}
+        for topic in self.loader.topics:
+            changes = self.fetch_changes(topic)
+            counts[topic.name] = self.apply_changes(topic, changes)
+        if self.mirror_full_refreshed:
+            self.reload_mismatched(self.row_counts())
+        return counts
+
+    async def async_sync(self) -> Dict[str, int]:
+        """
+        synchronize all topics - the queries run in a worker thread while
+        the graph is updated in the event loop thread that also reads it
+        """
+        await asyncio.to_thread(self.refresh_mirror)
+        counts = {}
+        for topic in self.loader.topics:
+            changes = await asyncio.to_thread(self.fetch_changes, topic)
+            counts[topic.name] = self.apply_changes(topic, changes)
+        if self.mirror_full_refreshed:
+            row_counts = await asyncio.to_thread(self.row_counts)
+            self.reload_mismatched(row_counts)
+        return counts
+
+    async def run(self):
+        """
+        run the sync on a background schedule until stop is called
+        """
+        self.running = True
+        while self.running:
+            await asyncio.sleep(self.interval)
+            if not self.running:
+                break
+            try:
+                counts = await self.async_sync()
+                changed = sum(counts.values())
+                if changed:
+                    self.loader.log.log(
+                        "✅", "sync", f"synced {changed} records {counts}"
+                    )
+            except Exception as ex:
+                self.loader.log.log("❌", "sync", str(ex))
+
+    def stop(self):
+        """
+        stop the background schedule
+        """
+        self.running = False
@@ -5,19 +5,35 @@ Created on 2024-01-10
 """
 
 import os
+from dataclasses import asdict
+from typing import Any, Dict
 
 import i18n
+from fastapi import HTTPException, Response
 from mogwai.core.mogwaigraph import MogwaiGraph, MogwaiGraphConfig
 from mogwai.schema.graph_schema import GraphSchema
-from mogwai.web.node_view import NodeTableView, NodeView, NodeViewConfig
+from mogwai.web.node_view import NodeView, NodeViewConfig
 from ngwidgets.input_webserver import InputWebserver, InputWebSolution
 from basemkit.persistent_log import Log
 from ngwidgets.webserver import WebserverConfig
-from nicegui import Client, ui
+from nicegui import Client, app, background_tasks, ui
 
+from crm.compact_store import CompactStore
+from crm.crm_sync import IncrementalSync
 from crm.db import DB
+from crm.graph_index import KeyIndex
+from crm.graph_loader import GraphLoader
+from crm.graph_relations import RelationBuilder
+from crm.graph_snapshot import GraphSnapshot
 from crm.i18n_config import I18nConfig
+from crm.lazy_columns import LazyColumnLoader
+from crm.node_query import TopicNodeQueryService
+from crm.node_table_view import PagedNodeTableView
+from crm.query_cache import QueryCache
+from crm.search_index import SearchIndex
 from crm.smartcrm_adapter import SmartCRMAdapter
+from crm.sqlite_mirror import SQLiteMirror
+from crm.topic_query import TopicQuery
 from crm.version import Version
 
 
@@ -50,6 +66,7 @@ class CrmSolution(InputWebSolution):
             label = i18n.t(label_i18nkey)
             path = f"/nodes/{node_type_name}"
             self.link_button(label, path, node_type.icon, new_tab=False)
+        self.link_button(i18n.t("search"), "/search", "search", new_tab=False)
 
     async def show_nodes(self, node_type: str):
         """
@@ -70,25 +87,113 @@ class CrmSolution(InputWebSolution):
                 if not config.node_type_config:
                     ui.label(f"{i18n.t('invalid_node_type')}: {node_type}")
                     return
-                node_table_view = NodeTableView(config=config)
+                node_table_view = PagedNodeTableView(
+                    config=config, query_service=self.webserver.node_query_service
+                )
                 node_table_view.setup_ui()
             except Exception as ex:
                 self.handle_exception(ex)
 
         await self.setup_content_div(show)
 
-    async def show_node(self, node_type: str, node_id: str):
+    async def show_search(self):
         """
-        show the given node
+        show the search page
         """
 
         def show():
+            with ui.column().classes("w-full"):
+                search_input = ui.input(label=i18n.t("search")).props(
+                    "clearable debounce=300 autofocus"
+                )
+                status_label = ui.label("")
+                results = ui.column()
+
+            def on_search(event):
+                results.clear()
+                query = event.value or ""
+                if not query.strip():
+                    status_label.text = ""
+                    return
+                result = self.webserver.search_index.search(query, limit=50)
+                status_label.text = f"{result.total} hits for {query}"
+                name_field = self.graph.config.name_field
+                with results:
+                    for hit in result.hits:
+                        node = self.graph.nodes[hit.node_id]
+                        ui.link(
+                            f"{hit.node_type}: {node.get(name_field)}",
+                            f"/node/{hit.node_type}/{hit.node_id}",
+                        )
+
+            search_input.on_value_change(on_search)
+
+        await self.setup_content_div(show)
+
+    def show_related(self, node_id: str):
+        """
+        show links to the nodes related to the given node
+
+        Args:
+            node_id(str): the id of the node
+        """
+        relations = getattr(self.webserver, "relations", None)
+        if not relations or not self.graph.has_node(node_id):
+            return
+        label_field = self.graph.config.label_field
+        name_field = self.graph.config.name_field
+        for relation in relations.relations:
+            related_ids = relations.related(node_id, relation.name)
+            if not related_ids:
+                continue
+            with ui.expansion(f"{relation.name} ({len(related_ids)})"):
+                for related_id in related_ids:
+                    related = self.graph.nodes[related_id]
+                    ui.link(
+                        related.get(name_field),
+                        f"/node/{related.get(label_field)}/{related_id}",
+                    )
+
+    async def show_lazy_columns(self, node_type: str, node_id: str):
+        """
+        show download links for the large columns of the given node
+        which are loaded on demand
+
+        Args:
+            node_type(str): the type of the node
+            node_id(str): the id of the node
+        """
+        lazy_loader = getattr(self.webserver, "lazy_loader", None)
+        topic = lazy_loader.topics.get(node_type) if lazy_loader else None
+        if not topic or not topic.lazy_columns or not self.graph.has_node(node_id):
+            return
+        key = self.graph.nodes[node_id].get(topic.key_column)
+        values = await lazy_loader.aget(node_type, key)
+        for column in topic.lazy_columns:
+            value = values.get(column)
+            if value:
+                ui.link(
+                    f"{column} ({len(value)} bytes)",
+                    f"/api/node/{node_type}/{key}/{column}",
+                )
+
+    async def show_node(self, node_type: str, node_id_or_key: str):
+        """
+        show the given node
+
+        Args:
+            node_type(str): the type of the node
+            node_id_or_key(str): the node id or the value of the key field e.g. an invoice id
+        """
+
+        async def show():
             config = NodeViewConfig(
                 solution=self, graph=self.graph, schema=self.schema, node_type=node_type
             )
             if not config.node_type_config:
                 ui.label(f"{i18n.t('invalid_node_type')}: {node_type}")
                 return
+            node_id = self.webserver.resolve_node_id(node_type, node_id_or_key)
             # default view is the general NodeView
             view_class = NodeView
             # unless there is a specialization configured
@@ -96,7 +201,8 @@ class CrmSolution(InputWebSolution):
                 view_class = config.node_type_config._viewclass
             node_view = view_class(config=config, node_id=node_id)
             node_view.setup_ui()
-            pass
+            await self.show_lazy_columns(node_type, node_id)
+            self.show_related(node_id)
 
         await self.setup_content_div(show)
 
@@ -139,6 +245,120 @@ class CrmWebServer(InputWebserver):
             """
             await self.page(client, CrmSolution.show_node, node_type, node_id)
 
+        @ui.page("/search")
+        async def search(client: Client):
+            """
+            show the search page
+            """
+            await self.page(client, CrmSolution.show_search)
+
+        @app.get("/api/search")
+        def search_api(
+            q: str, node_type: str = None, page: int = 1, limit: int = 20
+        ) -> Dict[str, Any]:
+            """
+            search the organizations, persons and contacts
+            """
+            result = self.search_index.search(
+                q, node_type=node_type, page=page, limit=min(limit, 100)
+            )
+            return asdict(result)
+
+        @app.get("/api/cache/stats")
+        def cache_stats() -> Dict[str, Any]:
+            """
+            get the hit/miss statistics of the query result cache
+            """
+            stats = asdict(self.query_cache.stats)
+            stats["hit_ratio"] = self.query_cache.stats.hit_ratio
+            stats["entries"] = len(self.query_cache.entries)
+            stats["rows"] = self.query_cache.row_count
+            return stats
+
+        @app.post("/api/query/{topic_name}")
+        async def query_topic(topic_name: str, body: Dict[str, Any]) -> Dict[str, Any]:
+            """
+            get a filtered and sorted page of the records of a topic from the database
+            e.g. {"filters": [{"field": "year_assignment", "value": "2024"}], "limit": 50}
+            """
+            topic = self.lazy_loader.topics.get(topic_name)
+            if topic is None:
+                raise HTTPException(status_code=404, detail=f"{topic_name} not found")
+            adapter = SmartCRMAdapter(topic=topic)
+            try:
+                topic_query = TopicQuery.from_dict(body)
+                builder = adapter.query_builder(self.db)
+                sql, params = builder.build(topic_query)
+            except (TypeError, ValueError) as ex:
+                raise HTTPException(status_code=400, detail=str(ex))
+            rows = await self.query_cache.aquery(self.db, sql, params)
+            return {"rows": rows, "after": builder.cursor(topic_query, rows)}
+
+        @app.get("/api/node/{node_type}/{key}")
+        async def get_node(
+            node_type: str, key: str, lazy: bool = False
+        ) -> Dict[str, Any]:
+            """
+            get the properties of the node with the given key field value
+            including the text values of the lazy columns if requested
+            """
+            node_id = self.key_index.lookup(node_type, key)
+            if node_id is None:
+                raise HTTPException(
+                    status_code=404, detail=f"{node_type} {key} not found"
+                )
+            props = self.graph.nodes[node_id]
+            node_dict = {
+                name: value
+                for name, value in props.items()
+                if not name.startswith("_")
+                and name != self.graph.config.label_field
+                and not isinstance(value, bytes)
+            }
+            if lazy:
+                lazy_values = await self.lazy_loader.aget(node_type, key)
+                for name, value in lazy_values.items():
+                    if not isinstance(value, bytes):
+                        node_dict[name] = value
+            node_dict["node_id"] = node_id
+            return node_dict
+
+        @app.get("/api/node/{node_type}/{key}/{column}")
+        async def get_lazy_column(node_type: str, key: str, column: str) -> Response:
+            """
+            download the content of a lazy column e.g. an invoice document
+            """
+            topic = self.lazy_loader.topics.get(node_type)
+            value = None
+            if topic and column in topic.lazy_columns:
+                lazy_values = await self.lazy_loader.aget(node_type, key)
+                value = lazy_values.get(column)
+            if value is None:
+                raise HTTPException(
+                    status_code=404, detail=f"{node_type} {key} {column} not found"
+                )
+            if isinstance(value, str):
+                value = value.encode()
+            return Response(content=value, media_type="application/octet-stream")
+
+    def resolve_node_id(self, node_type: str, node_id_or_key: str) -> Any:
+        """
+        resolve the given node id or key field value to a node id
+
+        Args:
+            node_type(str): the type of the node
+            node_id_or_key(str): the node id or the value of the key field
+
+        Returns:
+            Any: the node id
+        """
+        if self.graph.has_node(node_id_or_key):
+            return node_id_or_key
+        node_id = self.key_index.lookup(node_type, node_id_or_key)
+        if node_id is None:
+            node_id = node_id_or_key
+        return node_id
+
     def configure_run(self):
         """
         configure with args
@@ -152,14 +372,69 @@ class CrmWebServer(InputWebserver):
 
         self.schema = GraphSchema.load(yaml_path=yaml_path)
         self.schema.add_to_graph(self.graph)
-        self.db = DB()
-
-        topics = SmartCRMAdapter.get_topics()
-        for topic in topics:
-            adapter = SmartCRMAdapter(topic=topic)
-            lod = adapter.from_db(self.db)
-            for index, record in enumerate(lod):
-                _node = self.graph.add_labeled_node(
-                    topic.name, name=f"{topic.name}-{index}", properties=record
-                )
-            print(f"loaded {len(lod)} {topic.name} records")
+        self.key_index = KeyIndex.from_schema(self.schema)
+        self.key_index.rebuild(self.graph)
+        parallel = getattr(self.args, "parallel", 4)
+        # each parallel topic load checks out its own connection
+        pooled = True if parallel > 1 else None
+        mirror_path = getattr(self.args, "mirror", None)
+        self.mirror = None
+        if mirror_path:
+            self.mirror = SQLiteMirror(
+                mirror_path, source_factory=lambda: DB(pooled=pooled)
+            )
+            try:
+                counts = self.mirror.refresh()
+                self.log.log("✅", "mirror", f"refreshed {mirror_path} {counts}")
+            except Exception as ex:
+                # start from the mirror as it is while SmartCRM is unreachable
+                self.log.log("❌", "mirror", f"refresh of {mirror_path} failed: {ex}")
+            self.db = self.mirror.open()
+        else:
+            self.db = DB(pooled=pooled)
+        self.store = CompactStore() if getattr(self.args, "compact", False) else None
+        self.query_cache = QueryCache()
+        self.loader = GraphLoader(
+            graph=self.graph,
+            db=self.db,
+            log=self.log,
+            max_workers=parallel,
+            key_index=self.key_index,
+            store=self.store,
+        )
+        # rows of a table changed when its watermark moves on sync
+        self.loader.watermark_listeners.append(self.query_cache.on_watermark)
+        snapshot_path = getattr(self.args, "snapshot", None)
+        self.snapshot = GraphSnapshot(snapshot_path) if snapshot_path else None
+        if not (self.snapshot and self.snapshot.warm_start(self.loader)):
+            self.loader.load_topics()
+        if self.snapshot:
+            self.snapshot.save(self.loader)
+            app.on_shutdown(lambda: self.snapshot.save(self.loader))
+        memory_report = CompactStore.memory_report(self.graph)
+        self.log.log("✅", "memory", CompactStore.format_report(memory_report))
+        self.lazy_loader = LazyColumnLoader(self.db)
+        self.loader.node_listeners.append(self.lazy_loader.on_node_changed)
+        # the cached node table selections are stale once a node changes
+        self.node_query_service = TopicNodeQueryService(
+            self.graph, db=self.db, key_index=self.key_index
+        )
+        self.loader.node_listeners.append(self.node_query_service.invalidate)
+        self.search_index = SearchIndex()
+        self.search_index.rebuild(self.graph)
+        # keep the search index up to date on sync
+        self.loader.node_listeners.append(self.search_index.add_node)
+        self.relations = RelationBuilder(graph=self.graph, key_index=self.key_index)
+        self.relations.build()
+        self.log.log("✅", "relations", self.relations.report())
+        sync_interval = getattr(self.args, "sync_interval", 60.0)
+        self.sync = IncrementalSync(
+            loader=self.loader,
+            interval=sync_interval,
+            relations=self.relations,
+            mirror=self.mirror,
+            mirror_full_every=getattr(self.args, "mirror_full", 60),
+        )
+        if sync_interval > 0:
+            app.on_startup(lambda: background_tasks.create(self.sync.run()))
+            app.on_shutdown(self.sync.stop)
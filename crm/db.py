@@ -5,34 +5,69 @@ Created on 2024-01-13
 @author: wf
 """
 
+import threading
+from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 import pymysql
 import yaml
 
+from crm.db_async import AsyncQueries
+from crm.db_pool import ConnectionPool, PoolConfig
+from crm.db_statements import StatementCache
 
-class DB:
+
+class DB(AsyncQueries):
     """
     Database wrapper for managing direct database connections and executing queries using PyMySQL.
 
+    The queries can be awaited via aquery and astream from the asyncio event loop.
+    Values should be passed as parameters for the %s placeholders - never formatted into the SQL.
+
     Attributes:
         config (Dict[str, Any]): Database configuration details.
-        connection (pymysql.connections.Connection): PyMySQL connection instance.
+        connection (pymysql.connections.Connection): PyMySQL connection instance in single connection mode.
+        pool (ConnectionPool): the connection pool in pooled mode.
+        statements (StatementCache): the checked statements of the hot queries - PyMySQL
+            formats the escaped parameters into the SQL on the client.
     """
 
-    def __init__(self, config_path: str = None):
+    def __init__(self, config_path: str = None, pooled: bool = None):
         """
         Initializes the database connection using provided configuration.
 
         Args:
             config_path (str, optional): Path to the configuration YAML file.
                                          Defaults to '~/.smartcrm/db_config.yaml'.
+            pooled (bool, optional): use a connection pool - defaults to True
+                                     if the configuration has a "pool" section.
         """
         if config_path is None:
             config_path = f"{Path.home()}/.smartcrm/db_config.yaml"
         self.config = self.load_config(config_path)
-        self.connection = self.create_connection()
+        pool_config = self.config.get("pool")
+        if pooled is None:
+            pooled = pool_config is not None
+        self.connection = None
+        self.pool = None
+        # serializes the callers of the single connection
+        self.lock = threading.RLock()
+        self.statements = StatementCache()
+        # the column names by table name
+        self.columns: Dict[str, List[str]] = {}
+        async_config = self.config.get("async", {})
+        self.init_async(
+            max_workers=async_config.get("max_workers", 4),
+            timeout=async_config.get("timeout", 30.0),
+        )
+        if pooled:
+            self.pool = ConnectionPool(
+                self.create_connection, PoolConfig.from_dict(pool_config)
+            )
+        else:
+            self.connection = self.create_connection()
 
     def load_config(self, path: str) -> Dict[str, Any]:
         """
@@ -61,26 +96,213 @@ class DB:
             "db": self.config["name"],
             "charset": "utf8mb4",
             "cursorclass": pymysql.cursors.DictCursor,
+            # connections are reused across callers and must not keep a stale read snapshot
+            "autocommit": True,
         }
         return pymysql.connect(**config)
 
-    def execute_query(self, query: str) -> List[Dict[str, Any]]:
+    @contextmanager
+    def checkout(self) -> Iterator[pymysql.connections.Connection]:
+        """
+        Checks out a healthy connection for exclusive use.
+
+        In pooled mode the connection comes from the pool, otherwise the
+        single connection is handed out one caller at a time and reconnected if it dropped.
+
+        Yields:
+            pymysql.connections.Connection: the connection to use
+        """
+        if self.pool:
+            with self.pool.checkout() as connection:
+                yield connection
+        else:
+            with self.lock:
+                self.connection.ping(reconnect=True)
+                yield self.connection
+
+    def execute_query(
+        self,
+        query: str,
+        params: Any = None,
+        connection: pymysql.connections.Connection = None,
+    ) -> List[Dict[str, Any]]:
         """
         Executes a SQL query and returns the results.
 
         Args:
-            query (str): The SQL query to execute.
+            query (str): The SQL query to execute with optional %s placeholders.
+            params (Any, optional): the values for the placeholders.
+            connection (pymysql.connections.Connection, optional): an already checked out connection.
 
         Returns:
             List[Dict[str, Any]]: The result of the SQL query execution.
+
+        Raises:
+            ValueError: if the number of params does not match the placeholders
         """
-        with self.connection.cursor() as cursor:
-            cursor.execute(query)
+        if connection is None:
+            with self.checkout() as connection:
+                return self.execute_query(query, params, connection=connection)
+        statement = self.statements.prepare(query)
+        statement.check_params(params)
+        with connection.cursor() as cursor:
+            cursor.execute(statement.driver_sql, params)
             return cursor.fetchall()
 
+    def execute_many(
+        self,
+        query: str,
+        params_list: Iterable[Any],
+        connection: pymysql.connections.Connection = None,
+        transaction_size: int = None,
+    ) -> int:
+        """
+        Executes a SQL statement once per parameter set in bulk.
+
+        PyMySQL sends an INSERT ... VALUES statement as multi row inserts
+        of up to max_allowed_packet bytes instead of one roundtrip per row.
+        Each batch of transaction_size parameter sets is committed as a
+        transaction and rolled back on error.
+
+        Args:
+            query (str): The SQL statement with %s placeholders.
+            params_list (Iterable[Any]): the values for the placeholders per execution.
+            connection (pymysql.connections.Connection, optional): an already checked out connection.
+            transaction_size (int, optional): the number of parameter sets per transaction - default: all
+
+        Returns:
+            int: the number of affected rows.
+        """
+        if connection is None:
+            with self.checkout() as connection:
+                return self.execute_many(
+                    query,
+                    params_list,
+                    connection=connection,
+                    transaction_size=transaction_size,
+                )
+        statement = self.statements.prepare(query)
+        params_iter = iter(params_list)
+        count = 0
+        while True:
+            batch = list(islice(params_iter, transaction_size))
+            if not batch:
+                return count
+            for params in batch:
+                statement.check_params(params)
+            connection.begin()
+            try:
+                with connection.cursor() as cursor:
+                    count += cursor.executemany(statement.driver_sql, batch) or 0
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+
+    def execute_transaction(
+        self,
+        statements: Iterable[Tuple[str, Any]],
+        connection: pymysql.connections.Connection = None,
+    ) -> int:
+        """
+        Executes the given statements in a single transaction - rolled back on error.
+
+        Args:
+            statements (Iterable[Tuple[str, Any]]): the SQL statements with %s placeholders and their params
+            connection (pymysql.connections.Connection, optional): an already checked out connection.
+
+        Returns:
+            int: the number of affected rows.
+        """
+        if connection is None:
+            with self.checkout() as connection:
+                return self.execute_transaction(statements, connection=connection)
+        count = 0
+        connection.begin()
+        try:
+            with connection.cursor() as cursor:
+                for query, params in statements:
+                    statement = self.statements.prepare(query)
+                    statement.check_params(params)
+                    count += cursor.execute(statement.driver_sql, params) or 0
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        return count
+
+    def upsert_query(self, table_name: str, columns: List[str], key_column: str) -> str:
+        """
+        get the statement inserting a row or updating the given columns
+        of the row with the same key
+
+        Args:
+            table_name (str): the table
+            columns (List[str]): the columns to write - including the key column
+            key_column (str): the primary key column
+
+        Returns:
+            str: the INSERT ... ON DUPLICATE KEY UPDATE statement with %s placeholders
+        """
+        placeholders = ", ".join(["%s"] * len(columns))
+        updates = [column for column in columns if column != key_column] or [key_column]
+        assignments = ", ".join(f"{column}=VALUES({column})" for column in updates)
+        return (
+            f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+            f" ON DUPLICATE KEY UPDATE {assignments}"
+        )
+
+    def table_columns(self, table_name: str) -> List[str]:
+        """
+        get the column names of the given table - cached per table
+
+        Args:
+            table_name (str): the table
+
+        Returns:
+            List[str]: the column names in the order of the table
+        """
+        columns = self.columns.get(table_name)
+        if columns is None:
+            rows = self.execute_query(f"SHOW COLUMNS FROM {table_name}")
+            columns = [row["Field"] for row in rows]
+            self.columns[table_name] = columns
+        return columns
+
+    def iter_query(
+        self, query: str, batch_size: int = 1000, params: Any = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Executes a SQL query with an unbuffered server side cursor and yields the rows.
+
+        The connection stays checked out until the generator is exhausted or closed
+        so that only one batch of rows is held in client memory at a time.
+
+        Args:
+            query (str): The SQL query to execute with optional %s placeholders.
+            batch_size (int): the number of rows to fetch per roundtrip.
+            params (Any, optional): the values for the placeholders.
+
+        Yields:
+            Dict[str, Any]: the result rows one by one.
+        """
+        statement = self.statements.prepare(query)
+        statement.check_params(params)
+        with self.checkout() as connection:
+            with connection.cursor(pymysql.cursors.SSDictCursor) as cursor:
+                cursor.execute(statement.driver_sql, params)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+
     def close(self):
         """
-        Closes the database connection.
+        Closes the database connection or connection pool.
         """
+        self.shutdown_executor()
+        if self.pool:
+            self.pool.close()
         if self.connection:
             self.connection.close()
@@ -0,0 +1,183 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional
+
+
+class AsyncQueries:
+    """
+    async facade for the blocking query methods of a database class
+
+    the queries run on a bounded thread pool so that a slow query never
+    blocks the asyncio event loop - the database class has to provide
+    iter_query(query, batch_size, params) and call init_async in its constructor
+    """
+
+    def init_async(self, max_workers: int = 4, timeout: Optional[float] = 30.0):
+        """
+        initialize the async facade
+
+        Args:
+            max_workers (int): the maximum number of queries running at the same time
+            timeout (float): the default timeout in seconds - None for no timeout
+        """
+        self.async_max_workers = max_workers
+        self.async_timeout = timeout
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.executor_lock = threading.Lock()
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        """
+        get the executor for the queries - created on first use
+        """
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.async_max_workers, thread_name_prefix="db-query"
+                )
+            return self.executor
+
+    def shutdown_executor(self):
+        """
+        shut down the executor without waiting for running queries
+        """
+        with self.executor_lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+    @staticmethod
+    async def wait(awaitable: Awaitable, timeout: Optional[float]) -> Any:
+        """
+        wait for the given awaitable
+
+        Raises:
+            TimeoutError: the builtin one - asyncio.TimeoutError is a different
+            class before Python 3.11
+        """
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError as ex:
+            raise TimeoutError(f"no result after {timeout} s") from ex
+
+    async def aquery(
+        self,
+        query: str,
+        params: Any = None,
+        timeout: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Executes a SQL query in the executor and returns the results.
+
+        Args:
+            query (str): The SQL query to execute with optional %s placeholders.
+            params (Any, optional): the values for the placeholders.
+            timeout (float, optional): seconds to wait for the result - default: async_timeout
+
+        Returns:
+            List[Dict[str, Any]]: The result of the SQL query execution.
+
+        Raises:
+            TimeoutError: if the result is not available in time - the query
+            then still finishes in its worker but the result is discarded
+        """
+        if timeout is None:
+            timeout = self.async_timeout
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self.get_executor(),
+            lambda: list(self.iter_query(query, params=params)),
+        )
+        return await self.wait(future, timeout)
+
+    async def astream(
+        self,
+        query: str,
+        params: Any = None,
+        batch_size: int = 1000,
+        timeout: Optional[float] = None,
+        queue_size: int = 4,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Executes a SQL query in the executor and yields the rows as they are fetched.
+
+        At most queue_size batches are buffered - a slow consumer pauses the fetch.
+        Leaving the iteration early or cancelling the consuming task stops the
+        fetch after the current batch and releases the connection.
+
+        Args:
+            query (str): The SQL query to execute with optional %s placeholders.
+            params (Any, optional): the values for the placeholders.
+            batch_size (int): the number of rows handed over at once.
+            timeout (float, optional): seconds to wait for each batch - default: async_timeout
+            queue_size (int): the maximum number of batches waiting for the consumer
+
+        Yields:
+            Dict[str, Any]: the result rows one by one.
+
+        Raises:
+            TimeoutError: if a batch is not available in time
+        """
+        if timeout is None:
+            timeout = self.async_timeout
+        loop = asyncio.get_running_loop()
+        batches: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        cancelled = threading.Event()
+
+        def put(item) -> bool:
+            if cancelled.is_set():
+                return False
+            coroutine = batches.put(item)
+            try:
+                future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+            except RuntimeError:
+                # the loop of the consumer is closed already
+                coroutine.close()
+                return False
+            while True:
+                try:
+                    future.result(timeout=0.1)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if cancelled.is_set():
+                        future.cancel()
+                        return False
+
+        def produce():
+            try:
+                rows = self.iter_query(query, batch_size=batch_size, params=params)
+                try:
+                    batch = []
+                    for row in rows:
+                        batch.append(row)
+                        if len(batch) >= batch_size:
+                            if cancelled.is_set() or not put(batch):
+                                return
+                            batch = []
+                    if batch and not put(batch):
+                        return
+                finally:
+                    rows.close()
+                put(None)
+            except Exception as ex:
+                put(ex)
+
+        loop.run_in_executor(self.get_executor(), produce)
+        try:
+            while True:
+                item = await self.wait(batches.get(), timeout)
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                for row in item:
+                    yield row
+        finally:
+            cancelled.set()
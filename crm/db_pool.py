@@ -0,0 +1,239 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pymysql
+
+
+class PoolError(Exception):
+    """
+    raised when a connection can not be checked out of the pool
+    """
+
+
+@dataclass
+class PoolConfig:
+    """
+    configuration of a ConnectionPool
+    """
+
+    min_size: int = 1
+    max_size: int = 8
+    checkout_timeout: float = 30.0  # seconds to wait for a free connection
+    # seconds after which surplus idle connections are closed
+    idle_timeout: float = 300.0
+    ping_on_checkout: bool = True
+    reconnect_attempts: int = 3
+    backoff_base: float = 0.5  # seconds - doubled after each failed attempt
+    backoff_max: float = 8.0
+
+    @classmethod
+    def from_dict(cls, config: Optional[Dict[str, Any]]) -> "PoolConfig":
+        """
+        create a PoolConfig from e.g. the "pool" section of the db_config.yaml
+
+        Args:
+            config (Dict[str, Any]): the pool configuration - unknown keys are ignored
+
+        Returns:
+            PoolConfig: the pool configuration
+        """
+        config = config or {}
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in config.items() if k in known})
+
+
+class ConnectionPool:
+    """
+    a thread safe pool of database connections with
+    health checks on checkout, idle eviction and reconnect with backoff
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        config: PoolConfig = None,
+        broken_exceptions: Tuple[type, ...] = (
+            pymysql.err.OperationalError,
+            pymysql.err.InterfaceError,
+        ),
+    ):
+        """
+        constructor
+
+        Args:
+            connect (Callable): factory for new connections
+            config (PoolConfig): the pool configuration
+            broken_exceptions (Tuple): exceptions after which a connection is discarded
+        """
+        self.connect = connect
+        self.config = config or PoolConfig()
+        self.broken_exceptions = broken_exceptions
+        # idle connections with the monotonic time of their last release
+        self.idle: List[Tuple[Any, float]] = []
+        # number of open connections - idle or checked out
+        self.size = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        for _ in range(self.config.min_size):
+            self.idle.append((self.create_connection(), time.monotonic()))
+            self.size += 1
+
+    def create_connection(self) -> Any:
+        """
+        create a new connection retrying with exponential backoff
+
+        Returns:
+            Any: the new connection
+
+        Raises:
+            Exception: the last connect error if all attempts failed
+        """
+        delay = self.config.backoff_base
+        attempt = 0
+        while True:
+            try:
+                return self.connect()
+            except Exception:
+                attempt += 1
+                if attempt > self.config.reconnect_attempts:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, self.config.backoff_max)
+
+    def is_alive(self, connection: Any) -> bool:
+        """
+        check the health of the given connection
+        """
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def discard(self, connection: Any):
+        """
+        close the given connection ignoring any errors
+        """
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def evict_idle(self):
+        """
+        close idle connections that have not been used for idle_timeout seconds
+        while keeping at least min_size connections open
+
+        must be called with the condition lock held
+        """
+        now = time.monotonic()
+        keep = []
+        # oldest first
+        for connection, last_used in self.idle:
+            expired = now - last_used > self.config.idle_timeout
+            if expired and self.size > self.config.min_size:
+                self.discard(connection)
+                self.size -= 1
+            else:
+                keep.append((connection, last_used))
+        self.idle = keep
+
+    def acquire(self) -> Any:
+        """
+        get a healthy connection from the pool
+
+        Returns:
+            Any: the connection - give it back with release
+
+        Raises:
+            PoolError: if the pool is closed or no connection got free in time
+        """
+        deadline = time.monotonic() + self.config.checkout_timeout
+        connection = None
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise PoolError("connection pool is closed")
+                self.evict_idle()
+                if self.idle:
+                    # most recently used first - it is the least likely to be stale
+                    connection, _last_used = self.idle.pop()
+                    break
+                if self.size < self.config.max_size:
+                    # reserve a slot and connect outside of the lock
+                    self.size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolError(
+                        f"no connection available after {self.config.checkout_timeout}s (max_size={self.config.max_size})"
+                    )
+                self.condition.wait(remaining)
+        try:
+            if connection is None:
+                connection = self.create_connection()
+            elif self.config.ping_on_checkout and not self.is_alive(connection):
+                self.discard(connection)
+                connection = self.create_connection()
+        except Exception:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+        return connection
+
+    def release(self, connection: Any, broken: bool = False):
+        """
+        give the given connection back to the pool
+
+        Args:
+            connection (Any): the connection from acquire
+            broken (bool): if True the connection is closed instead of reused
+        """
+        with self.condition:
+            if broken or self.closed:
+                self.discard(connection)
+                self.size -= 1
+            else:
+                self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    @contextmanager
+    def checkout(self) -> Iterator[Any]:
+        """
+        context manager for a pooled connection
+
+        Yields:
+            Any: a healthy connection
+        """
+        connection = self.acquire()
+        broken = False
+        try:
+            yield connection
+        except self.broken_exceptions:
+            broken = True
+            raise
+        finally:
+            self.release(connection, broken=broken)
+
+    def close(self):
+        """
+        close all idle connections - connections still checked out
+        are closed when they are released
+        """
+        with self.condition:
+            self.closed = True
+            for connection, _last_used in self.idle:
+                self.discard(connection)
+                self.size -= 1
+            self.idle = []
+            self.condition.notify_all()
@@ -0,0 +1,139 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+
+@dataclass(frozen=True)
+class PreparedStatement:
+    """
+    a parameterized SQL statement prepared for repeated execution
+    """
+
+    sql: str  # the statement as given with %s placeholders
+    driver_sql: str  # the statement in the placeholder style of the driver
+    placeholders: int  # the number of positional %s placeholders
+
+    def driver_query(self, params: Any) -> str:
+        """
+        get the statement to pass to the driver for the given parameters -
+        without parameters the SQL is passed unchanged as PyMySQL
+        does not format it then and keeps %% and %s as they are
+        """
+        return self.sql if params is None else self.driver_sql
+
+    def check_params(self, params: Any):
+        """
+        check that the given positional parameters match the placeholders
+
+        Raises:
+            ValueError: if the number of parameters does not match
+        """
+        if params is None or isinstance(params, Mapping):
+            # nothing to interpolate or named %(name)s placeholders
+            return
+        if isinstance(params, (list, tuple)):
+            count = len(params)
+        else:
+            count = 1
+        if count != self.placeholders:
+            raise ValueError(
+                f"{self.placeholders} parameters expected but {count} given for {self.sql}"
+            )
+
+
+class StatementCache:
+    """
+    LRU cache of prepared statements keyed by the SQL text
+
+    hot parameterized queries are only scanned and translated once -
+    the SQL text stays the same for all parameter values so that the
+    statement cache of the driver (e.g. sqlite3) is hit as well
+    """
+
+    # escaped %% and %s placeholders - PyMySQL formats the whole SQL text
+    # with the % operator so that quoted literals are no exception
+    PLACEHOLDER_PATTERN = re.compile(r"%%|%s")
+
+    def __init__(
+        self, max_size: int = 128, translate: Optional[Callable[[str], str]] = None
+    ):
+        """
+        constructor
+
+        Args:
+            max_size (int): the maximum number of cached statements
+            translate (Callable): translation of the SQL to the placeholder style of the driver
+        """
+        self.max_size = max_size
+        self.translate = translate
+        self.statements: OrderedDict[str, PreparedStatement] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def count_placeholders(cls, sql: str) -> int:
+        """
+        count the %s placeholders of the given SQL - escaped %% are skipped
+        """
+        return sum(
+            1 for match in cls.PLACEHOLDER_PATTERN.finditer(sql) if match[0] == "%s"
+        )
+
+    @classmethod
+    def replace_placeholders(cls, sql: str, placeholder: str) -> str:
+        """
+        replace the %s placeholders of the given SQL with the given
+        placeholder and unescape %% to % as PyMySQL does for a statement
+        with parameters
+
+        Args:
+            sql (str): the SQL with %s placeholders
+            placeholder (str): the placeholder of the driver e.g. ?
+
+        Returns:
+            str: the translated SQL
+        """
+
+        def replace(match: re.Match) -> str:
+            return placeholder if match[0] == "%s" else "%"
+
+        return cls.PLACEHOLDER_PATTERN.sub(replace, sql)
+
+    def prepare(self, sql: str) -> PreparedStatement:
+        """
+        get the prepared statement for the given SQL
+
+        Args:
+            sql (str): the SQL with optional %s placeholders
+
+        Returns:
+            PreparedStatement: the cached or newly prepared statement
+        """
+        with self.lock:
+            statement = self.statements.get(sql)
+            if statement is not None:
+                self.statements.move_to_end(sql)
+                self.hits += 1
+                return statement
+            self.misses += 1
+        driver_sql = self.translate(sql) if self.translate else sql
+        statement = PreparedStatement(
+            sql=sql,
+            driver_sql=driver_sql,
+            placeholders=self.count_placeholders(sql),
+        )
+        with self.lock:
+            self.statements[sql] = statement
+            while len(self.statements) > self.max_size:
+                self.statements.popitem(last=False)
+        return statement
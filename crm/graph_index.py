@@ -0,0 +1,217 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from typing import Any, Dict, Hashable, Optional
+
+from mogwai.core.hd_index import Quad
+from mogwai.core.mogwaigraph import MogwaiGraph
+from mogwai.schema.graph_schema import GraphSchema
+
+
+class KeyIndex:
+    """
+    per node type hash index from the value of the key field to the node id
+    """
+
+    def __init__(self, key_columns: Dict[str, str] = None):
+        """
+        constructor
+
+        Args:
+            key_columns (Dict[str, str]): the node property holding the key by node type
+        """
+        self.key_columns = key_columns or {}
+        # node ids by node type and key value
+        self.node_ids: Dict[str, Dict[Any, Any]] = {}
+
+    @classmethod
+    def from_schema(cls, schema: GraphSchema) -> "KeyIndex":
+        """
+        create a KeyIndex for the key fields configured in the given schema
+
+        the key_field of a node type names a field of its dataclass - nodes loaded
+        from SmartCRM carry the raw records so the field is mapped to its column
+
+        Args:
+            schema (GraphSchema): the schema with the node type configurations
+
+        Returns:
+            KeyIndex: the empty index
+        """
+        key_columns = {}
+        for node_type, config in schema.node_type_configs.items():
+            columns = getattr(config._dataclass, "smartcrm_columns", {})
+            key_columns[node_type] = columns.get(config.key_field, config.key_field)
+        return cls(key_columns)
+
+    def key_column(self, node_type: str) -> Optional[str]:
+        """
+        get the name of the node property holding the key of the given node type
+        """
+        return self.key_columns.get(node_type)
+
+    def add(self, node_type: str, node_id: Any, props: Dict[str, Any]):
+        """
+        index the node with the given properties
+
+        Args:
+            node_type (str): the type (label) of the node
+            node_id (Any): the id of the node
+            props (Dict[str, Any]): the node properties
+        """
+        key_column = self.key_columns.get(node_type)
+        if key_column:
+            key = props.get(key_column)
+            if key is not None:
+                self.node_ids.setdefault(node_type, {})[key] = node_id
+
+    def lookup(self, node_type: str, key: Any) -> Optional[Any]:
+        """
+        get the id of the node with the given key
+
+        Args:
+            node_type (str): the type (label) of the node
+            key (Any): the key value e.g. an invoice id
+
+        Returns:
+            Optional[Any]: the node id or None if there is no such node
+        """
+        return self.node_ids.get(node_type, {}).get(key)
+
+    def remove_type(self, node_type: str):
+        """
+        drop all entries of the given node type
+        """
+        self.node_ids.pop(node_type, None)
+
+    def rebuild(self, graph: MogwaiGraph):
+        """
+        rebuild the index from all nodes of the given graph
+        """
+        self.node_ids = {}
+        label_field = graph.config.label_field
+        for node_id, props in graph.nodes(data=True):
+            self.add(props.get(label_field), node_id, props)
+
+
+class NodeUpdater:
+    """
+    updates the properties of graph nodes keeping the SPOG index of the graph consistent
+
+    mogwai only adds quads when a node is added - changing the node dict directly
+    would leave the old values in the index and traversals would find stale nodes
+    """
+
+    GRAPH = "node-property"
+
+    @classmethod
+    def index_value(cls, value: Any) -> Hashable:
+        """
+        get the value as indexed by mogwai
+        """
+        if not isinstance(value, Hashable):
+            value = str(value)
+        return value
+
+    @classmethod
+    def changed_properties(
+        cls, graph: MogwaiGraph, node_id: Any, props: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        get the given properties whose value differs from the one of the given node
+        """
+        node = graph.nodes[node_id]
+        changed = {
+            key: value
+            for key, value in props.items()
+            if key not in node or node[key] != value
+        }
+        return changed
+
+    @classmethod
+    def update_node(
+        cls, graph: MogwaiGraph, node_id: Any, props: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        update the given properties of the given node
+
+        Args:
+            graph (MogwaiGraph): the graph
+            node_id (Any): the id of the node
+            props (Dict[str, Any]): the new property values
+
+        Returns:
+            Dict[str, Any]: the properties whose value changed
+        """
+        node = graph.nodes[node_id]
+        changed = cls.changed_properties(graph, node_id, props)
+        indexed = graph.config.index_config != "off"
+        if indexed:
+            for key in changed:
+                if key in node:
+                    cls.unindex_property(graph, node_id, key, node[key])
+        node.update(changed)
+        if indexed:
+            for key, value in changed.items():
+                quad = Quad(s=node_id, p=key, o=cls.index_value(value), g=cls.GRAPH)
+                graph.spog_index.add_quad(quad)
+        return changed
+
+    @classmethod
+    def unindex_property(cls, graph: MogwaiGraph, node_id: Any, key: str, value: Any):
+        """
+        remove the quad of the given (old) property value of the given node from
+        the SPOG index - a projection is only dropped if no other statement still
+        needs it e.g. PO when no other node has the same value for the property
+
+        Args:
+            graph (MogwaiGraph): the graph
+            node_id (Any): the id of the node
+            key (str): the property name
+            value (Any): the old property value
+        """
+        value = cls.index_value(value)
+        node = graph.nodes[node_id]
+        # the node still states the value via another property e.g. its name
+        node_keeps = any(
+            cls.index_value(other) == value for k, other in node.items() if k != key
+        )
+        subjects = graph.spog_index.get_lookup("O", "S")
+        if subjects is not None:
+            others = subjects.get(value, set()) - {node_id}
+        else:
+            others = {
+                other_id
+                for other_id, other in graph.nodes(data=True)
+                if other_id != node_id
+                and any(cls.index_value(v) == value for v in other.values())
+            }
+        # subjects which are not nodes e.g. edges are assumed to share the statement
+        others_share = any(
+            other_id not in graph.nodes
+            or cls.index_value(graph.nodes[other_id].get(key)) == value
+            for other_id in others
+        )
+        quad = {"S": node_id, "P": key, "O": value, "G": cls.GRAPH}
+        for index_name in graph.spog_index.config.active_indices:
+            positions = set(index_name)
+            if positions == {"S", "O"}:
+                stale = not node_keeps
+            elif positions == {"P", "O"}:
+                stale = not others_share
+            elif positions == {"O", "G"}:
+                stale = not node_keeps and not others
+            else:
+                # the node keeps the property and its graph context
+                stale = False
+            if stale:
+                lookup = graph.spog_index.indices[index_name].lookup
+                from_value = quad[index_name[0]]
+                to_values = lookup.get(from_value)
+                if to_values is not None:
+                    to_values.discard(quad[index_name[1]])
+                    if not to_values:
+                        del lookup[from_value]
@@ -0,0 +1,290 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from basemkit.persistent_log import Log
+from mogwai.core.mogwaigraph import MogwaiGraph
+
+from crm.compact_store import CompactStore
+from crm.crm_core import TypeConverter
+from crm.db import DB
+from crm.graph_index import KeyIndex, NodeUpdater
+from crm.smartcrm_adapter import SmartCRMAdapter, smartCRMTopic
+
+
+@dataclass
+class TopicLoadStats:
+    """
+    statistics of loading a single topic
+    """
+
+    topic: str
+    count: int = 0
+    fetch_secs: float = 0.0  # time until the last row was fetched
+    total_secs: float = 0.0  # time until the last row was added to the graph
+
+
+class GraphLoader:
+    """
+    loads the SmartCRM topics into a MogwaiGraph
+
+    the topics are fetched concurrently from a thread pool - each fetch
+    checks out its own connection - while all graph insertions happen
+    in the calling thread so that the graph has a single writer
+    """
+
+    def __init__(
+        self,
+        graph: MogwaiGraph,
+        db: DB,
+        log: Log = None,
+        max_workers: int = 4,
+        batch_size: int = 1000,
+        queue_size: int = 16,
+        key_index: KeyIndex = None,
+        store: CompactStore = None,
+        json_root: str = None,
+    ):
+        """
+        constructor
+
+        Args:
+            graph (MogwaiGraph): the graph to load into
+            db (DB): the database to load from - should be pooled for parallel loading
+            log (Log): the log for timing and error messages
+            max_workers (int): the number of topics to fetch in parallel
+            batch_size (int): the number of records handed from a fetcher to the writer at once
+            queue_size (int): the maximum number of batches waiting for the writer
+            key_index (KeyIndex): the key index to maintain - default: by the key columns of the topics
+            store (CompactStore): if set the node properties are held as compact records
+            json_root (str): if set the topics are streamed from the JSON exports in this directory instead of the db
+        """
+        self.graph = graph
+        self.db = db
+        self.log = log or Log()
+        self.max_workers = max(1, max_workers)
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.topics: List[smartCRMTopic] = []
+        self.stats: Dict[str, TopicLoadStats] = {}
+        if key_index is None:
+            key_index = KeyIndex(
+                {topic.name: topic.key_column for topic in SmartCRMAdapter.get_topics()}
+            )
+        self.key_index = key_index
+        self.store = store
+        self.json_root = json_root
+        # called with (node_type, node_id, props) after each upsert
+        self.node_listeners: List[Callable[[str, Any, Dict], None]] = []
+        # called with (table_name, watermark) when the watermark of a topic moves
+        self.watermark_listeners: List[Callable[[str, datetime], None]] = []
+        # number of nodes created by topic name - used for node names
+        self.node_counts: Dict[str, int] = {}
+        # highest last modified timestamp seen by topic name
+        self.watermarks: Dict[str, datetime] = {}
+
+    def put(self, batches: queue.Queue, item: tuple, cancel: threading.Event) -> bool:
+        """
+        put the given item into the queue waiting for free space unless the load is cancelled
+
+        Returns:
+            bool: False if the load was cancelled
+        """
+        while not cancel.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def fetch_topic(
+        self,
+        topic: smartCRMTopic,
+        batches: queue.Queue,
+        start: float,
+        cancel: threading.Event = None,
+    ):
+        """
+        fetch the records of the given topic and put them in batches into the queue
+
+        an end marker (topic, None) or an error (topic, Exception) is always put last -
+        unless the load is cancelled which stops the fetch
+        """
+        if cancel is None:
+            cancel = threading.Event()
+        stats = self.stats[topic.name]
+        try:
+            adapter = SmartCRMAdapter(topic=topic)
+            batch = []
+            if self.json_root:
+                records = adapter.iter_json_file(adapter.json_path(self.json_root))
+            else:
+                records = adapter.iter_db(self.db, batch_size=self.batch_size)
+            for record in records:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    if not self.put(batches, (topic, batch), cancel):
+                        return
+                    batch = []
+            if batch and not self.put(batches, (topic, batch), cancel):
+                return
+            stats.fetch_secs = time.time() - start
+            self.put(batches, (topic, None), cancel)
+        except Exception as ex:
+            self.put(batches, (topic, ex), cancel)
+
+    def add_record(self, topic: smartCRMTopic, record: Dict):
+        """
+        add a single record of the given topic to the graph
+        """
+        stats = self.stats[topic.name]
+        self.upsert_record(topic, record)
+        stats.count += 1
+
+    def upsert_record(self, topic: smartCRMTopic, record: Dict) -> Any:
+        """
+        add the given record to the graph or update the node
+        with the same key column value found via the key index
+
+        Args:
+            topic (smartCRMTopic): the topic of the record
+            record (Dict): the raw SmartCRM record
+
+        Returns:
+            Any: the node id
+        """
+        key = record.get(topic.key_column)
+        node_id = self.key_index.lookup(topic.name, key) if key is not None else None
+        if node_id is not None:
+            NodeUpdater.update_node(self.graph, node_id, record)
+        else:
+            index = self.node_counts.get(topic.name, 0)
+            self.node_counts[topic.name] = index + 1
+            node_id = self.graph.add_labeled_node(
+                topic.name, name=f"{topic.name}-{index}", properties=record
+            )
+            if self.store is not None:
+                self.store.compact_node(self.graph, node_id)
+            self.key_index.add(topic.name, node_id, record)
+        self.update_watermark(topic, record)
+        for listener in self.node_listeners:
+            listener(topic.name, node_id, self.graph.nodes[node_id])
+        return node_id
+
+    def update_watermark(self, topic: smartCRMTopic, record: Dict):
+        """
+        raise the high-water mark of the given topic to the last modified timestamp of the record
+        """
+        last_modified = TypeConverter.to_datetime(
+            record.get(topic.last_modified_column)
+        )
+        if last_modified is not None:
+            watermark = self.watermarks.get(topic.name)
+            if watermark is None or last_modified > watermark:
+                self.watermarks[topic.name] = last_modified
+                for listener in self.watermark_listeners:
+                    listener(topic.table_name, last_modified)
+
+    def load_topics(
+        self, topics: Optional[List[smartCRMTopic]] = None
+    ) -> Dict[str, TopicLoadStats]:
+        """
+        load the given topics into the graph
+
+        Args:
+            topics (List[smartCRMTopic]): the topics to load - default: all SmartCRM topics
+
+        Returns:
+            Dict[str, TopicLoadStats]: the load statistics by topic name
+
+        Raises:
+            Exception: the first fetch error after all other topics have been loaded
+        """
+        if topics is None:
+            topics = SmartCRMAdapter.get_topics()
+        known = {topic.name for topic in self.topics}
+        self.topics.extend(topic for topic in topics if topic.name not in known)
+        for topic in topics:
+            self.stats[topic.name] = TopicLoadStats(topic=topic.name)
+        batches = queue.Queue(maxsize=self.queue_size)
+        cancel = threading.Event()
+        errors = []
+        start = time.time()
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="topic-loader"
+        ) as executor:
+            futures = [
+                executor.submit(self.fetch_topic, topic, batches, start, cancel)
+                for topic in topics
+            ]
+            try:
+                pending = len(topics)
+                while pending > 0:
+                    topic, batch = batches.get()
+                    stats = self.stats[topic.name]
+                    if isinstance(batch, Exception):
+                        pending -= 1
+                        errors.append(batch)
+                        self.log.log("❌", "load", f"{topic.name}: {str(batch)}")
+                    elif batch is None:
+                        pending -= 1
+                        stats.total_secs = time.time() - start
+                        self.log.log(
+                            "✅",
+                            "load",
+                            f"loaded {stats.count} {topic.name} records (fetch {stats.fetch_secs:.2f}s, total {stats.total_secs:.2f}s)",
+                        )
+                    else:
+                        for record in batch:
+                            self.add_record(topic, record)
+            except BaseException:
+                # stop the fetchers - otherwise they block on the full queue
+                # and the executor waits for them forever
+                cancel.set()
+                raise
+            finally:
+                if cancel.is_set():
+                    while not all(future.done() for future in futures):
+                        try:
+                            batches.get(timeout=0.1)
+                        except queue.Empty:
+                            pass
+        if errors:
+            raise errors[0]
+        return self.stats
+
+    def topic_node_ids(self, topic_name: str) -> List[Any]:
+        """
+        get the ids of all nodes of the given topic
+        """
+        node_ids = [
+            node_id
+            for node_id, labels in self.graph.nodes(data=self.graph.config.label_field)
+            if labels == topic_name
+        ]
+        return node_ids
+
+    def reload_topic(self, topic: smartCRMTopic) -> TopicLoadStats:
+        """
+        remove all nodes of the given topic from the graph and load it again
+
+        Returns:
+            TopicLoadStats: the load statistics of the topic
+        """
+        self.graph.remove_nodes_from(self.topic_node_ids(topic.name))
+        self.key_index.remove_type(topic.name)
+        self.node_counts.pop(topic.name, None)
+        self.watermarks.pop(topic.name, None)
+        stats = self.load_topics([topic])
+        return stats[topic.name]
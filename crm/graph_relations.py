@@ -0,0 +1,296 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+
+from crm.graph_index import KeyIndex
+
+
+@dataclass
+class Relation:
+    """
+    a foreign key relation between two topics that is
+    represented by edges from the referenced to the referencing nodes
+    """
+
+    name: str  # the edge label e.g. invoices
+    source: str  # the referenced node type e.g. Organization
+    target: str  # the referencing node type e.g. Invoice
+    foreign_key: str  # the column of the target holding the key of the source
+
+
+@dataclass
+class RelationStats:
+    """
+    statistics of building the edges of a relation
+    """
+
+    relation: str
+    edges: int = 0
+    dangling: int = 0  # foreign keys without a matching source node
+    dangling_keys: List[Any] = field(default_factory=list)  # a sample
+
+
+class RelationBuilder:
+    """
+    adds typed edges between topics by a hash join: the foreign key of
+    each referencing node is resolved via the KeyIndex of the referenced
+    node type so that all edges are built in one linear pass over the nodes
+    """
+
+    def __init__(
+        self,
+        graph: MogwaiGraph,
+        key_index: KeyIndex,
+        relations: List[Relation] = None,
+        sample_size: int = 10,
+    ):
+        """
+        constructor
+
+        Args:
+            graph (MogwaiGraph): the graph to add the edges to
+            key_index (KeyIndex): the index of the referenced keys
+            relations (List[Relation]): the relations - default: the SmartCRM relations
+            sample_size (int): the number of dangling keys to keep per relation for the report
+        """
+        self.graph = graph
+        self.key_index = key_index
+        self.relations = relations if relations is not None else self.get_relations()
+        self.sample_size = sample_size
+        self.stats: Dict[str, RelationStats] = {}
+        # referencing node ids by relation name and unresolved foreign key
+        self.dangling: Dict[str, Dict[Any, List[Any]]] = {}
+        # unresolved foreign key by relation name and referencing node id
+        self.dangling_keys: Dict[str, Dict[Any, Any]] = {}
+
+    @classmethod
+    def get_relations(cls) -> List[Relation]:
+        """
+        get the SmartCRM relations
+
+        Invoice.project_number (ZuordnungProjekt_ProjektNummer) is not linked
+        since projects are not loaded as a topic
+        """
+        relations = [
+            Relation(
+                name="contacts",
+                source="Person",
+                target="Contact",
+                foreign_key="meinePerson_PersonNummer",
+            ),
+            Relation(
+                name="invoices",
+                source="Organization",
+                target="Invoice",
+                foreign_key="Auftraggeber_OrganisationNummer",
+            ),
+        ]
+        return relations
+
+    def link(self, relation: Relation, node_id: Any, props: Dict[str, Any]) -> bool:
+        """
+        add the edge for the given referencing node
+
+        Args:
+            relation (Relation): the relation
+            node_id (Any): the id of the referencing node
+            props (Dict[str, Any]): the properties of the referencing node
+
+        Returns:
+            bool: True if an edge was added
+        """
+        key = props.get(relation.foreign_key)
+        if key is None or key == "":
+            return False
+        stats = self.stats.setdefault(relation.name, RelationStats(relation.name))
+        source_id = self.key_index.lookup(relation.source, key)
+        if source_id is None:
+            self.dangling.setdefault(relation.name, {}).setdefault(key, []).append(
+                node_id
+            )
+            self.dangling_keys.setdefault(relation.name, {})[node_id] = key
+            stats.dangling += 1
+            if len(stats.dangling_keys) < self.sample_size:
+                stats.dangling_keys.append(key)
+            return False
+        self.graph.add_labeled_edge(source_id, node_id, relation.name)
+        stats.edges += 1
+        return True
+
+    def build(self) -> Dict[str, RelationStats]:
+        """
+        build the edges of all relations in a single pass over the nodes
+
+        Returns:
+            Dict[str, RelationStats]: the statistics by relation name
+        """
+        self.stats = {
+            relation.name: RelationStats(relation.name) for relation in self.relations
+        }
+        self.dangling = {}
+        self.dangling_keys = {}
+        relations_by_target: Dict[str, List[Relation]] = {}
+        for relation in self.relations:
+            relations_by_target.setdefault(relation.target, []).append(relation)
+        label_field = self.graph.config.label_field
+        for node_id, props in self.graph.nodes(data=True):
+            for relation in relations_by_target.get(props.get(label_field), []):
+                self.link(relation, node_id, props)
+        return self.stats
+
+    def unlink(self, relation: Relation, node_id: Any) -> int:
+        """
+        remove the edge and the dangling foreign key of the given referencing node
+
+        Args:
+            relation (Relation): the relation
+            node_id (Any): the id of the referencing node
+
+        Returns:
+            int: the number of removed edges
+        """
+        stats = self.stats.setdefault(relation.name, RelationStats(relation.name))
+        removed = 0
+        for source_id, _target_id, label in list(
+            self.graph.in_edges(node_id, data=self.graph.config.edge_label_field)
+        ):
+            if label == relation.name:
+                self.graph.remove_edge(source_id, node_id)
+                removed += 1
+        stats.edges -= removed
+        old_key = self.dangling_keys.get(relation.name, {}).pop(node_id, None)
+        if old_key is not None:
+            self.remove_dangling(relation, old_key, [node_id])
+        return removed
+
+    def remove_dangling(self, relation: Relation, key: Any, node_ids: List[Any]):
+        """
+        forget the given referencing nodes of the given unresolved foreign key
+        """
+        stats = self.stats.setdefault(relation.name, RelationStats(relation.name))
+        waiting = self.dangling.get(relation.name, {})
+        node_list = waiting.get(key, [])
+        for node_id in node_ids:
+            if node_id in node_list:
+                node_list.remove(node_id)
+                stats.dangling -= 1
+        if not node_list:
+            waiting.pop(key, None)
+            stats.dangling_keys = [
+                dangling_key
+                for dangling_key in stats.dangling_keys
+                if dangling_key != key
+            ]
+
+    def relink(self, node_type: str, node_id: Any):
+        """
+        update the edges of a node that has been added or changed e.g. by a sync
+
+        Args:
+            node_type (str): the type of the node
+            node_id (Any): the id of the node
+        """
+        props = self.graph.nodes[node_id]
+        for relation in self.relations:
+            if relation.target == node_type:
+                # the foreign key may have changed
+                self.unlink(relation, node_id)
+                self.link(relation, node_id, props)
+            if relation.source == node_type:
+                key_column = self.key_index.key_column(node_type)
+                key = props.get(key_column) if key_column else None
+                waiting = list(self.dangling.get(relation.name, {}).get(key, []))
+                if not waiting:
+                    continue
+                self.remove_dangling(relation, key, waiting)
+                stats = self.stats[relation.name]
+                for target_id in waiting:
+                    self.dangling_keys[relation.name].pop(target_id, None)
+                    self.graph.add_labeled_edge(node_id, target_id, relation.name)
+                    stats.edges += 1
+
+    def relink_topic(self, node_type: str) -> int:
+        """
+        rebuild the edges of the given node type after its nodes have been
+        replaced e.g. by GraphLoader.reload_topic - removing the nodes also
+        removed the edges of the nodes referencing them
+
+        Args:
+            node_type (str): the type of the reloaded nodes
+
+        Returns:
+            int: the number of relinked nodes
+        """
+        # forget the referencing nodes that are gone
+        for relation in self.relations:
+            dangling_keys = self.dangling_keys.get(relation.name, {})
+            for node_id in list(dangling_keys):
+                if not self.graph.has_node(node_id):
+                    key = dangling_keys.pop(node_id)
+                    self.remove_dangling(relation, key, [node_id])
+        node_types = {node_type}
+        for relation in self.relations:
+            if relation.source == node_type:
+                node_types.add(relation.target)
+        label_field = self.graph.config.label_field
+        node_ids = [
+            (props.get(label_field), node_id)
+            for node_id, props in self.graph.nodes(data=True)
+            if props.get(label_field) in node_types
+        ]
+        for relinked_type, node_id in node_ids:
+            self.relink(relinked_type, node_id)
+        # the edges removed with the nodes were not counted off
+        edge_counts = Counter(
+            label
+            for _source_id, _target_id, label in self.graph.edges(
+                data=self.graph.config.edge_label_field
+            )
+        )
+        for relation in self.relations:
+            if node_type in (relation.source, relation.target):
+                stats = self.stats.setdefault(
+                    relation.name, RelationStats(relation.name)
+                )
+                stats.edges = edge_counts[relation.name]
+        return len(node_ids)
+
+    def related(self, node_id: Any, relation_name: Optional[str] = None) -> List[Any]:
+        """
+        get the ids of the nodes the given node is related to
+
+        Args:
+            node_id (Any): the id of the node
+            relation_name (str): the relation to follow - default: all
+
+        Returns:
+            List[Any]: the ids of the related nodes
+        """
+        related = [
+            target_id
+            for _source_id, target_id, label in self.graph.out_edges(
+                node_id, data=self.graph.config.edge_label_field
+            )
+            if relation_name is None or label == relation_name
+        ]
+        return related
+
+    def report(self) -> str:
+        """
+        get a human readable summary of the relation statistics
+        """
+        lines = []
+        for stats in self.stats.values():
+            line = f"{stats.relation}: {stats.edges} edges, {stats.dangling} dangling"
+            if stats.dangling_keys:
+                line += f" e.g. {stats.dangling_keys}"
+            lines.append(line)
+        return "\n".join(lines)
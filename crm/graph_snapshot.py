@@ -0,0 +1,179 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import os
+import pickle
+import time
+from typing import Any, Dict, Optional
+
+from crm.crm_sync import IncrementalSync
+from crm.graph_loader import GraphLoader, TopicLoadStats
+from crm.smartcrm_adapter import SmartCRMAdapter
+
+
+class GraphSnapshot:
+    """
+    on disk snapshot of the topic nodes of a graph together with
+    the key lookup and high-water marks of its GraphLoader
+    for a warm start of the web server
+    """
+
+    # increment when the snapshot layout changes - older snapshots are ignored
+    VERSION = 1
+
+    def __init__(self, path: str):
+        """
+        constructor
+
+        Args:
+            path (str): the path of the snapshot file
+        """
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def save(self, loader: GraphLoader) -> int:
+        """
+        save the topic nodes and the state of the given loader
+
+        the file is written to a temporary path first and then renamed
+        so that a crash while saving never leaves a truncated snapshot
+
+        Args:
+            loader (GraphLoader): the loader with the graph to save
+
+        Returns:
+            int: the number of nodes saved
+        """
+        graph = loader.graph
+        name_field = graph.config.name_field
+        label_field = graph.config.label_field
+        topics = {}
+        node_total = 0
+        for topic in loader.topics:
+            nodes = []
+            for node_id in loader.topic_node_ids(topic.name):
+                props = dict(graph.nodes[node_id])
+                name = props.pop(name_field)
+                props.pop(label_field)
+                nodes.append((node_id, name, props))
+            node_total += len(nodes)
+            topics[topic.name] = {
+                "nodes": nodes,
+                "node_ids": loader.key_index.node_ids.get(topic.name, {}),
+                "node_count": loader.node_counts.get(topic.name, 0),
+                "watermark": loader.watermarks.get(topic.name),
+            }
+        snapshot = {"version": self.VERSION, "created": time.time(), "topics": topics}
+        tmp_path = f"{self.path}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(tmp_path, "wb") as snapshot_file:
+            pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        return node_total
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        load the raw snapshot
+
+        Returns:
+            Optional[Dict[str, Any]]: the snapshot or None if there is no compatible snapshot
+        """
+        if not self.exists():
+            return None
+        with open(self.path, "rb") as snapshot_file:
+            snapshot = pickle.load(snapshot_file)
+        if snapshot.get("version") != self.VERSION:
+            return None
+        return snapshot
+
+    def restore(self, loader: GraphLoader) -> bool:
+        """
+        restore the topic nodes and the loader state from the snapshot
+
+        node ids are reassigned by the graph so that the restored nodes
+        can not collide with nodes added before e.g. the schema nodes
+
+        Args:
+            loader (GraphLoader): the loader with the graph to restore into
+
+        Returns:
+            bool: True if a snapshot was restored
+        """
+        snapshot = self.load()
+        if snapshot is None:
+            return False
+        graph = loader.graph
+        topics_by_name = {topic.name: topic for topic in SmartCRMAdapter.get_topics()}
+        for topic_name, topic_snapshot in snapshot["topics"].items():
+            topic = topics_by_name.get(topic_name)
+            if topic is None:
+                continue
+            mapping = {}
+            for node_id, name, props in topic_snapshot["nodes"]:
+                new_node_id = graph.add_labeled_node(
+                    topic_name, name=name, properties=props
+                )
+                if loader.store is not None:
+                    loader.store.compact_node(graph, new_node_id)
+                mapping[node_id] = new_node_id
+            loader.key_index.node_ids[topic_name] = {
+                key: mapping[node_id]
+                for key, node_id in topic_snapshot["node_ids"].items()
+            }
+            loader.node_counts[topic_name] = topic_snapshot["node_count"]
+            if topic_snapshot["watermark"] is not None:
+                loader.watermarks[topic_name] = topic_snapshot["watermark"]
+            loader.topics.append(topic)
+            loader.stats[topic_name] = TopicLoadStats(
+                topic=topic_name, count=len(mapping)
+            )
+        return True
+
+    def warm_start(self, loader: GraphLoader) -> bool:
+        """
+        restore from the snapshot and fetch from the database only what changed:
+        the rows modified since the high-water marks and - if rows have been
+        deleted - the full table of the affected topic - if the database is
+        not reachable the restored graph is used as it is
+
+        Args:
+            loader (GraphLoader): the loader with the graph to restore into
+
+        Returns:
+            bool: True if the warm start succeeded, False if a full load is needed
+        """
+        start = time.time()
+        if not self.restore(loader):
+            return False
+        restored = {topic.name for topic in loader.topics}
+        missing = [
+            topic
+            for topic in SmartCRMAdapter.get_topics()
+            if topic.name not in restored
+        ]
+        sync = IncrementalSync(loader=loader)
+        counts = {}
+        try:
+            counts = sync.sync()
+            if missing:
+                loader.load_topics(missing)
+            sync.reload_mismatched(sync.row_counts())
+        except Exception as ex:
+            # the restored graph is still better than none - the background
+            # sync catches up once the database is reachable again
+            loader.log.log(
+                "❌",
+                "snapshot",
+                f"sync after restore failed: {ex} - using the snapshot",
+            )
+        loader.log.log(
+            "✅",
+            "snapshot",
+            f"warm start from {self.path} in {time.time() - start:.2f}s - synced {counts}",
+        )
+        return True
@@ -0,0 +1,194 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import codecs
+import json
+import mmap
+import os
+from typing import Any, Iterator, List
+
+
+class JsonStreamReader:
+    """
+    reads the elements of a JSON array nested in a large JSON document one by one
+
+    the document is decoded through a sliding text window over the - memory
+    mapped - file so that only the current element and one window of text
+    are held in memory instead of the whole document tree
+
+    a reader supports one iteration at a time
+    """
+
+    WHITESPACE = " \t\n\r"
+
+    def __init__(
+        self, json_path: str, chunk_size: int = 1 << 20, use_mmap: bool = True
+    ):
+        """
+        constructor
+
+        Args:
+            json_path (str): the path of the JSON file
+            chunk_size (int): the number of bytes to read into the window at once
+            use_mmap (bool): if True map the file into memory instead of reading it
+        """
+        self.json_path = json_path
+        self.chunk_size = chunk_size
+        self.use_mmap = use_mmap
+        self.raw_decode = json.JSONDecoder().raw_decode
+
+    def chunks(self) -> Iterator[bytes]:
+        """
+        get the content of the file in chunks - the size doubles
+        while the reader asks for more to complete a large element
+        """
+        with open(self.json_path, "rb") as json_file:
+            size = os.fstat(json_file.fileno()).st_size
+            if self.use_mmap and size > 0:
+                with mmap.mmap(json_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    offset = 0
+                    while offset < size:
+                        chunk = mm[offset : offset + self.read_size]
+                        offset += len(chunk)
+                        yield chunk
+            else:
+                while True:
+                    chunk = json_file.read(self.read_size)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def fill(self) -> bool:
+        """
+        append the next chunk of text to the window dropping the consumed text
+
+        Returns:
+            bool: False if the end of the file was reached before
+        """
+        if self.eof:
+            return False
+        chunk = next(self.source, None)
+        self.eof = chunk is None
+        text = self.decoder.decode(chunk or b"", final=self.eof)
+        self.text = self.text[self.pos :] + text
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self) -> str:
+        """
+        skip the whitespace at the current position
+
+        Returns:
+            str: the next character - empty at the end of the file
+        """
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in self.WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """
+        consume the next non whitespace character which must be one of the given ones
+
+        Raises:
+            ValueError: if another character is found
+        """
+        char = self.skip_whitespace()
+        if not char or char not in chars:
+            raise ValueError(
+                f"{self.json_path}: expected one of {chars!r} but found {char!r}"
+            )
+        self.pos += 1
+        return char
+
+    def decode_value(self) -> Any:
+        """
+        decode the JSON value at the current position - reading more
+        text until the value is complete
+
+        Raises:
+            json.JSONDecodeError: if the value is invalid
+        """
+        self.skip_whitespace()
+        self.read_size = self.chunk_size
+        while True:
+            try:
+                value, end = self.raw_decode(self.text, self.pos)
+                # a number at the end of the window might continue in the next chunk
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.read_size *= 2
+            self.fill()
+
+    def find_member(self, name: str) -> bool:
+        """
+        move to the value of the member with the given name of the object at the current position
+
+        the values of the members before it are decoded and dropped
+
+        Returns:
+            bool: True if the member was found
+        """
+        self.expect("{")
+        if self.skip_whitespace() == "}":
+            return False
+        while True:
+            key = self.decode_value()
+            self.expect(":")
+            if key == name:
+                return True
+            self.decode_value()
+            if self.expect(",}") == "}":
+                return False
+
+    def iter_path(self, path: List[str]) -> Iterator[Any]:
+        """
+        get the elements of the array at the given path of member names one by one
+
+        a single object instead of an array is yielded as the only element
+        and null as no elements
+
+        Args:
+            path (List[str]): the member names e.g. ["PersonManager", "persons", "Person"]
+
+        Yields:
+            Any: the decoded elements
+
+        Raises:
+            KeyError: if a member of the path does not exist
+        """
+        self.read_size = self.chunk_size
+        self.source = self.chunks()
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        try:
+            for name in path:
+                if self.skip_whitespace() != "{" or not self.find_member(name):
+                    raise KeyError(name)
+            char = self.skip_whitespace()
+            if char == "[":
+                self.pos += 1
+                if self.skip_whitespace() == "]":
+                    return
+                while True:
+                    yield self.decode_value()
+                    if self.expect(",]") == "]":
+                        return
+            value = self.decode_value()
+            if value is not None:
+                yield value
+        finally:
+            self.source.close()
+            self.text = ""
@@ -0,0 +1,188 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from crm.db import DB
+from crm.smartcrm_adapter import SmartCRMAdapter, smartCRMTopic
+
+
+class LazyColumnLoader:
+    """
+    loads the lazy (large) columns of SmartCRM records on demand
+    in batches by key with a LRU cache in front
+
+    the values are not put into the shared QueryCache whose bounds
+    count rows and not bytes
+    """
+
+    def __init__(self, db: DB, cache_size: int = 256, batch_size: int = 100):
+        """
+        constructor
+
+        Args:
+            db (DB): the database to load from
+            cache_size (int): the maximum number of records whose lazy columns are cached
+            batch_size (int): the maximum number of keys per query
+        """
+        self.db = db
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.topics = {topic.name: topic for topic in SmartCRMAdapter.get_topics()}
+        # lazy column values by (topic name, key) in least recently used order
+        self.cache: OrderedDict[Tuple[str, Any], Dict[str, Any]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def queries(self, topic: smartCRMTopic, keys: list) -> Iterator[Tuple[str, tuple]]:
+        """
+        get the queries for the lazy columns of the records with the given keys
+
+        Yields:
+            Tuple[str, tuple]: a query and its parameters per batch of keys
+        """
+        columns = ", ".join([topic.key_column] + topic.lazy_columns)
+        for start in range(0, len(keys), self.batch_size):
+            batch = keys[start : start + self.batch_size]
+            placeholders = ", ".join(["%s"] * len(batch))
+            query = f"SELECT {columns} FROM {topic.table_name} WHERE {topic.key_column} IN ({placeholders})"
+            yield query, tuple(batch)
+
+    def fetch(self, topic: smartCRMTopic, keys: list) -> Dict[Any, Dict[str, Any]]:
+        """
+        fetch the lazy columns of the records with the given keys from the database
+
+        Args:
+            topic (smartCRMTopic): the topic of the records
+            keys (list): the key column values
+
+        Returns:
+            Dict[Any, Dict[str, Any]]: the lazy column values by key
+        """
+        fetched = {}
+        for query, params in self.queries(topic, keys):
+            for row in self.db.iter_query(query, params=params):
+                fetched[row.pop(topic.key_column)] = row
+        return fetched
+
+    async def afetch(
+        self, topic: smartCRMTopic, keys: list
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        fetch the lazy columns of the records with the given keys
+        from the database without blocking the event loop
+        """
+        fetched = {}
+        for query, params in self.queries(topic, keys):
+            for row in await self.db.aquery(query, params):
+                fetched[row.pop(topic.key_column)] = row
+        return fetched
+
+    def lookup(
+        self, topic_name: str, keys: Iterable
+    ) -> Tuple[Dict[Any, Dict[str, Any]], list]:
+        """
+        look up the lazy columns of the records with the given keys in the cache
+
+        Returns:
+            Tuple[Dict[Any, Dict[str, Any]], list]: the cached values by key and the missing keys
+        """
+        result = {}
+        missing = []
+        with self.lock:
+            for key in keys:
+                values = self.cache.get((topic_name, key))
+                if values is None:
+                    missing.append(key)
+                else:
+                    self.cache.move_to_end((topic_name, key))
+                    result[key] = values
+            self.hits += len(result)
+            self.misses += len(missing)
+        return result, missing
+
+    def store(self, topic_name: str, fetched: Dict[Any, Dict[str, Any]]):
+        """
+        put the fetched lazy columns into the cache evicting the least recently used
+        """
+        with self.lock:
+            for key, values in fetched.items():
+                self.cache[(topic_name, key)] = values
+                self.cache.move_to_end((topic_name, key))
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def load(self, topic_name: str, keys: Iterable) -> Dict[Any, Dict[str, Any]]:
+        """
+        get the lazy columns of the records with the given keys
+        from the cache or - for the missing keys - from the database
+
+        Args:
+            topic_name (str): the name of the topic e.g. Invoice
+            keys (Iterable): the key column values
+
+        Returns:
+            Dict[Any, Dict[str, Any]]: the lazy column values by key - unknown keys are left out
+        """
+        topic = self.topics[topic_name]
+        if not topic.lazy_columns:
+            return {}
+        result, missing = self.lookup(topic_name, keys)
+        if missing:
+            fetched = self.fetch(topic, missing)
+            self.store(topic_name, fetched)
+            result.update(fetched)
+        return result
+
+    async def aload(self, topic_name: str, keys: Iterable) -> Dict[Any, Dict[str, Any]]:
+        """
+        get the lazy columns of the records with the given keys
+        without blocking the event loop - see load
+        """
+        topic = self.topics[topic_name]
+        if not topic.lazy_columns:
+            return {}
+        result, missing = self.lookup(topic_name, keys)
+        if missing:
+            fetched = await self.afetch(topic, missing)
+            self.store(topic_name, fetched)
+            result.update(fetched)
+        return result
+
+    def get(self, topic_name: str, key: Any) -> Dict[str, Any]:
+        """
+        get the lazy columns of the record with the given key
+
+        Returns:
+            Dict[str, Any]: the lazy column values - empty if there is no such record
+        """
+        return self.load(topic_name, [key]).get(key, {})
+
+    async def aget(self, topic_name: str, key: Any) -> Dict[str, Any]:
+        """
+        get the lazy columns of the record with the given key
+        without blocking the event loop
+        """
+        loaded = await self.aload(topic_name, [key])
+        return loaded.get(key, {})
+
+    def invalidate(self, topic_name: str, key: Any):
+        """
+        drop the cached lazy columns of the given record
+        """
+        with self.lock:
+            self.cache.pop((topic_name, key), None)
+
+    def on_node_changed(self, node_type: str, _node_id: Any, props: Dict[str, Any]):
+        """
+        node listener dropping the cached lazy columns of a changed record
+        """
+        topic = self.topics.get(node_type)
+        if topic is not None:
+            self.invalidate(node_type, props.get(topic.key_column))
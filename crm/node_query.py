@@ -0,0 +1,374 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+
+from crm.db import DB
+from crm.graph_index import KeyIndex
+from crm.smartcrm_adapter import SmartCRMAdapter, smartCRMTopic
+from crm.topic_query import TopicPage, TopicQuery
+
+
+@dataclass
+class NodeQuery:
+    """
+    a page request for the nodes of a node type
+    """
+
+    node_type: str
+    page: int = 1  # 1 based as in a Quasar QTable pagination
+    limit: int = 25
+    sort_by: Optional[str] = None
+    descending: bool = False
+    text: Optional[str] = None  # case insensitive substring filter on all fields
+
+    @property
+    def offset(self) -> int:
+        return max(0, self.page - 1) * self.limit
+
+
+@dataclass
+class NodePage:
+    """
+    a page of nodes as result of a NodeQuery
+    """
+
+    total: int  # number of nodes matching the filter
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class NodeQueryService:
+    """
+    server side filtering, sorting and pagination of the nodes of a graph
+    so that only the visible page needs to be sent to the browser
+
+    the sorted ids of the matching nodes are cached per node type, filter
+    and sort order so that paging through a selection does not scan and
+    sort the graph again - the cache is dropped when a node changes
+    """
+
+    def __init__(self, graph: MogwaiGraph, cache_size: int = 32):
+        """
+        constructor
+
+        Args:
+            graph (MogwaiGraph): the graph to query
+            cache_size (int): the maximum number of cached selections
+        """
+        self.graph = graph
+        self.cache_size = cache_size
+        self.selections: OrderedDict[Tuple, List[Any]] = OrderedDict()
+
+    def invalidate(self, *_args):
+        """
+        drop the cached selections - usable as GraphLoader node listener
+        """
+        self.selections.clear()
+
+    def is_visible_field(self, key: str, value: Any) -> bool:
+        """
+        check whether the given property is shown in a node table
+        """
+        if key.startswith("_") or key == self.graph.config.label_field:
+            return False
+        return not isinstance(value, (list, set, tuple, dict))
+
+    def matches(self, props: Dict[str, Any], text: str) -> bool:
+        """
+        check whether any visible property value contains the given lower case text
+        """
+        for key, value in props.items():
+            if value is not None and self.is_visible_field(key, value):
+                if text in str(value).lower():
+                    return True
+        return False
+
+    @staticmethod
+    def sort_key(value: Any) -> Tuple[int, Any]:
+        """
+        sort key of a value that is not None - values of different types are
+        ranked by type so that they never have to be compared with each other
+        """
+        if isinstance(value, (bool, int, float, Decimal)):
+            return (0, value)
+        if isinstance(value, str):
+            return (1, value)
+        if isinstance(value, datetime):
+            return (2, value)
+        if isinstance(value, date):
+            return (3, value)
+        return (4, str(value))
+
+    def select(self, node_query: NodeQuery) -> List[Any]:
+        """
+        get the sorted ids of the nodes matching the given query
+        - missing sort values come last in both directions
+        """
+        text = node_query.text.strip().lower() if node_query.text else None
+        cache_key = (
+            node_query.node_type,
+            text,
+            node_query.sort_by,
+            node_query.descending,
+            self.graph.number_of_nodes(),
+        )
+        node_ids = self.selections.get(cache_key)
+        if node_ids is not None:
+            self.selections.move_to_end(cache_key)
+            return node_ids
+        label_field = self.graph.config.label_field
+        selected = []
+        for node_id, props in self.graph.nodes(data=True):
+            if props.get(label_field) != node_query.node_type:
+                continue
+            if text and not self.matches(props, text):
+                continue
+            selected.append((node_id, props))
+        if node_query.sort_by:
+            sort_by = node_query.sort_by
+            present = [item for item in selected if item[1].get(sort_by) is not None]
+            missing = [item for item in selected if item[1].get(sort_by) is None]
+            present.sort(
+                key=lambda item: self.sort_key(item[1][sort_by]),
+                reverse=node_query.descending,
+            )
+            selected = present + missing
+        node_ids = [node_id for node_id, _props in selected]
+        self.selections[cache_key] = node_ids
+        if len(self.selections) > self.cache_size:
+            self.selections.popitem(last=False)
+        return node_ids
+
+    def query(self, node_query: NodeQuery) -> NodePage:
+        """
+        get the requested page of nodes
+
+        Args:
+            node_query (NodeQuery): the page request
+
+        Returns:
+            NodePage: the total number of matching nodes and the rows of the page
+        """
+        node_ids = self.select(node_query)
+        page_ids = node_ids[node_query.offset : node_query.offset + node_query.limit]
+        rows = []
+        for node_id in page_ids:
+            if not self.graph.has_node(node_id):
+                continue
+            props = self.graph.nodes[node_id]
+            row = {
+                key: value
+                for key, value in props.items()
+                if self.is_visible_field(key, value)
+            }
+            row["node_id"] = node_id
+            rows.append(row)
+        return NodePage(total=len(node_ids), rows=rows)
+
+    async def aquery(self, node_query: NodeQuery) -> NodePage:
+        """
+        get the requested page of nodes from within an event loop
+        - the graph is in memory so this does not block
+        """
+        return self.query(node_query)
+
+
+@dataclass
+class KeysetSelection:
+    """
+    the number of matching records and the known page cursors of a selection
+    """
+
+    total: int
+    # the after cursor by page number - None for the first page
+    cursors: Dict[int, Optional[Tuple[Any, Any]]] = field(
+        default_factory=lambda: {1: None}
+    )
+
+
+class TopicNodeQueryService(NodeQueryService):
+    """
+    filtering, sorting and pagination of the nodes of the SmartCRM topics
+    in the database via SmartCRMAdapter.query
+
+    the pages are fetched with the keyset cursor of the previous page
+    instead of an offset - the cursors and the total are kept per selection
+    so that paging forward and back costs a single query per page - the node
+    table uses aquery so that the queries do not block the event loop
+
+    the rows of records without a node are left out - node types without a
+    topic and columns the dataclass does not map are served from the graph
+    """
+
+    def __init__(
+        self,
+        graph: MogwaiGraph,
+        db: DB,
+        key_index: KeyIndex,
+        cache_size: int = 32,
+    ):
+        """
+        constructor
+
+        Args:
+            graph (MogwaiGraph): the graph to query node types without a topic in
+            db (DB): the database to query
+            key_index (KeyIndex): the index of the node ids by key
+            cache_size (int): the maximum number of cached selections
+        """
+        super().__init__(graph, cache_size=cache_size)
+        self.db = db
+        self.key_index = key_index
+        self.topics = {topic.name: topic for topic in SmartCRMAdapter.get_topics()}
+        self.keyset_selections: OrderedDict[Tuple, KeysetSelection] = OrderedDict()
+
+    def invalidate(self, *_args):
+        """
+        drop the cached selections - usable as GraphLoader node listener
+        """
+        super().invalidate()
+        self.keyset_selections.clear()
+
+    def topic_query(
+        self, topic: smartCRMTopic, node_query: NodeQuery
+    ) -> Optional[TopicQuery]:
+        """
+        get the topic query for the given node query
+
+        Returns:
+            Optional[TopicQuery]: None if the sort column is not mapped to a field
+        """
+        sort_by = None
+        if node_query.sort_by:
+            fields = {
+                column: name
+                for name, column in topic.dataclass.smartcrm_columns.items()
+            }
+            sort_by = fields.get(node_query.sort_by)
+            if sort_by is None:
+                return None
+        text = node_query.text.strip() if node_query.text else None
+        return TopicQuery(
+            sort_by=sort_by,
+            descending=node_query.descending,
+            limit=node_query.limit,
+            text=text or None,
+        )
+
+    def selection_key(self, node_query: NodeQuery, topic_query: TopicQuery) -> Tuple:
+        """
+        get the key of the cached selection of the given query
+        """
+        return (
+            node_query.node_type,
+            topic_query.text,
+            topic_query.sort_by,
+            topic_query.descending,
+            topic_query.limit,
+        )
+
+    def cached_selection(self, cache_key: Tuple) -> Optional[KeysetSelection]:
+        """
+        get the cached selection with the given key
+        """
+        selection = self.keyset_selections.get(cache_key)
+        if selection is not None:
+            self.keyset_selections.move_to_end(cache_key)
+        return selection
+
+    def add_selection(self, cache_key: Tuple, total: int) -> KeysetSelection:
+        """
+        cache a new selection with the given number of matching records
+        """
+        selection = KeysetSelection(total=total)
+        self.keyset_selections[cache_key] = selection
+        if len(self.keyset_selections) > self.cache_size:
+            self.keyset_selections.popitem(last=False)
+        return selection
+
+    def position(
+        self, selection: KeysetSelection, topic_query: TopicQuery, page: int
+    ) -> TopicQuery:
+        """
+        position the topic query on the given page - a page without a known cursor
+        is reached with an offset from the nearest known cursor before it
+        so that every page costs a single query
+        """
+        known = max(number for number in selection.cursors if number <= page)
+        topic_query.after = selection.cursors[known]
+        topic_query.offset = (page - known) * topic_query.limit
+        return topic_query
+
+    def node_page(
+        self,
+        topic: smartCRMTopic,
+        selection: KeysetSelection,
+        page: int,
+        topic_page: TopicPage,
+    ) -> NodePage:
+        """
+        get the node page for the given topic page - remembering the cursor of the next page
+        """
+        if topic_page.after is not None:
+            selection.cursors[page + 1] = topic_page.after
+        node_rows = []
+        for row in topic_page.rows:
+            node_id = self.key_index.lookup(topic.name, row.get(topic.key_column))
+            if node_id is not None:
+                row["node_id"] = node_id
+                node_rows.append(row)
+        return NodePage(total=selection.total, rows=node_rows)
+
+    def query(self, node_query: NodeQuery) -> NodePage:
+        """
+        get the requested page of nodes
+
+        Args:
+            node_query (NodeQuery): the page request
+
+        Returns:
+            NodePage: the total number of matching records and the rows of the page
+        """
+        topic = self.topics.get(node_query.node_type)
+        topic_query = self.topic_query(topic, node_query) if topic else None
+        if topic_query is None:
+            return super().query(node_query)
+        adapter = SmartCRMAdapter(topic=topic)
+        cache_key = self.selection_key(node_query, topic_query)
+        selection = self.cached_selection(cache_key)
+        if selection is None:
+            total = adapter.count(self.db, topic_query)
+            selection = self.add_selection(cache_key, total)
+        page = max(1, node_query.page)
+        self.position(selection, topic_query, page)
+        topic_page = adapter.query(self.db, topic_query)
+        return self.node_page(topic, selection, page, topic_page)
+
+    async def aquery(self, node_query: NodeQuery) -> NodePage:
+        """
+        get the requested page of nodes with the database queries
+        running in the executor of the database - see query
+        """
+        topic = self.topics.get(node_query.node_type)
+        topic_query = self.topic_query(topic, node_query) if topic else None
+        if topic_query is None:
+            return await super().aquery(node_query)
+        adapter = SmartCRMAdapter(topic=topic)
+        cache_key = self.selection_key(node_query, topic_query)
+        selection = self.cached_selection(cache_key)
+        if selection is None:
+            total = await adapter.acount(self.db, topic_query)
+            selection = self.add_selection(cache_key, total)
+        page = max(1, node_query.page)
+        self.position(selection, topic_query, page)
+        topic_page = await adapter.aquery(self.db, topic_query)
+        return self.node_page(topic, selection, page, topic_page)
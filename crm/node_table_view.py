@@ -0,0 +1,156 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from dataclasses import replace
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List
+
+import i18n
+from mogwai.web.node_view import BaseNodeView, NodeViewConfig
+from nicegui import ui
+
+from crm.node_query import NodeQuery, NodeQueryService
+
+
+class PagedNodeTableView(BaseNodeView):
+    """
+    A node table that is served page by page from a NodeQueryService
+    with server side sorting and text filtering
+    """
+
+    def __init__(
+        self,
+        config: NodeViewConfig,
+        rows_per_page: int = 25,
+        query_service: NodeQueryService = None,
+    ):
+        """
+        Initialize the PagedNodeTableView.
+
+        Args:
+            config (NodeViewConfig): The configuration dataclass for the view.
+            rows_per_page (int): the initial page size
+            query_service (NodeQueryService): the shared query service - default: a new one for the graph
+        """
+        super().__init__(config)
+        if query_service is None:
+            query_service = NodeQueryService(self.graph)
+        self.query_service = query_service
+        self.node_query = NodeQuery(node_type=self.node_type, limit=rows_per_page)
+        # the raw records are keyed by the SmartCRM column names
+        columns = getattr(self.node_data_class, "smartcrm_columns", {})
+        self.link_field = columns.get(self.key, self.key)
+        self.table = None
+
+    def setup_ui(self):
+        """
+        Set up the user interface for the PagedNodeTableView
+        """
+        with ui.column().classes("w-full"):
+            self.status_label = ui.label("").classes("text-h5")
+            self.filter_input = ui.input(
+                label=i18n.t("filter"), on_change=self.on_filter
+            ).props("clearable debounce=300")
+            self.table = ui.table(
+                rows=[],
+                columns=[],
+                row_key="node_id",
+                pagination={
+                    "page": 1,
+                    "rowsPerPage": node_query.limit,
+                    "sortBy": None,
+                    "descending": False,
+                    "rowsNumber": 0,
+                },
+            ).classes("w-full")
+            self.table.add_slot(
+                f"body-cell-{self.link_field}",
+                f"""<q-td :props="props">
+  <a :href="'/node/{self.node_type}/' + props.row.node_id">{{{{ props.value }}}}</a>
+</q-td>""",
+            )
+            self.table.on("request", self.on_request)
+        # query the first page once the page is shown
+        ui.timer(0, self.reload, once=True)
+
+    async def on_request(self, event):
+        """
+        handle a page or sort request of the table
+        """
+        pagination = event.args.get("pagination", {})
+        self.node_query.page = pagination.get("page", 1)
+        rows_per_page = pagination.get("rowsPerPage", self.node_query.limit)
+        # rowsPerPage 0 means "all" in Quasar - keep the page bounded
+        self.node_query.limit = rows_per_page or self.node_query.limit
+        self.node_query.sort_by = pagination.get("sortBy")
+        self.node_query.descending = pagination.get("descending", False)
+        await self.reload()
+
+    async def on_filter(self, event):
+        """
+        handle a change of the text filter
+        """
+        self.node_query.text = event.value
+        self.node_query.page = 1
+        await self.reload()
+
+    @staticmethod
+    def as_cell(value: Any) -> Any:
+        """
+        convert the given value to something the browser can show
+        """
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return float(value)
+        if isinstance(value, bytes):
+            return f"<{len(value)} bytes>"
+        return value
+
+    def get_columns(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        get the sortable columns for the given rows with the link field first
+        """
+        names = [self.link_field]
+        for row in rows:
+            for name in row.keys():
+                if name not in names and name != "node_id":
+                    names.append(name)
+        columns = [
+            {"name": name, "label": name, "field": name, "sortable": True}
+            for name in names
+        ]
+        return columns
+
+    async def reload(self):
+        """
+        query the current page without blocking the event loop and show it
+        """
+        # a later request may change the query while this one is running
+        # - its own reload shows its page then
+        node_query = replace(self.node_query)
+        try:
+            node_page = await self.query_service.aquery(node_query)
+            if node_query != self.node_query:
+                return
+            rows = [
+                {key: self.as_cell(value) for key, value in row.items()}
+                for row in node_page.rows
+            ]
+            if rows and not self.table.columns:
+                self.table.columns = self.get_columns(rows)
+            self.table.rows = rows
+            self.table.pagination = {
+                "page": node_query.page,
+                "rowsPerPage": node_query.limit,
+                "sortBy": node_query.sort_by,
+                "descending": node_query.descending,
+                "rowsNumber": node_page.total,
+            }
+            self.status_label.text = f"{node_page.total} {self.node_type}s"
+        except Exception as ex:
+            self.solution.handle_exception(ex)
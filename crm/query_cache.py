@@ -0,0 +1,256 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from crm.db import DB
+
+
+@dataclass
+class CacheStats:
+    """
+    hit/miss statistics of a QueryCache
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # entries dropped to stay within the bounds
+    expirations: int = 0  # entries dropped after their time to live
+    invalidations: int = 0  # entries dropped because their table changed
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class CacheEntry:
+    """
+    the cached result of a query
+    """
+
+    rows: List[Dict[str, Any]]
+    expires: float
+    tables: Set[str] = field(default_factory=set)
+
+
+class QueryCache:
+    """
+    LRU cache of query results keyed by the normalized SQL and the parameters
+    with a time to live per entry and invalidation by table
+
+    the callers get their own copies of the cached rows - the values
+    themselves are shared
+    """
+
+    TABLE_PATTERN = re.compile(
+        r"\b(?:FROM|JOIN|INTO|UPDATE)\s+`?(\w+)`?", re.IGNORECASE
+    )
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_rows: int = 100000,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        constructor
+
+        Args:
+            max_entries (int): the maximum number of cached results
+            max_rows (int): the maximum number of cached rows of all results
+            ttl (float): the default time to live of an entry in seconds
+            clock (Callable): the time source in seconds
+        """
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.clock = clock
+        self.entries: OrderedDict[Tuple[str, Hashable], CacheEntry] = OrderedDict()
+        # cache keys by table name
+        self.keys_by_table: Dict[str, Set[Tuple[str, Hashable]]] = {}
+        self.row_count = 0
+        self.stats = CacheStats()
+        self.lock = threading.RLock()
+
+    @staticmethod
+    def normalize(sql: str) -> str:
+        """
+        normalize the given SQL by collapsing whitespace and dropping a trailing semicolon
+        """
+        return " ".join(sql.split()).rstrip(";").rstrip()
+
+    @staticmethod
+    def freeze(params: Any) -> Hashable:
+        """
+        get a hashable version of the given query parameters
+        """
+        if params is None:
+            return None
+        if isinstance(params, dict):
+            return tuple(
+                sorted((key, QueryCache.freeze(value)) for key, value in params.items())
+            )
+        if isinstance(params, (list, tuple)):
+            return tuple(QueryCache.freeze(value) for value in params)
+        return params
+
+    def key(self, sql: str, params: Any = None) -> Tuple[str, Hashable]:
+        """
+        get the cache key of the given query
+        """
+        return (self.normalize(sql), self.freeze(params))
+
+    @classmethod
+    def tables(cls, sql: str) -> Set[str]:
+        """
+        get the lower case names of the tables the given SQL refers to
+        """
+        return {table.lower() for table in cls.TABLE_PATTERN.findall(sql)}
+
+    def remove(self, key: Tuple[str, Hashable]) -> Optional[CacheEntry]:
+        """
+        remove the entry with the given key
+        """
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.row_count -= len(entry.rows)
+            for table in entry.tables:
+                keys = self.keys_by_table.get(table)
+                if keys is not None:
+                    keys.discard(key)
+        return entry
+
+    def get(self, sql: str, params: Any = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        get the cached rows of the given query
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: copies of the rows or None if not cached or expired
+        """
+        key = self.key(sql, params)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.expires <= self.clock():
+                self.remove(key)
+                self.stats.expirations += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats.hits += 1
+            rows = entry.rows
+        return [dict(row) for row in rows]
+
+    def put(
+        self,
+        sql: str,
+        params: Any,
+        rows: List[Dict[str, Any]],
+        ttl: Optional[float] = None,
+    ):
+        """
+        cache the rows of the given query evicting the least recently used entries
+
+        Args:
+            sql (str): the query
+            params (Any): the query parameters
+            rows (List[Dict[str, Any]]): the result rows - copies are cached
+            ttl (float): the time to live in seconds - default: the cache ttl
+        """
+        if len(rows) > self.max_rows:
+            return
+        key = self.key(sql, params)
+        ttl = self.ttl if ttl is None else ttl
+        entry = CacheEntry(
+            rows=[dict(row) for row in rows],
+            expires=self.clock() + ttl,
+            tables=self.tables(sql),
+        )
+        with self.lock:
+            self.remove(key)
+            self.entries[key] = entry
+            self.row_count += len(rows)
+            for table in entry.tables:
+                self.keys_by_table.setdefault(table, set()).add(key)
+            while (
+                len(self.entries) > self.max_entries or self.row_count > self.max_rows
+            ):
+                oldest = next(iter(self.entries))
+                self.remove(oldest)
+                self.stats.evictions += 1
+
+    def query(
+        self, db: DB, sql: str, params: Any = None, ttl: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        get the rows of the given query from the cache or the database
+
+        Args:
+            db (DB): the database to query on a miss
+            sql (str): the query with optional %s placeholders
+            params (Any): the query parameters
+            ttl (float): the time to live in seconds - default: the cache ttl
+
+        Returns:
+            List[Dict[str, Any]]: the rows
+        """
+        rows = self.get(sql, params)
+        if rows is None:
+            rows = list(db.iter_query(sql, params=params))
+            self.put(sql, params, rows, ttl=ttl)
+        return rows
+
+    async def aquery(
+        self, db: DB, sql: str, params: Any = None, ttl: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        get the rows of the given query from the cache or
+        the database without blocking the event loop - see query
+        """
+        rows = self.get(sql, params)
+        if rows is None:
+            rows = await db.aquery(sql, params)
+            self.put(sql, params, rows, ttl=ttl)
+        return rows
+
+    def invalidate_table(self, table: str) -> int:
+        """
+        drop all entries referring to the given table
+
+        Returns:
+            int: the number of dropped entries
+        """
+        with self.lock:
+            keys = self.keys_by_table.pop(table.lower(), set())
+            for key in list(keys):
+                self.remove(key)
+            self.stats.invalidations += len(keys)
+            return len(keys)
+
+    def on_watermark(self, table: str, _watermark: datetime):
+        """
+        watermark listener dropping the entries of a table whose rows changed
+        """
+        self.invalidate_table(table)
+
+    def clear(self):
+        """
+        drop all entries
+        """
+        with self.lock:
+            self.entries.clear()
+            self.keys_by_table.clear()
+            self.row_count = 0
@@ -0,0 +1,349 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import bisect
+import heapq
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+
+from crm.smartcrm_adapter import SmartCRMAdapter
+
+
+@dataclass
+class SearchHit:
+    """
+    a single ranked search result
+    """
+
+    node_id: Any
+    node_type: str
+    score: float
+
+
+@dataclass
+class SearchResult:
+    """
+    a page of ranked search results
+    """
+
+    query: str
+    total: int
+    hits: List[SearchHit] = field(default_factory=list)
+
+
+class SearchIndex:
+    """
+    in memory inverted index over selected fields of the graph nodes
+    with exact, prefix and trigram (fuzzy) matching of the query terms
+    """
+
+    # searchable dataclass fields and their weights by node type
+    SEARCH_FIELDS = {
+        "Organization": {"organization_number": 3.0, "location_name": 2.0, "city": 1.0},
+        "Person": {
+            "name": 3.0,
+            "first_name": 2.0,
+            "email": 2.0,
+            "person_number": 3.0,
+        },
+        "Contact": {"topic": 2.0, "comment": 1.0, "contact_number": 3.0},
+    }
+    # up to this number of pending tokens are inserted one by one instead of merged
+    INSORT_LIMIT = 64
+    # score factors by kind of match
+    EXACT = 1.0
+    PREFIX = 0.7
+    FUZZY = 0.4
+
+    def __init__(
+        self,
+        search_columns: Dict[str, Dict[str, float]] = None,
+        min_similarity: float = 0.4,
+    ):
+        """
+        constructor
+
+        Args:
+            search_columns (Dict[str, Dict[str, float]]): weights of the node properties to index by node type
+            min_similarity (float): the minimum trigram similarity of a fuzzy match
+        """
+        if search_columns is None:
+            search_columns = self.get_search_columns()
+        self.search_columns = search_columns
+        self.min_similarity = min_similarity
+        # token -> node_id -> weight
+        self.postings: Dict[str, Dict[Any, float]] = {}
+        # sorted vocabulary for prefix lookups
+        self.vocabulary: List[str] = []
+        # new tokens not yet merged into the vocabulary
+        self.pending_tokens: List[str] = []
+        # trigram -> tokens
+        self.trigrams: Dict[str, Set[str]] = {}
+        # node_id -> (node_type, tokens) to remove the postings of changed nodes
+        self.node_tokens: Dict[Any, Tuple[str, Set[str]]] = {}
+
+    @classmethod
+    def get_search_columns(cls) -> Dict[str, Dict[str, float]]:
+        """
+        map the SEARCH_FIELDS to the SmartCRM columns of the raw records
+        """
+        search_columns = {}
+        for topic in SmartCRMAdapter.get_topics():
+            search_fields = cls.SEARCH_FIELDS.get(topic.name)
+            if search_fields:
+                columns = topic.dataclass.smartcrm_columns
+                search_columns[topic.name] = {
+                    columns[field_name]: weight
+                    for field_name, weight in search_fields.items()
+                }
+        return search_columns
+
+    @staticmethod
+    def tokenize(text: Any) -> List[str]:
+        """
+        split the given text into lower case word tokens
+        """
+        if text is None:
+            return []
+        return re.findall(r"\w+", str(text).lower())
+
+    @staticmethod
+    def get_trigrams(token: str) -> Set[str]:
+        """
+        get the trigrams of the given token padded with word boundaries
+        """
+        padded = f"  {token} "
+        return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+    def token_weights(
+        self, columns: Dict[str, float], props: Dict[str, Any]
+    ) -> Dict[str, float]:
+        """
+        get the tokens of the given node properties with the weight of the best field they occur in
+        """
+        weights: Dict[str, float] = {}
+        for column, weight in columns.items():
+            for token in self.tokenize(props.get(column)):
+                weights[token] = max(weight, weights.get(token, 0.0))
+        return weights
+
+    def add_trigrams(self, tokens: List[str]):
+        """
+        add the given tokens to the trigram index
+        """
+        trigrams = self.trigrams
+        for token in tokens:
+            padded = f"  {token} "
+            for i in range(len(padded) - 2):
+                trigram = padded[i : i + 3]
+                token_set = trigrams.get(trigram)
+                if token_set is None:
+                    trigrams[trigram] = {token}
+                else:
+                    token_set.add(token)
+
+    def flush(self):
+        """
+        merge the pending new tokens into the vocabulary
+
+        new tokens are collected and merged on the next query so that adding
+        many nodes does not pay for a sorted insert per token - only the new
+        tokens are sorted and then merged with the sorted vocabulary
+        """
+        if self.pending_tokens:
+            pending = sorted(self.pending_tokens)
+            if len(pending) <= self.INSORT_LIMIT:
+                for token in pending:
+                    bisect.insort(self.vocabulary, token)
+            else:
+                self.vocabulary = list(heapq.merge(self.vocabulary, pending))
+            self.pending_tokens = []
+
+    def remove_node(self, node_id: Any):
+        """
+        remove the postings of the given node
+        """
+        entry = self.node_tokens.pop(node_id, None)
+        if entry is None:
+            return
+        _node_type, tokens = entry
+        for token in tokens:
+            postings = self.postings.get(token)
+            if postings is not None:
+                postings.pop(node_id, None)
+
+    def add_node(self, node_type: str, node_id: Any, props: Dict[str, Any]):
+        """
+        index the node with the given properties - a node that
+        has been indexed before is reindexed
+
+        Args:
+            node_type (str): the type (label) of the node
+            node_id (Any): the id of the node
+            props (Dict[str, Any]): the node properties
+        """
+        columns = self.search_columns.get(node_type)
+        if not columns:
+            return
+        self.remove_node(node_id)
+        weights = self.token_weights(columns, props)
+        new_tokens = []
+        for token, weight in weights.items():
+            if token not in self.postings:
+                self.postings[token] = {}
+                new_tokens.append(token)
+            self.postings[token][node_id] = weight
+        if new_tokens:
+            # the trigram index needs no order - only the vocabulary merge is deferred
+            self.add_trigrams(new_tokens)
+            self.pending_tokens.extend(new_tokens)
+        self.node_tokens[node_id] = (node_type, set(weights))
+
+    def rebuild(self, graph: MogwaiGraph):
+        """
+        rebuild the index from all nodes of the given graph
+        """
+        self.postings = {}
+        self.vocabulary = []
+        self.pending_tokens = []
+        self.trigrams = {}
+        self.node_tokens = {}
+        label_field = graph.config.label_field
+        tokens_by_node = {}
+        for node_id, props in graph.nodes(data=True):
+            node_type = props.get(label_field)
+            columns = self.search_columns.get(node_type)
+            if not columns:
+                continue
+            weights = self.token_weights(columns, props)
+            for token, weight in weights.items():
+                self.postings.setdefault(token, {})[node_id] = weight
+            tokens_by_node[node_id] = (node_type, set(weights))
+        self.node_tokens = tokens_by_node
+        self.vocabulary = sorted(self.postings)
+        self.add_trigrams(self.vocabulary)
+
+    def prefix_tokens(self, prefix: str) -> List[str]:
+        """
+        get the tokens of the vocabulary starting with the given prefix
+        """
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\uffff")
+        return self.vocabulary[start:end]
+
+    def fuzzy_tokens(self, term: str) -> List[Tuple[str, float]]:
+        """
+        get the tokens similar to the given term by trigram similarity
+        """
+        term_trigrams = self.get_trigrams(term)
+        counts: Dict[str, int] = {}
+        for trigram in term_trigrams:
+            for token in self.trigrams.get(trigram, ()):
+                counts[token] = counts.get(token, 0) + 1
+        similar = []
+        for token, common in counts.items():
+            union = len(term_trigrams) + len(token) + 1 - common
+            similarity = common / union
+            if similarity >= self.min_similarity:
+                similar.append((token, similarity))
+        return similar
+
+    def match_term(self, term: str) -> Dict[Any, float]:
+        """
+        get the scores of the nodes matching the given query term
+        """
+        scores: Dict[Any, float] = {}
+
+        def add(token: str, factor: float):
+            for node_id, weight in self.postings.get(token, {}).items():
+                score = weight * factor
+                if score > scores.get(node_id, 0.0):
+                    scores[node_id] = score
+
+        for token in self.prefix_tokens(term):
+            add(token, self.EXACT if token == term else self.PREFIX)
+        if not scores and len(term) >= 3:
+            for token, similarity in self.fuzzy_tokens(term):
+                add(token, self.FUZZY * similarity)
+        return scores
+
+    @staticmethod
+    def rank(scores: Dict[Any, float], count: int) -> List[Tuple[Any, float]]:
+        """
+        get the given number of best (node_id, score) pairs - by descending
+        score and ascending node id - without sorting all hits
+
+        Args:
+            scores (Dict[Any, float]): the scores by node id
+            count (int): the number of pairs to get
+
+        Returns:
+            List[Tuple[Any, float]]: the ranked pairs
+        """
+        if count <= 0 or not scores:
+            return []
+        # the score of the last pair - found without a key function
+        threshold = heapq.nlargest(count, scores.values())[-1]
+        above = [item for item in scores.items() if item[1] > threshold]
+        above.sort(key=lambda item: (-item[1], str(item[0])))
+        tied = [node_id for node_id, score in scores.items() if score == threshold]
+        tied = heapq.nsmallest(count - len(above), tied, key=str)
+        return above + [(node_id, threshold) for node_id in tied]
+
+    def search(
+        self,
+        query: str,
+        node_type: Optional[str] = None,
+        page: int = 1,
+        limit: int = 20,
+    ) -> SearchResult:
+        """
+        search for the nodes matching all terms of the given query
+
+        Args:
+            query (str): the query text
+            node_type (str): optional node type to restrict the search to
+            page (int): the 1 based page number
+            limit (int): the page size
+
+        Returns:
+            SearchResult: the total number of hits and the requested page ranked by score
+        """
+        self.flush()
+        scores: Optional[Dict[Any, float]] = None
+        # longest terms first - they are usually the most selective
+        terms = sorted(set(self.tokenize(query)), key=len, reverse=True)
+        for term in terms:
+            term_scores = self.match_term(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    node_id: score + term_scores[node_id]
+                    for node_id, score in scores.items()
+                    if node_id in term_scores
+                }
+            if not scores:
+                break
+        scores = scores or {}
+        if node_type:
+            scores = {
+                node_id: score
+                for node_id, score in scores.items()
+                if self.node_tokens[node_id][0] == node_type
+            }
+        offset = max(0, page - 1) * limit
+        ranked = self.rank(scores, offset + limit)
+        hits = [
+            SearchHit(
+                node_id=node_id, node_type=self.node_tokens[node_id][0], score=score
+            )
+            for node_id, score in ranked[offset:]
+        ]
+        return SearchResult(query=query, total=len(scores), hits=hits)
@@ -4,18 +4,25 @@ Created on 2024-01-13
 @author: wf
 """
 
-import json
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
-from crm.crm_core import Contact, Invoice, Organization, Person
+from crm.crm_core import ColumnConverter, Contact, Invoice, Organization, Person
 from crm.db import DB
+from crm.json_stream import JsonStreamReader
+from crm.query_cache import QueryCache
+from crm.topic_query import TopicPage, TopicQuery, TopicQueryBuilder
 
 
 @dataclass
 class Topic:
     """A generic entity / topic/ class description"""
+
     name: str
     plural_name: str
     dataclass: type
@@ -25,6 +32,10 @@ class Topic:
 class smartCRMTopic(Topic):
     table_name: str
     node_path: str  # e.g. OrganisationManager/organisations/Organisation
+    key_column: str  # e.g. OrganisationNummer
+    last_modified_column: str  # lastModified or lastmodified
+    # large columns left out of list loads and fetched on demand
+    lazy_columns: List[str] = field(default_factory=list)
 
 
 class SmartCRMAdapter:
@@ -43,6 +54,9 @@ class SmartCRMAdapter:
                 dataclass=Organization,
                 table_name="organisation",
                 node_path="OrganisationManager/organisations/Organisation",
+                key_column="OrganisationNummer",
+                last_modified_column="lastModified",
+                lazy_columns=["logo"],
             ),
             smartCRMTopic(
                 name="Person",
@@ -50,6 +64,8 @@ class SmartCRMAdapter:
                 dataclass=Person,
                 table_name="person",
                 node_path="PersonManager/persons/Person",
+                key_column="PersonNummer",
+                last_modified_column="lastModified",
             ),
             smartCRMTopic(
                 name="Contact",
@@ -57,6 +73,9 @@ class SmartCRMAdapter:
                 dataclass=Contact,
                 table_name="kontakt",
                 node_path="KontaktManager/kontakts/Kontakt",
+                key_column="KontaktNummer",
+                last_modified_column="lastmodified",
+                lazy_columns=["attachment"],
             ),
             smartCRMTopic(
                 name="Invoice",
@@ -64,32 +83,362 @@ class SmartCRMAdapter:
                 dataclass=Invoice,
                 table_name="rechnung",
                 node_path="RechnungManager/rechnungs/Rechnung",
+                key_column="rechnungsID",
+                last_modified_column="lastmodified",
+                lazy_columns=["document"],
             ),
         ]
         return topics
 
-    def from_db(self, db: DB, converter=None) -> List:
-        """Fetch entities from database with optional conversion."""
-        query = f"SELECT * FROM {self.topic.table_name}"
-        raw_lod = db.execute_query(query)
+    def select_query(self, db: DB, lazy: bool = False) -> str:
+        """
+        get the query for the records of the topic
+
+        Args:
+            db (DB): the database whose table columns are selected
+            lazy (bool): if True select all columns including the lazy ones
+
+        Returns:
+            str: the SQL query - all columns of the table but the lazy ones
+            including the columns the dataclass does not map
+        """
+        if lazy or not self.topic.lazy_columns:
+            return f"SELECT * FROM {self.topic.table_name}"
+        columns = [
+            column
+            for column in db.table_columns(self.topic.table_name)
+            if column not in self.topic.lazy_columns
+        ]
+        return f"SELECT {', '.join(columns)} FROM {self.topic.table_name}"
+
+    def from_db(
+        self,
+        db: DB,
+        converter=None,
+        batch_size: int = 1000,
+        lazy: bool = False,
+        cache: QueryCache = None,
+    ) -> List:
+        """
+        Fetch entities from database with optional conversion.
+
+        The converter is called with the list of records - use iter_db
+        to stream the records without materializing them.
+        With a cache the records are taken from or put into the cache as a whole.
+        """
+        if cache is not None:
+            records = cache.query(db, self.select_query(db, lazy=lazy))
+        else:
+            records = self.iter_db(db, batch_size=batch_size, lazy=lazy)
+        records = list(records)
         if converter:
-            return converter(raw_lod)
-        return raw_lod
+            return converter(records)
+        return records
+
+    def iter_db(
+        self,
+        db: DB,
+        record_converter: Callable = None,
+        batch_size: int = 1000,
+        since: datetime = None,
+        lazy: bool = False,
+    ) -> Iterator:
+        """
+        Stream entities from the database with an optional per record conversion.
+
+        Args:
+            db (DB): the database to read from
+            record_converter (Callable): optional converter for a single record e.g. topic.dataclass.from_smartcrm
+            batch_size (int): the number of rows to fetch per roundtrip
+            since (datetime): if set only fetch the records modified at or after this high-water mark
+            lazy (bool): if True also fetch the lazy columns - by default they are left out
+
+        Yields:
+            the (converted) records one by one
+        """
+        query = self.select_query(db, lazy=lazy)
+        params = None
+        if since is not None:
+            # use >= since rows modified in the same second as the mark might not have been seen yet
+            query += f" WHERE {self.topic.last_modified_column} >= %s"
+            params = (since,)
+        for record in db.iter_query(query, batch_size=batch_size, params=params):
+            if record_converter:
+                record = record_converter(record)
+            yield record
+
+    def by_key(self, db: DB, key: Any, lazy: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the record with the given key column value e.g. a person by PersonNummer.
+
+        The key is passed as a parameter so that the SQL text is the same for
+        all keys - the statement is translated and checked once and the
+        statement cache of sqlite3 is reused while PyMySQL formats
+        the escaped key into the SQL on the client.
+
+        Args:
+            db (DB): the database to read from
+            key (Any): the key column value
+            lazy (bool): if True also fetch the lazy columns
+
+        Returns:
+            Optional[Dict[str, Any]]: the record or None if there is no such record
+        """
+        query = f"{self.select_query(db, lazy=lazy)} WHERE {self.topic.key_column} = %s"
+        rows = db.execute_query(query, (key,))
+        return rows[0] if rows else None
+
+    def query_builder(self, db: DB, lazy: bool = False) -> TopicQueryBuilder:
+        """
+        get the builder translating TopicQuerys on the dataclass fields into SQL
+        for the given database
+        """
+        return TopicQueryBuilder(self.topic, self.select_query(db, lazy=lazy))
+
+    def query(self, db: DB, topic_query: TopicQuery, lazy: bool = False) -> TopicPage:
+        """
+        Fetch a filtered and sorted page of records - filtering, sorting and
+        paging happen in the database so that large topics need not be loaded.
+
+        Args:
+            db (DB): the database to read from
+            topic_query (TopicQuery): the filters, sort order and page cursor
+            lazy (bool): if True also fetch the lazy columns
+
+        Returns:
+            TopicPage: the rows and the cursor of the next page
+        """
+        builder = self.query_builder(db, lazy=lazy)
+        sql, params = builder.build(topic_query)
+        rows = db.execute_query(sql, params)
+        return TopicPage(rows=rows, after=builder.cursor(topic_query, rows))
+
+    def count(self, db: DB, topic_query: TopicQuery) -> int:
+        """
+        count the records matching the filters of the given query
+        """
+        sql, params = self.query_builder(db).build_count(topic_query)
+        return db.execute_query(sql, params)[0]["count"]
+
+    async def aquery(
+        self, db: DB, topic_query: TopicQuery, lazy: bool = False
+    ) -> TopicPage:
+        """
+        Fetch a page of records without blocking the event loop - see query
+        """
+        # the builder may have to look up the columns of the table
+        builder = await asyncio.to_thread(self.query_builder, db, lazy)
+        sql, params = builder.build(topic_query)
+        rows = await db.aquery(sql, params)
+        return TopicPage(rows=rows, after=builder.cursor(topic_query, rows))
+
+    async def acount(self, db: DB, topic_query: TopicQuery) -> int:
+        """
+        count the records matching the filters of the given query
+        without blocking the event loop
+        """
+        builder = await asyncio.to_thread(self.query_builder, db)
+        sql, params = builder.build_count(topic_query)
+        rows = await db.aquery(sql, params)
+        return rows[0]["count"]
+
+    def write_fields(self, field_names: List[str] = None) -> List[str]:
+        """
+        get the dataclass fields to write back - the key field first
+
+        Args:
+            field_names (List[str]): the fields to write - default: all fields but the lazy ones
+            which are left out so that records loaded without them do not clear them
+
+        Raises:
+            ValueError: for a field the topic does not have
+        """
+        columns = self.topic.dataclass.smartcrm_columns
+        key_field = next(
+            name for name, column in columns.items() if column == self.topic.key_column
+        )
+        if field_names is None:
+            field_names = [
+                name
+                for name, column in columns.items()
+                if column not in self.topic.lazy_columns
+            ]
+        for name in field_names:
+            if name not in columns:
+                raise ValueError(f"{self.topic.name} has no field {name}")
+        return [key_field] + [name for name in field_names if name != key_field]
+
+    def to_smartcrm_rows(
+        self, entities: Iterable[Any], field_names: List[str]
+    ) -> Iterator[tuple]:
+        """
+        get the SmartCRM column values of the given fields of the given entities
+
+        Yields:
+            tuple: the values in the order of the field names
+        """
+        get_values = attrgetter(*field_names)
+        to_value = ColumnConverter.to_smartcrm_value
+        for entity in entities:
+            values = get_values(entity)
+            if len(field_names) == 1:
+                values = (values,)
+            yield tuple(map(to_value, values))
+
+    def update_query(self, columns: List[str], key_count: int = 1) -> str:
+        """
+        get the statement setting the given columns of the rows with the given keys
+
+        Args:
+            columns (List[str]): the columns to write - without the key column
+            key_count (int): the number of keys
+
+        Returns:
+            str: the UPDATE statement with the keys as last %s placeholders
+        """
+        assignments = ", ".join(f"{column}=%s" for column in columns)
+        keys = ", ".join(["%s"] * key_count)
+        return (
+            f"UPDATE {self.topic.table_name} SET {assignments}"
+            f" WHERE {self.topic.key_column} IN ({keys})"
+        )
+
+    def write_db(
+        self,
+        db: DB,
+        entities: Iterable[Any],
+        field_names: List[str] = None,
+        transaction_size: int = 1000,
+        cache: QueryCache = None,
+    ) -> int:
+        """
+        Write the given (edited) entities back to the database in batches.
+
+        Complete records are upserted - a subset of the fields is updated in
+        the existing rows only so that no partial rows are inserted. The rows
+        of a transaction with the same new values are updated by a single
+        UPDATE ... WHERE key IN (...) since drivers like PyMySQL send an
+        UPDATE per parameter set.
+        The last modified column is set to now so that the change is synced.
+
+        Args:
+            db (DB): the database to write to
+            entities (Iterable[Any]): the dataclass instances of the topic e.g. the dirty ones
+            field_names (List[str]): the fields to write e.g. ["responsible"] - see write_fields
+            transaction_size (int): the number of entities per transaction
+            cache (QueryCache): optional query cache to drop the results of the table from
+
+        Returns:
+            int: the number of written entities - for a subset of the fields
+            the number of updated rows
+        """
+        columns = self.topic.dataclass.smartcrm_columns
+        complete = set(self.write_fields())
+        field_names = self.write_fields(field_names)
+        modified_field = next(
+            (
+                name
+                for name, column in columns.items()
+                if column == self.topic.last_modified_column
+            ),
+            None,
+        )
+        # the database keeps whole seconds
+        modified = datetime.now().replace(microsecond=0)
+        if complete.issubset(field_names):
+            query = db.upsert_query(
+                self.topic.table_name,
+                [columns[name] for name in field_names],
+                self.topic.key_column,
+            )
+            position = field_names.index(modified_field) if modified_field else None
+            count = 0
+
+            def upsert_rows() -> Iterator[tuple]:
+                nonlocal count
+                for row in self.to_smartcrm_rows(entities, field_names):
+                    count += 1
+                    if position is not None:
+                        row = row[:position] + (modified,) + row[position + 1 :]
+                    yield row
+
+            db.execute_many(query, upsert_rows(), transaction_size=transaction_size)
+        else:
+            key_field, update_fields = field_names[0], [
+                name for name in field_names[1:] if name != modified_field
+            ]
+            update_columns = [columns[name] for name in update_fields]
+            if modified_field:
+                update_columns.append(self.topic.last_modified_column)
+            stamp = (modified,) if modified_field else ()
+            rows = self.to_smartcrm_rows(entities, [key_field] + update_fields)
+            count = 0
+            while True:
+                batch = list(islice(rows, transaction_size))
+                if not batch:
+                    break
+                # one UPDATE per distinct set of values e.g. per new responsible
+                keys_by_values: Dict[tuple, list] = {}
+                for row in batch:
+                    keys_by_values.setdefault(row[1:] + stamp, []).append(row[0])
+                count += db.execute_transaction(
+                    (self.update_query(update_columns, len(keys)), values + tuple(keys))
+                    for values, keys in keys_by_values.items()
+                )
+        if cache is not None:
+            cache.invalidate_table(self.topic.table_name)
+        return count
 
     def from_json_file(self, json_path: str = None, converter=None) -> List:
-        """Read entities from JSON file with optional conversion."""
+        """
+        Read entities from JSON file with optional conversion.
+
+        The converter is called with the list of the streamed records - use
+        iter_json_file to convert the records without materializing them.
+        """
+        records = list(self.iter_json_file(json_path))
+        if converter:
+            return converter(records)
+        return records
+
+    def iter_json_file(
+        self,
+        json_path: str = None,
+        record_converter: Callable = None,
+        use_mmap: bool = True,
+    ) -> Iterator:
+        """
+        Stream entities from a SmartCRM JSON export with an optional per record conversion.
+
+        The records at the node_path e.g. PersonManager/persons/Person are decoded
+        one by one so that the document tree of the export is never held in memory.
+
+        Args:
+            json_path (str): the path of the export - default: the table name in the root path
+            record_converter (Callable): optional converter for a single record e.g. topic.dataclass.from_smartcrm
+            use_mmap (bool): if True map the file into memory instead of reading it
+
+        Yields:
+            the (converted) records one by one
+        """
         if json_path is None:
-            json_path = f"{SmartCRMAdapter.root_path()}/{self.topic.table_name}.json"
-        with open(json_path, "r") as json_file:
-            smartcrm_data = json.load(json_file)
-            # Split the node_path into its components
-            manager_name, plural_name, name = self.topic.node_path.split("/")
-
-            # Use the components to access the data
-            raw_lod = smartcrm_data[manager_name][plural_name][name]
-            if converter:
-                return converter(raw_lod)
-            return raw_lod
+            json_path = self.json_path()
+        reader = JsonStreamReader(json_path, use_mmap=use_mmap)
+        for record in reader.iter_path(self.topic.node_path.split("/")):
+            if record_converter:
+                record = record_converter(record)
+            yield record
+
+    def json_path(self, root_path: str = None) -> str:
+        """
+        get the path of the JSON export of the topic
+
+        Args:
+            root_path (str): the directory of the exports - default: the SmartCRM root path
+        """
+        if root_path is None:
+            root_path = SmartCRMAdapter.root_path()
+        return f"{root_path}/{self.topic.table_name}.json"
 
     @staticmethod
     def root_path() -> str:
@@ -0,0 +1,311 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from crm.db_async import AsyncQueries
+from crm.db_statements import StatementCache
+
+
+class SQLiteConnection(sqlite3.Connection):
+    """
+    a connection knowing the columns declared as DATETIME
+
+    the datetime handling is done per connection instead of with
+    sqlite3.register_adapter/register_converter which would change
+    the behavior of every sqlite3 connection of the process
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.schema_version = None
+        self.datetime_columns: Set[str] = set()
+
+    def refresh_columns(self):
+        """
+        reread the names of the DATETIME columns if the schema has changed
+        """
+        cursor = self.cursor()
+        cursor.row_factory = None
+        (version,) = cursor.execute("PRAGMA schema_version").fetchone()
+        if version == self.schema_version:
+            return
+        datetime_columns = set()
+        tables = cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table'"
+        ).fetchall()
+        for (table_name,) in tables:
+            for column in cursor.execute(f"PRAGMA table_info('{table_name}')"):
+                name, decltype = column[1], column[2]
+                if decltype.split("(")[0].strip().upper() == "DATETIME":
+                    datetime_columns.add(name)
+        self.datetime_columns = datetime_columns
+        self.schema_version = version
+
+
+class SQLiteDB(AsyncQueries):
+    """
+    read access to a local SQLite database with the query API of crm.db.DB
+
+    queries may use the pymysql %s placeholder style which is
+    translated to the SQLite ? style
+
+    datetime params are stored as ISO text and result columns named
+    like a column declared as DATETIME in any table are returned as datetimes
+    """
+
+    def __init__(self, db_path: str):
+        """
+        constructor
+
+        Args:
+            db_path (str): the path of the SQLite database file
+        """
+        self.db_path = db_path
+        self.local = threading.local()
+        # the connections of all threads to close them at the end
+        self.connections: List[sqlite3.Connection] = []
+        self.connections_lock = threading.Lock()
+        self.statements = StatementCache(translate=self.to_sqlite)
+        # the column names by table name
+        self.columns: Dict[str, List[str]] = {}
+        self.init_async()
+
+    def create_connection(self) -> sqlite3.Connection:
+        """
+        create a new connection returning rows as dicts
+        """
+        connection = sqlite3.connect(
+            self.db_path,
+            # each thread uses its own connection - close() may run in another thread
+            check_same_thread=False,
+            # compiled statements reused for the same SQL text
+            cached_statements=self.statements.max_size,
+            factory=SQLiteConnection,
+        )
+
+        def to_dict(cursor: sqlite3.Cursor, row: tuple) -> Dict[str, Any]:
+            record = {
+                column[0]: value for column, value in zip(cursor.description, row)
+            }
+            for name in connection.datetime_columns.intersection(record):
+                value = record[name]
+                if isinstance(value, str):
+                    record[name] = datetime.fromisoformat(value)
+            return record
+
+        connection.row_factory = to_dict
+        return connection
+
+    @contextmanager
+    def checkout(self) -> Iterator[sqlite3.Connection]:
+        """
+        get the connection of the current thread - SQLite connections
+        must not be shared between threads
+        """
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.create_connection()
+            self.local.connection = connection
+            with self.connections_lock:
+                self.connections.append(connection)
+        connection.refresh_columns()
+        yield connection
+
+    @staticmethod
+    def to_sqlite(query: str) -> str:
+        """
+        translate %s placeholders to the SQLite ? style and %% to %
+        for a statement with parameters
+        """
+        return StatementCache.replace_placeholders(query, "?")
+
+    @staticmethod
+    def to_param(value: Any) -> Any:
+        """
+        get the value to bind for the given param - datetimes as ISO text
+        """
+        if isinstance(value, datetime):
+            return value.isoformat(sep=" ")
+        return value
+
+    @classmethod
+    def to_params(cls, params: Any) -> Any:
+        """
+        get the values to bind for the given params
+        """
+        if params is None:
+            return ()
+        if isinstance(params, dict):
+            return {name: cls.to_param(value) for name, value in params.items()}
+        if isinstance(params, (list, tuple)):
+            return [cls.to_param(value) for value in params]
+        # a single value as accepted by PyMySQL
+        return [cls.to_param(params)]
+
+    def execute_query(
+        self, query: str, params: Any = None, connection: sqlite3.Connection = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Executes a SQL query and returns the results.
+
+        Args:
+            query (str): The SQL query to execute.
+            params (Any, optional): the values for the placeholders.
+            connection (sqlite3.Connection, optional): an already checked out connection.
+
+        Returns:
+            List[Dict[str, Any]]: The result of the SQL query execution.
+        """
+        if connection is None:
+            with self.checkout() as connection:
+                return self.execute_query(query, params, connection=connection)
+        statement = self.statements.prepare(query)
+        statement.check_params(params)
+        cursor = connection.execute(
+            statement.driver_query(params), self.to_params(params)
+        )
+        return cursor.fetchall()
+
+    def execute_many(
+        self,
+        query: str,
+        params_list: Iterable[Any],
+        connection: sqlite3.Connection = None,
+        transaction_size: int = None,
+    ) -> int:
+        """
+        Executes a SQL statement once per parameter set with each batch
+        of transaction_size parameter sets committed as a transaction.
+
+        Args:
+            query (str): The SQL statement with %s placeholders.
+            params_list (Iterable[Any]): the values for the placeholders per execution.
+            connection (sqlite3.Connection, optional): an already checked out connection.
+            transaction_size (int, optional): the number of parameter sets per transaction - default: all
+
+        Returns:
+            int: the number of affected rows.
+        """
+        if connection is None:
+            with self.checkout() as connection:
+                return self.execute_many(
+                    query,
+                    params_list,
+                    connection=connection,
+                    transaction_size=transaction_size,
+                )
+        statement = self.statements.prepare(query)
+        params_iter = iter(params_list)
+        count = 0
+        while True:
+            batch = list(islice(params_iter, transaction_size))
+            if not batch:
+                return count
+            for params in batch:
+                statement.check_params(params)
+            with connection:
+                cursor = connection.executemany(
+                    statement.driver_sql, map(self.to_params, batch)
+                )
+            count += cursor.rowcount
+
+    def execute_transaction(
+        self,
+        statements: Iterable[Tuple[str, Any]],
+        connection: sqlite3.Connection = None,
+    ) -> int:
+        """
+        Executes the given statements in a single transaction - rolled back on error.
+
+        Args:
+            statements (Iterable[Tuple[str, Any]]): the SQL statements with %s placeholders and their params
+            connection (sqlite3.Connection, optional): an already checked out connection.
+
+        Returns:
+            int: the number of affected rows.
+        """
+        if connection is None:
+            with self.checkout() as connection:
+                return self.execute_transaction(statements, connection=connection)
+        count = 0
+        with connection:
+            for query, params in statements:
+                statement = self.statements.prepare(query)
+                statement.check_params(params)
+                cursor = connection.execute(
+                    statement.driver_query(params), self.to_params(params)
+                )
+                count += cursor.rowcount
+        return count
+
+    def upsert_query(self, table_name: str, columns: List[str], key_column: str) -> str:
+        """
+        get the statement inserting a row or updating the given columns
+        of the row with the same key - see DB.upsert_query
+        """
+        placeholders = ", ".join(["%s"] * len(columns))
+        updates = [column for column in columns if column != key_column]
+        insert = (
+            f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+        )
+        if not updates:
+            return f"{insert} ON CONFLICT({key_column}) DO NOTHING"
+        assignments = ", ".join(f"{column}=excluded.{column}" for column in updates)
+        return f"{insert} ON CONFLICT({key_column}) DO UPDATE SET {assignments}"
+
+    def table_columns(self, table_name: str) -> List[str]:
+        """
+        get the column names of the given table - cached per table
+        """
+        columns = self.columns.get(table_name)
+        if columns is None:
+            rows = self.execute_query(f"PRAGMA table_info('{table_name}')")
+            columns = [row["name"] for row in rows]
+            self.columns[table_name] = columns
+        return columns
+
+    def iter_query(
+        self, query: str, batch_size: int = 1000, params: Any = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Executes a SQL query and yields the rows fetched in batches.
+
+        Args:
+            query (str): The SQL query to execute.
+            batch_size (int): the number of rows to fetch at once.
+            params (Any, optional): the values for the placeholders.
+
+        Yields:
+            Dict[str, Any]: the result rows one by one.
+        """
+        statement = self.statements.prepare(query)
+        statement.check_params(params)
+        with self.checkout() as connection:
+            cursor = connection.execute(
+                statement.driver_query(params), self.to_params(params)
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
+    def close(self):
+        """
+        close the connections of all threads
+        """
+        self.shutdown_executor()
+        with self.connections_lock:
+            for connection in self.connections:
+                connection.close()
+            self.connections = []
+        self.local = threading.local()
@@ -0,0 +1,236 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import sqlite3
+import threading
+import typing
+from dataclasses import fields
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from crm.db import DB
+from crm.smartcrm_adapter import SmartCRMAdapter, smartCRMTopic
+from crm.sqlite_db import SQLiteDB
+
+
+class SQLiteMirror:
+    """
+    a local SQLite copy of the SmartCRM topic tables
+
+    the tables are bulk copied once and then refreshed incrementally by the
+    last modified column so that reads can be served from a local file
+    while the MySQL server is slow or unreachable
+
+    rows deleted in SmartCRM are only removed by a full refresh
+    """
+
+    def __init__(
+        self,
+        mirror_path: str,
+        source_factory: Optional[Callable[[], DB]] = None,
+        topics: Optional[List[smartCRMTopic]] = None,
+        batch_size: int = 1000,
+    ):
+        """
+        constructor
+
+        Args:
+            mirror_path (str): the path of the SQLite file
+            source_factory (Callable): creates the connection to the SmartCRM database -
+                called on the first refresh and again after a failed one
+            topics (List[smartCRMTopic]): the topics to mirror - default: all SmartCRM topics
+            batch_size (int): the number of rows to fetch and insert at once
+        """
+        self.mirror_path = mirror_path
+        self.source_factory = source_factory
+        self.source: Optional[DB] = None
+        self.topics = topics if topics is not None else SmartCRMAdapter.get_topics()
+        self.batch_size = batch_size
+        # one refresh at a time
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def column_types(topic: smartCRMTopic) -> Dict[str, type]:
+        """
+        get the python type of each SmartCRM column of the given topic
+        """
+        hints = typing.get_type_hints(topic.dataclass)
+        column_types = {}
+        for field in fields(topic.dataclass):
+            field_type = hints[field.name]
+            # unwrap Optional[...]
+            args = [arg for arg in typing.get_args(field_type) if arg is not type(None)]
+            if args:
+                field_type = args[0]
+            column = topic.dataclass.smartcrm_columns[field.name]
+            column_types[column] = field_type
+        return column_types
+
+    @staticmethod
+    def sql_type(column_type: type) -> str:
+        """
+        get the SQLite column type for the given python type
+        """
+        sql_types = {datetime: "DATETIME", int: "INTEGER", float: "REAL"}
+        return sql_types.get(column_type, "TEXT")
+
+    @staticmethod
+    def to_sqlite_value(value: Any) -> Any:
+        """
+        get a value sqlite3 can store for the given MySQL value
+        """
+        if isinstance(value, Decimal):
+            return float(value)
+        if isinstance(value, datetime):
+            return value.isoformat(sep=" ")
+        if isinstance(value, date):
+            return value.isoformat()
+        if isinstance(value, timedelta):
+            return str(value)
+        return value
+
+    @staticmethod
+    def index_columns(topic: smartCRMTopic) -> List[str]:
+        """
+        get the columns to index besides the key column - the
+        foreign keys e.g. meinePerson_PersonNummer and the last modified column
+        """
+        columns = [
+            column
+            for column in topic.dataclass.smartcrm_columns.values()
+            if "_" in column and column.endswith("Nummer")
+        ]
+        columns.append(topic.last_modified_column)
+        return columns
+
+    def create_table(self, connection: sqlite3.Connection, topic: smartCRMTopic):
+        """
+        create the table and the indexes of the given topic if they do not exist
+        """
+        column_ddl = ", ".join(
+            f"{column} {self.sql_type(column_type)}"
+            + (" PRIMARY KEY" if column == topic.key_column else "")
+            for column, column_type in self.column_types(topic).items()
+        )
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {topic.table_name} ({column_ddl})"
+        )
+        for column in self.index_columns(topic):
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{topic.table_name}_{column}"
+                f" ON {topic.table_name} ({column})"
+            )
+
+    def watermark(
+        self, connection: sqlite3.Connection, topic: smartCRMTopic
+    ) -> Optional[datetime]:
+        """
+        get the highest last modified timestamp of the mirrored rows of the given topic
+        """
+        column = topic.last_modified_column
+        row = connection.execute(
+            f"SELECT MAX({column}) AS watermark FROM {topic.table_name}"
+        ).fetchone()
+        value = row["watermark"] if row else None
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return value
+
+    def get_source(self) -> DB:
+        """
+        get the SmartCRM database to copy from
+
+        Raises:
+            ValueError: if the mirror has no source
+        """
+        if self.source is None:
+            if self.source_factory is None:
+                raise ValueError(f"mirror {self.mirror_path} has no source database")
+            self.source = self.source_factory()
+        return self.source
+
+    def reset_source(self):
+        """
+        drop the source connection so that the next refresh reconnects
+        """
+        source, self.source = self.source, None
+        if source is not None:
+            try:
+                source.close()
+            except Exception:
+                # the connection is most likely broken already
+                pass
+
+    def copy_topic(
+        self, connection: sqlite3.Connection, topic: smartCRMTopic, full: bool = False
+    ) -> int:
+        """
+        copy the rows of the given topic modified since the mirror watermark
+        - all rows for a full refresh
+
+        Returns:
+            int: the number of copied rows
+        """
+        self.create_table(connection, topic)
+        since = None if full else self.watermark(connection, topic)
+        columns = list(topic.dataclass.smartcrm_columns.values())
+        placeholders = ", ".join("?" for _column in columns)
+        insert = (
+            f"INSERT OR REPLACE INTO {topic.table_name} ({', '.join(columns)})"
+            f" VALUES ({placeholders})"
+        )
+        adapter = SmartCRMAdapter(topic=topic)
+        records = adapter.iter_db(
+            self.get_source(), batch_size=self.batch_size, since=since, lazy=True
+        )
+        count = 0
+        with connection:
+            if full:
+                connection.execute(f"DELETE FROM {topic.table_name}")
+            batch = []
+            for record in records:
+                batch.append(
+                    [self.to_sqlite_value(record.get(column)) for column in columns]
+                )
+                if len(batch) >= self.batch_size:
+                    connection.executemany(insert, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                connection.executemany(insert, batch)
+                count += len(batch)
+        return count
+
+    def refresh(self, full: bool = False) -> Dict[str, int]:
+        """
+        bring the mirror up to date with the source database
+
+        Args:
+            full (bool): if True copy all rows instead of the modified ones
+
+        Returns:
+            Dict[str, int]: the number of copied rows by topic name
+        """
+        with self.lock:
+            connection = sqlite3.connect(self.mirror_path)
+            connection.row_factory = sqlite3.Row
+            try:
+                counts = {}
+                for topic in self.topics:
+                    counts[topic.name] = self.copy_topic(connection, topic, full=full)
+                return counts
+            except Exception:
+                self.reset_source()
+                raise
+            finally:
+                connection.close()
+
+    def open(self) -> SQLiteDB:
+        """
+        get a database serving reads from the mirror
+        """
+        return SQLiteDB(self.mirror_path)
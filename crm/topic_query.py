@@ -0,0 +1,272 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class FieldFilter:
+    """
+    a condition on a dataclass field e.g. year_assignment = "2024"
+    """
+
+    field: str  # the dataclass field name e.g. invoice_date
+    op: str = "="  # one of TopicQueryBuilder.OPERATORS
+    value: Any = None  # a list of values for "in" - ignored for "is null"/"is not null"
+
+
+@dataclass
+class TopicQuery:
+    """
+    a filtered and sorted page request for the records of a topic
+
+    deep pages are requested with the after cursor of the previous page
+    instead of an offset so that the database does not skip the earlier rows -
+    the offset is only meant for jumps to pages without a known cursor
+    """
+
+    # the maximum limit of a query from an API request
+    MAX_LIMIT = 100
+
+    filters: List[FieldFilter] = field(default_factory=list)
+    sort_by: Optional[str] = None  # dataclass field name - default: the key
+    descending: bool = False
+    limit: int = 25
+    # (sort value, key value) of the last row of the previous page
+    after: Optional[Tuple[Any, Any]] = None
+    # the number of rows to skip after the cursor
+    offset: int = 0
+    # case insensitive substring filter on all mapped columns
+    text: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TopicQuery":
+        """
+        create a topic query from its JSON form e.g. an API request body
+
+        Raises:
+            TypeError: for a malformed filter or limit
+            ValueError: for a limit that is not a number
+        """
+        filters = [
+            FieldFilter(**field_filter) for field_filter in data.get("filters", [])
+        ]
+        after = data.get("after")
+        limit = int(data.get("limit", 25))
+        return cls(
+            filters=filters,
+            sort_by=data.get("sort_by"),
+            descending=data.get("descending", False),
+            limit=max(1, min(limit, cls.MAX_LIMIT)),
+            after=tuple(after) if after is not None else None,
+            text=data.get("text"),
+        )
+
+
+@dataclass
+class TopicPage:
+    """
+    a page of records as result of a TopicQuery
+    """
+
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    # the after cursor of the next page - None if this is the last page
+    after: Optional[Tuple[Any, Any]] = None
+
+
+class TopicQueryBuilder:
+    """
+    translates TopicQuerys on the dataclass fields of a topic into
+    parameterized SQL on the SmartCRM columns
+
+    only the mapped column names and the whitelisted operators get into the SQL text -
+    all values are passed as parameters
+    """
+
+    OPERATORS = {
+        "=": "=",
+        "!=": "<>",
+        "<": "<",
+        "<=": "<=",
+        ">": ">",
+        ">=": ">=",
+        "like": "LIKE",
+        "in": "IN",
+        "is null": "IS NULL",
+        "is not null": "IS NOT NULL",
+    }
+
+    def __init__(self, topic, select_query: str):
+        """
+        constructor
+
+        Args:
+            topic (smartCRMTopic): the topic to query
+            select_query (str): the SELECT ... FROM part of the queries
+        """
+        self.topic = topic
+        self.select_query = select_query
+        self.columns = topic.dataclass.smartcrm_columns
+
+    def column(self, field_name: str) -> str:
+        """
+        get the SmartCRM column of the given dataclass field
+
+        Raises:
+            ValueError: if the topic has no such field
+        """
+        column = self.columns.get(field_name)
+        if column is None:
+            raise ValueError(f"{self.topic.name} has no field {field_name}")
+        return column
+
+    def condition(self, field_filter: FieldFilter) -> Tuple[str, List[Any]]:
+        """
+        get the SQL condition and the parameters of the given filter
+
+        Raises:
+            ValueError: for an unknown field or operator
+        """
+        column = self.column(field_filter.field)
+        op = self.OPERATORS.get(field_filter.op.lower())
+        if op is None:
+            raise ValueError(f"unsupported operator {field_filter.op}")
+        if op in ("IS NULL", "IS NOT NULL"):
+            return f"{column} {op}", []
+        if op == "IN":
+            values = list(field_filter.value)
+            if not values:
+                # nothing can match an empty list
+                return "1 = 0", []
+            placeholders = ", ".join(["%s"] * len(values))
+            return f"{column} IN ({placeholders})", values
+        return f"{column} {op} %s", [field_filter.value]
+
+    def text_condition(self, text: str) -> Tuple[str, List[Any]]:
+        """
+        get the condition matching the rows with a mapped column containing the
+        given text - the LIKE wildcards of the text are escaped
+        """
+        pattern = text.lower()
+        for char in "!%_":
+            pattern = pattern.replace(char, f"!{char}")
+        columns = [
+            column
+            for column in self.columns.values()
+            if column not in self.topic.lazy_columns
+        ]
+        conditions = [f"LOWER({column}) LIKE %s ESCAPE '!'" for column in columns]
+        return "(" + " OR ".join(conditions) + ")", [f"%{pattern}%"] * len(columns)
+
+    def keyset_condition(
+        self, sort_column: str, descending: bool, after: Tuple[Any, Any]
+    ) -> Tuple[str, List[Any]]:
+        """
+        get the condition selecting the rows after the given cursor
+
+        NULL sort values come first in ascending and last in descending
+        order as in MySQL and SQLite
+        """
+        key_column = self.topic.key_column
+        sort_value, key_value = after
+        cmp = "<" if descending else ">"
+        if sort_column == key_column:
+            return f"{key_column} {cmp} %s", [key_value]
+        if sort_value is None:
+            condition = f"({sort_column} IS NULL AND {key_column} {cmp} %s)"
+            if not descending:
+                condition = f"({condition} OR {sort_column} IS NOT NULL)"
+            return condition, [key_value]
+        condition = (
+            f"({sort_column} {cmp} %s"
+            f" OR ({sort_column} = %s AND {key_column} {cmp} %s)"
+        )
+        if descending:
+            condition += f" OR {sort_column} IS NULL"
+        return condition + ")", [sort_value, sort_value, key_value]
+
+    def where(
+        self, topic_query: TopicQuery, with_cursor: bool = True
+    ) -> Tuple[str, List[Any]]:
+        """
+        get the WHERE clause and the parameters of the given query
+
+        Returns:
+            Tuple[str, List[Any]]: the clause - empty if there are no conditions - and the parameters
+        """
+        conditions = []
+        params = []
+        for field_filter in topic_query.filters:
+            condition, condition_params = self.condition(field_filter)
+            conditions.append(condition)
+            params.extend(condition_params)
+        if topic_query.text:
+            condition, condition_params = self.text_condition(topic_query.text)
+            conditions.append(condition)
+            params.extend(condition_params)
+        if with_cursor and topic_query.after is not None:
+            condition, condition_params = self.keyset_condition(
+                self.sort_column(topic_query),
+                topic_query.descending,
+                topic_query.after,
+            )
+            conditions.append(condition)
+            params.extend(condition_params)
+        if not conditions:
+            return "", params
+        return " WHERE " + " AND ".join(conditions), params
+
+    def sort_column(self, topic_query: TopicQuery) -> str:
+        """
+        get the column to sort the given query by
+        """
+        if topic_query.sort_by is None:
+            return self.topic.key_column
+        return self.column(topic_query.sort_by)
+
+    def build(self, topic_query: TopicQuery) -> Tuple[str, tuple]:
+        """
+        get the SQL and the parameters for a page of the given query
+
+        the key column is added to the sort order to make it total so that
+        the keyset cursor of the last row addresses the next page exactly
+
+        Returns:
+            Tuple[str, tuple]: the query and its parameters
+        """
+        where, params = self.where(topic_query)
+        sort_column = self.sort_column(topic_query)
+        key_column = self.topic.key_column
+        direction = " DESC" if topic_query.descending else ""
+        order_by = f" ORDER BY {sort_column}{direction}"
+        if sort_column != key_column:
+            order_by += f", {key_column}{direction}"
+        sql = f"{self.select_query}{where}{order_by} LIMIT %s"
+        params.append(topic_query.limit)
+        if topic_query.offset:
+            sql += " OFFSET %s"
+            params.append(topic_query.offset)
+        return sql, tuple(params)
+
+    def build_count(self, topic_query: TopicQuery) -> Tuple[str, tuple]:
+        """
+        get the SQL and the parameters counting all records matching the filters
+        """
+        where, params = self.where(topic_query, with_cursor=False)
+        sql = f"SELECT COUNT(*) AS count FROM {self.topic.table_name}{where}"
+        return sql, tuple(params)
+
+    def cursor(
+        self, topic_query: TopicQuery, rows: List[Dict[str, Any]]
+    ) -> Optional[Tuple[Any, Any]]:
+        """
+        get the after cursor of the page following the given rows
+        """
+        if len(rows) < topic_query.limit or not rows:
+            return None
+        last = rows[-1]
+        return (last[self.sort_column(topic_query)], last[self.topic.key_column])
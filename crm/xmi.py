@@ -5,13 +5,28 @@ Created on 2024-01-14
 """
 
 import json
+import os
+import re
 import textwrap
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
 
 from dataclasses_json import dataclass_json
 
 
+def as_list(value) -> List:
+    """
+    get the given child value of an XMI JSON node as a list - xq converts
+    a single child element to a dict and an empty element to None
+    """
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
 @dataclass_json
 @dataclass
 class TaggedValue:
@@ -98,13 +113,20 @@ class ModelElement:
             documentation=node.get("Documentation"),
         )
         element.parent = parent
+        element.add_tagged_values(node.get("taggedValues"))
+        return element
 
-        for tv_list in node.get("taggedValues", {}).values():
-            for tv in tv_list:
-                tagged_value = TaggedValue.from_xmi_dict(tv)
-                element.tagged_values[tagged_value.name] = tagged_value
+    def add_tagged_values(self, tagged_values: Optional[Dict]):
+        """
+        add the given tagged values
 
-        return element
+        Args:
+            tagged_values (Dict): the content of a taggedValues node
+        """
+        for tv_list in (tagged_values or {}).values():
+            for tv in as_list(tv_list):
+                tagged_value = TaggedValue.from_xmi_dict(tv)
+                self.tagged_values[tagged_value.name] = tagged_value
 
     def as_plantuml(self, _indentation=""):
         return ""
@@ -152,11 +174,9 @@ class Operation(ModelElement):
         operation.is_abstract = node.get("@isAbstract")
 
         # Process parameters
-        for param_list in node.get("parameters", {}).values():
-            # return parameter
-            if isinstance(param_list, dict):
-                param_list = [param_list]
-            for param in param_list:
+        for param_list in (node.get("parameters") or {}).values():
+            # a single return parameter is not a list
+            for param in as_list(param_list):
                 parameter = Parameter.from_xmi_dict(operation, param)
                 operation.parameters[parameter.name] = parameter
 
@@ -212,6 +232,31 @@ class Role(ModelElement):
         role.itemid = node.get("@itemid")
         return role
 
+    def as_plantuml_relation(self, indentation="") -> str:
+        """
+        Generate the PlantUML relation line for this Role.
+
+        Args:
+            indentation (str): Indentation for the PlantUML code.
+
+        Returns:
+            str: The PlantUML relation between the owning class and the role type.
+        """
+        l_multi = ""
+        r_multi = ""
+        multi = self.multiplicity
+        if multi:
+            multi_parts = multi.split("..")
+            if len(multi_parts) == 2:
+                l_multi, r_multi = multi_parts
+                r_multi = f'"{r_multi}"'
+            else:
+                l_multi = multi_parts[0]
+            l_multi = f'"{l_multi}"'
+
+        relation_plantuml = f"{self.parent.short_name} {l_multi} -- {r_multi} {self.type} : {self.short_name}"
+        return f"{indentation} {relation_plantuml}\n"
+
 
 @dataclass_json
 @dataclass
@@ -229,23 +274,19 @@ class Class(ModelElement):
         class_.roles = {}
         class_.is_abstract = node.get("@isAbstract")
         # Process attributes
-        for attr_list in node.get("attributes", {}).values():
-            for attr in attr_list:
+        for attr_list in (node.get("attributes") or {}).values():
+            for attr in as_list(attr_list):
                 attribute = Attribute.from_xmi_dict(class_, attr)
                 class_.attributes[attribute.name] = attribute
 
         # Process operations
-        for op_list in node.get("operations", {}).values():
-            if isinstance(op_list, dict):
-                op_list = [op_list]
-            for op in op_list:
+        for op_list in (node.get("operations") or {}).values():
+            for op in as_list(op_list):
                 operation = Operation.from_xmi_dict(class_, op)
                 class_.operations[operation.name] = operation
 
-        for role_list in node.get("roles", {}).values():
-            if isinstance(role_list, dict):
-                role_list = [role_list]
-            for role_node in role_list:
+        for role_list in (node.get("roles") or {}).values():
+            for role_node in as_list(role_list):
                 role = Role.from_xmi_dict(class_, role_node)
                 class_.roles[role.name] = role
         return class_
@@ -269,7 +310,19 @@ class Class(ModelElement):
         Returns:
             str: The PlantUML representation for this Class and its contents.
         """
-        plantuml = f"{indentation}class {self.short_name} {{\n"
+        return "".join(self.iter_plantuml(indentation))
+
+    def iter_plantuml(self, indentation: str = "") -> Iterator[str]:
+        """
+        Generate the PlantUML representation for this Class in chunks.
+
+        Args:
+            indentation (str): Indentation for the PlantUML code.
+
+        Yields:
+            str: the next chunk of the PlantUML representation
+        """
+        yield f"{indentation}class {self.short_name} {{\n"
 
         # Add attributes
         for _attr_name, attr in self.attributes.items():
@@ -277,19 +330,18 @@ class Class(ModelElement):
             if "enum" in attr_type:
                 attr_type = "enum"
             # [[{{{attr.documentation}}} {attr.short_name} ]]
-            plantuml += f"{indentation}  {attr.short_name}: {attr_type}\n"
+            yield f"{indentation}  {attr.short_name}: {attr_type}\n"
 
         # Add operations
         for _op_name, op in self.operations.items():
             operation_plantuml = op.as_plantuml(indentation + "  ")
-            plantuml += f"{operation_plantuml}\n"
+            yield f"{operation_plantuml}\n"
 
-        plantuml += f"{indentation}}}\n"
-        plantuml += f"""note top of {self.short_name}
+        yield f"{indentation}}}\n"
+        yield f"""note top of {self.short_name}
 {self.multi_line_doc(40)}
 end note
 """
-        return plantuml
 
 
 @dataclass_json
@@ -320,18 +372,25 @@ class Package(ModelElement):
         package.packages = {}
         package.packages_by_name = {}
         # Process classes
-        for cl_list in pnode.get("classes", {}).values():
-            for cl in cl_list:
+        for cl_list in (pnode.get("classes") or {}).values():
+            for cl in as_list(cl_list):
                 class_ = Class.from_xmi_dict(package, cl)
                 package.classes[class_.name] = class_
 
         # Process sub-packages
-        for sp in pnode.get("packages", {}).values():
-            sub_package = Package.from_xmi_dict(package, sp)
-            package.packages[sub_package.id] = sub_package
-            package.packages_by_name[sub_package.name] = sub_package
+        for sp_list in (pnode.get("packages") or {}).values():
+            for sp in as_list(sp_list):
+                sub_package = Package.from_xmi_dict(package, sp)
+                package.add_package(sub_package)
         return package
 
+    def add_package(self, sub_package: "Package"):
+        """
+        add the given sub package
+        """
+        self.packages[sub_package.id] = sub_package
+        self.packages_by_name[sub_package.name] = sub_package
+
     def add_to_lookup(self, lookup: Dict):
         super().add_to_lookup(lookup)  # Add the package itself
         for sub_package in self.packages.values():  # Add all sub-packages
@@ -339,6 +398,14 @@ class Package(ModelElement):
         for class_ in self.classes.values():  # Add all classes
             class_.add_to_lookup(lookup)
 
+    def iter_packages(self) -> Iterator["Package"]:
+        """
+        get this package and all its sub-packages depth first
+        """
+        yield self
+        for sub_package in self.packages.values():
+            yield from sub_package.iter_packages()
+
     def as_plantuml(self, indentation="") -> str:
         """
         Generate PlantUML representation for this Package and its contents.
@@ -349,32 +416,45 @@ class Package(ModelElement):
         Returns:
             str: The PlantUML representation for this Package and its contents.
         """
-        plantuml = f"{indentation}package {self.short_name} {{\n"
+        return "".join(self.iter_plantuml(indentation))
+
+    def iter_plantuml(self, indentation="", recursive: bool = True) -> Iterator[str]:
+        """
+        Generate the PlantUML representation for this Package in chunks.
+
+        Args:
+            indentation (str): Indentation for the PlantUML code.
+            recursive (bool): if True include the sub-packages
+
+        Yields:
+            str: the next chunk of the PlantUML representation
+        """
+        yield f"{indentation}package {self.short_name} {{\n"
 
         # Add classes within the package
         for _class_name, class_obj in self.classes.items():
-            class_plantuml = class_obj.as_plantuml(indentation + "  ")
-            plantuml += f"{class_plantuml}\n"
+            yield from class_obj.iter_plantuml(indentation + "  ")
+            yield "\n"
 
         # Add sub-packages within the package
-        for _sub_package_name, sub_package_obj in self.packages.items():
-            sub_package_plantuml = sub_package_obj.as_plantuml(indentation + "  ")
-            plantuml += f"{sub_package_plantuml}\n"
+        if recursive:
+            for _sub_package_name, sub_package_obj in self.packages.items():
+                yield from sub_package_obj.iter_plantuml(indentation + "  ")
+                yield "\n"
 
-        plantuml += f"{indentation}}}\n"
-        plantuml += f"""note top of {self.short_name}
+        yield f"{indentation}}}\n"
+        yield f"""note top of {self.short_name}
 {self.documentation}
 end note
 """
-        return plantuml
 
 
 @dataclass_json
 @dataclass
 class Model(Package):
     """
-    Model with option to read from
-    XMI files which have been converted to JSON
+    Model with option to read from XMI files
+    or XMI files which have been converted to JSON
     """
 
     @classmethod
@@ -405,42 +485,160 @@ class Model(Package):
         model.create_lookup()
         return model
 
+    @classmethod
+    def from_xmi_xml(cls, file_path: str) -> "Model":
+        """
+        read the XMI file directly - streaming its XML
+
+        Args:
+            file_path (str): the file_path to read from
+
+        Returns:
+            Model: the Model instance
+        """
+        from crm.xmi_reader import XmiXmlReader
+
+        model = XmiXmlReader(file_path, model_class=cls).read()
+        model.create_lookup()
+        return model
+
+    @classmethod
+    def from_xmi(cls, file_path: str) -> "Model":
+        """
+        read the given XMI file or XMI JSON file depending on its extension
+
+        Args:
+            file_path (str): the file_path to read from
+
+        Returns:
+            Model: the Model instance
+        """
+        if file_path.endswith(".json"):
+            return cls.from_xmi_json(file_path)
+        return cls.from_xmi_xml(file_path)
+
     def create_lookup(self):
         """
-        create the lookup dict
+        create the lookup dict and the secondary indexes
         """
         self.lookup = {}
         self.add_to_lookup(self.lookup)
+        self.create_indexes()
 
-    def as_plantuml(self, indentation=""):
-        plant_uml = super().as_plantuml(indentation)
-        for _model_id, element in self.lookup.items():
+    def create_indexes(self):
+        """
+        create the indexes by short name, stereotype and type as well as the
+        incoming and outgoing roles of the classes from the lookup
+        """
+        self.by_short_name: Dict[str, List[ModelElement]] = {}
+        self.by_stereotype: Dict[str, List[ModelElement]] = {}
+        self.by_type: Dict[str, List[ModelElement]] = {}
+        self.classes_by_name: Dict[str, Class] = {}
+        self.role_targets: Dict[str, Class] = {}
+        self.incoming: Dict[str, List[Role]] = {}
+        self.outgoing: Dict[str, List[Role]] = {}
+        roles = []
+        for element in self.lookup.values():
+            self.by_short_name.setdefault(element.short_name, []).append(element)
+            if element.stereotype:
+                self.by_stereotype.setdefault(element.stereotype, []).append(element)
+            if isinstance(element, (Attribute, Role)) and element.type:
+                self.by_type.setdefault(element.type, []).append(element)
+            if isinstance(element, Class):
+                self.classes_by_name[element.name] = element
+                self.outgoing[element.id] = list(element.roles.values())
+            elif isinstance(element, Role):
+                roles.append(element)
+        for role in roles:
+            target = self.find_class(role.type)
+            if target is not None:
+                self.role_targets[role.id] = target
+                self.incoming.setdefault(target.id, []).append(role)
+
+    def find_by_short_name(
+        self, short_name: str, element_class: type = ModelElement
+    ) -> List[ModelElement]:
+        """
+        get the elements with the given short name
 
-            if isinstance(element, Role):
-                l_multi = ""
-                r_multi = ""
-                multi = element.multiplicity
-                if multi:
-                    multi_parts = multi.split("..")
-                    if len(multi_parts) == 2:
-                        l_multi, r_multi = multi_parts
-                        r_multi = f'"{r_multi}"'
-                    else:
-                        l_multi = multi_parts[0]
-                    l_multi = f'"{l_multi}"'
-
-                relation_plantuml = f"{element.parent.short_name} {l_multi} -- {r_multi} {element.type} : {element.short_name}"
-                plant_uml += f"{indentation} {relation_plantuml}\n"
-        return plant_uml
+        Args:
+            short_name (str): the short name e.g. "Organisation"
+            element_class (type): only get elements of this class e.g. Class
+        """
+        elements = self.by_short_name.get(short_name, [])
+        return [element for element in elements if isinstance(element, element_class)]
 
-    def to_plant_uml(self) -> str:
+    def find_by_stereotype(self, stereotype: str) -> List[ModelElement]:
         """
-        Generate a PlantUML representation of the model.
+        get the elements with the given stereotype
+        """
+        return self.by_stereotype.get(stereotype, [])
+
+    def find_by_type(self, type_name: str) -> List[ModelElement]:
+        """
+        get the attributes and roles of the given type
+        """
+        return self.by_type.get(type_name, [])
+
+    def find_class(self, name: str) -> Optional[Class]:
+        """
+        get the class with the given id, qualified name or unique short name
+
+        Args:
+            name (str): e.g. the type of a Role
 
         Returns:
-            str: The PlantUML string.
+            Optional[Class]: the class or None if there is no or no unique class
+        """
+        if name is None:
+            return None
+        element = self.lookup.get(name)
+        if isinstance(element, Class):
+            return element
+        class_ = self.classes_by_name.get(name)
+        if class_ is None:
+            classes = self.find_by_short_name(ModelElement.as_short_name(name), Class)
+            if len(classes) == 1:
+                class_ = classes[0]
+        return class_
+
+    def target_class(self, role: Role) -> Optional[Class]:
+        """
+        get the class the given role refers to
+        """
+        return self.role_targets.get(role.id)
+
+    def incoming_roles(self, class_: Class) -> List[Role]:
         """
-        skinparams = """
+        get the roles of other classes referring to the given class
+        """
+        return self.incoming.get(class_.id, [])
+
+    def outgoing_roles(self, class_: Class) -> List[Role]:
+        """
+        get the roles of the given class
+        """
+        return self.outgoing.get(class_.id, [])
+
+    def as_plantuml(self, indentation=""):
+        return "".join(self.iter_plantuml(indentation))
+
+    def iter_plantuml(self, indentation="", recursive: bool = True) -> Iterator[str]:
+        yield from super().iter_plantuml(indentation, recursive)
+        yield from self.iter_relations(self.lookup.values(), indentation)
+
+    @classmethod
+    def iter_relations(
+        cls, elements: Iterable[ModelElement], indentation=""
+    ) -> Iterator[str]:
+        """
+        Generate the PlantUML relations for the roles among the given elements.
+        """
+        for element in elements:
+            if isinstance(element, Role):
+                yield element.as_plantuml_relation(indentation)
+
+    SKINPARAMS = """
 ' BITPlan Corporate identity skin params
 ' Copyright (c) 2015-2024 BITPlan GmbH
 ' see http://wiki.bitplan.com/PlantUmlSkinParams#BITPlanCI
@@ -519,8 +717,113 @@ skinparam object {
 }
 hide circle
 ' end of skinparams '"""
-        plant_uml = "@startuml\n"
-        plant_uml += f"{skinparams}\n"
-        plant_uml += self.as_plantuml("")
-        plant_uml += "@enduml"
-        return plant_uml
+
+    def iter_plant_uml(self, package: Package = None) -> Iterator[str]:
+        """
+        Generate a PlantUML diagram in chunks.
+
+        Args:
+            package (Package): if given only the classes of this package and
+                their relations are included - default: the whole model
+
+        Yields:
+            str: the next chunk of the diagram
+        """
+        yield "@startuml\n"
+        yield f"{self.SKINPARAMS}\n"
+        if package is None:
+            yield from self.iter_plantuml("")
+        else:
+            yield from package.iter_plantuml("", recursive=False)
+            for class_ in package.classes.values():
+                yield from self.iter_relations(class_.roles.values())
+        yield "@enduml"
+
+    def to_plant_uml(self) -> str:
+        """
+        Generate a PlantUML representation of the model.
+
+        Returns:
+            str: The PlantUML string.
+        """
+        return "".join(self.iter_plant_uml())
+
+    def write_plant_uml(self, stream: TextIO, package: Package = None):
+        """
+        Write a PlantUML diagram to the given stream chunk by chunk.
+
+        Args:
+            stream (TextIO): the stream to write to
+            package (Package): the package to restrict the diagram to - default: the whole model
+        """
+        for chunk in self.iter_plant_uml(package):
+            stream.write(chunk)
+
+    def save_plant_uml(self, file_path: str, package: Package = None) -> str:
+        """
+        Save a PlantUML diagram to the given file.
+
+        Returns:
+            str: the file path
+        """
+        with open(file_path, "w", encoding="utf-8") as puml_file:
+            self.write_plant_uml(puml_file, package)
+        return file_path
+
+    @classmethod
+    def package_path(cls, package: Package) -> List[str]:
+        """
+        get the short names of the given package and its parents from the root
+        e.g. ["Logical View", "smartCRM"] for Logical View::smartCRM
+        """
+        path = []
+        element = package
+        while element is not None:
+            path.insert(0, element.short_name)
+            element = element.parent
+        return path
+
+    @classmethod
+    def plant_uml_file_name(cls, package: Package) -> str:
+        """
+        get the file name for the diagram of the given package from its package path
+        e.g. Logical_View.smartCRM.puml for Logical View::smartCRM
+        """
+        names = [re.sub(r"[^\w-]+", "_", name) for name in cls.package_path(package)]
+        return f"{'.'.join(names)}.puml"
+
+    def save_plant_uml_packages(
+        self, output_dir: str, parallel: bool = True, max_workers: int = None
+    ) -> Dict[str, str]:
+        """
+        Save a separate PlantUML diagram for each package with classes.
+
+        Args:
+            output_dir (str): the directory for the diagram files
+            parallel (bool): if True render the diagrams in a thread pool
+            max_workers (int): the maximum number of threads - default: see ThreadPoolExecutor
+
+        Returns:
+            Dict[str, str]: the file paths by qualified package path
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        packages = [package for package in self.iter_packages() if package.classes]
+        file_paths = []
+        for package in packages:
+            file_name = self.plant_uml_file_name(package)
+            stem, ext = os.path.splitext(file_name)
+            index = 1
+            while os.path.join(output_dir, file_name) in file_paths:
+                index += 1
+                file_name = f"{stem}_{index}{ext}"
+            file_paths.append(os.path.join(output_dir, file_name))
+        if parallel:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(self.save_plant_uml, file_paths, packages))
+        else:
+            for file_path, package in zip(file_paths, packages):
+                self.save_plant_uml(file_path, package)
+        return {
+            "::".join(self.package_path(package)): file_path
+            for package, file_path in zip(packages, file_paths)
+        }
@@ -0,0 +1,162 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from crm.xmi import Model
+
+
+@dataclass
+class SourceKey:
+    """
+    identifies the content of a model source file
+    """
+
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: Optional[str] = None
+
+    @classmethod
+    def of(cls, path: str) -> "SourceKey":
+        """
+        get the key of the given file without hashing it
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        return cls(path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+    def same_stat(self, other: "SourceKey") -> bool:
+        return (self.path, self.size, self.mtime_ns) == (
+            other.path,
+            other.size,
+            other.mtime_ns,
+        )
+
+    def hash_content(self) -> str:
+        """
+        compute the SHA-256 of the file content
+        """
+        digest = hashlib.sha256()
+        with open(self.path, "rb") as source_file:
+            for chunk in iter(lambda: source_file.read(1 << 20), b""):
+                digest.update(chunk)
+        self.sha256 = digest.hexdigest()
+        return self.sha256
+
+
+class XmiModelCache:
+    """
+    binary cache of parsed XMI models
+
+    a cache file holds the key of its source followed by the pickled model
+    so that the key can be checked before the model is loaded - an unchanged
+    size and mtime are trusted, otherwise the content hash decides whether the
+    model has to be parsed again
+    """
+
+    # increase when the pickled model classes change incompatibly
+    VERSION = 2
+
+    def __init__(
+        self,
+        cache_dir: str = None,
+        parse: Callable[[str], Model] = Model.from_xmi,
+    ):
+        """
+        constructor
+
+        Args:
+            cache_dir (str): the directory of the cache files - default: ~/.smartcrm/cache
+            parse (Callable): parses a source file into a Model
+        """
+        if cache_dir is None:
+            cache_dir = f"{Path.home()}/.smartcrm/cache"
+        self.cache_dir = cache_dir
+        self.parse = parse
+        self.hits = 0
+        self.misses = 0
+
+    def cache_path(self, source_path: str) -> str:
+        """
+        get the path of the cache file for the given source file
+        """
+        name = hashlib.sha1(os.path.abspath(source_path).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.xmi.pickle")
+
+    def read(self, cache_path: str, key: SourceKey) -> Optional[Model]:
+        """
+        read the cached model if it was parsed from the source with the given key
+
+        Returns:
+            Optional[Model]: the model or None if there is no valid cache file
+        """
+        try:
+            with open(cache_path, "rb") as cache_file:
+                version, cached_key = pickle.load(cache_file)
+                if version != self.VERSION or cached_key.path != key.path:
+                    return None
+                if not cached_key.same_stat(key):
+                    # e.g. touched or copied - compare the content
+                    if cached_key.sha256 != key.hash_content():
+                        return None
+                    stat_changed = True
+                else:
+                    key.sha256 = cached_key.sha256
+                    stat_changed = False
+                model = pickle.load(cache_file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return None
+        if stat_changed:
+            self.write(cache_path, key, model)
+        return model
+
+    def write(self, cache_path: str, key: SourceKey, model: Model):
+        """
+        write the given model atomically to the given cache file
+        """
+        if key.sha256 is None:
+            key.hash_content()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as cache_file:
+                pickle.dump((self.VERSION, key), cache_file, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(model, cache_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self, source_path: str) -> Model:
+        """
+        get the model of the given source file from the cache - parsing
+        and caching it if the source is new or changed
+
+        Args:
+            source_path (str): the path of the XMI or XMI JSON file
+
+        Returns:
+            Model: the model with its lookup
+        """
+        key = SourceKey.of(source_path)
+        cache_path = self.cache_path(source_path)
+        model = self.read(cache_path, key)
+        if model is not None:
+            self.hits += 1
+            return model
+        self.misses += 1
+        # hash before parsing so that a concurrent change is detected on the next load
+        key.hash_content()
+        model = self.parse(source_path)
+        self.write(cache_path, key, model)
+        return model
@@ -0,0 +1,151 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Type, Union
+
+from crm.xmi import Class, Model, Package
+
+
+class XmiXmlReader:
+    """
+    reads an XMI file into a Model by streaming its XML
+
+    the elements are interpreted the way xq converts them to JSON so that
+    the Model is the same as the one read via Model.from_xmi_json:
+    attributes become "@name" keys, text only elements strings and
+    repeated child elements lists
+
+    each class is converted when its end tag has been parsed and its
+    elements are released afterwards so that only the model and the XML of
+    the current class are held in memory
+    """
+
+    def __init__(self, xml_path: str, model_class: Type[Model] = Model):
+        """
+        constructor
+
+        Args:
+            xml_path (str): the path of the XMI file
+            model_class (Type[Model]): the class of the top level package
+        """
+        self.xml_path = xml_path
+        self.model_class = model_class
+
+    @classmethod
+    def local_name(cls, name: str) -> str:
+        """
+        get the given tag or attribute name without its namespace
+        """
+        return name.rsplit("}", 1)[-1]
+
+    @classmethod
+    def attributes(cls, elem: ET.Element) -> Dict[str, str]:
+        return {f"@{cls.local_name(key)}": value for key, value in elem.attrib.items()}
+
+    @classmethod
+    def text(cls, elem: ET.Element) -> Optional[str]:
+        text = (elem.text or "").strip()
+        return text or None
+
+    @classmethod
+    def to_dict(cls, elem: ET.Element) -> Union[Dict, str, None]:
+        """
+        convert the given element the way xq does
+
+        Returns:
+            Union[Dict, str, None]: a dict, the text of a text only
+            element or None for an empty element
+        """
+        node = cls.attributes(elem)
+        for child in elem:
+            key = cls.local_name(child.tag)
+            value = cls.to_dict(child)
+            if key not in node:
+                node[key] = value
+            elif isinstance(node[key], list):
+                node[key].append(value)
+            else:
+                node[key] = [node[key], value]
+        text = cls.text(elem)
+        if text is not None:
+            if not node:
+                return text
+            node["#text"] = text
+        return node or None
+
+    def read(self) -> Model:
+        """
+        read the model
+
+        Returns:
+            Model: the model - without lookup
+
+        Raises:
+            ValueError: if the root element is not a Package
+        """
+        model = None
+        # the open elements
+        path: List[ET.Element] = []
+        # the packages being read and their elements
+        packages: List[Package] = []
+        package_elems: List[ET.Element] = []
+        # the class element being read
+        class_elem = None
+        for event, elem in ET.iterparse(self.xml_path, events=("start", "end")):
+            tag = self.local_name(elem.tag)
+            if event == "start":
+                parent_elem = path[-1] if path else None
+                path.append(elem)
+                if class_elem is not None:
+                    continue
+                if parent_elem is None:
+                    if tag != "Package":
+                        raise ValueError(
+                            f"{self.xml_path}: expected a Package root element but found {tag}"
+                        )
+                    container = "packages"
+                elif len(path) >= 3 and path[-3] is package_elems[-1]:
+                    # <Package><packages><Package> or <Package><classes><Class>
+                    container = self.local_name(parent_elem.tag)
+                else:
+                    container = None
+                if tag == "Package" and container == "packages":
+                    package_class = self.model_class if not packages else Package
+                    parent = packages[-1] if packages else None
+                    package = package_class.from_xmi_dict(parent, self.attributes(elem))
+                    packages.append(package)
+                    package_elems.append(elem)
+                elif tag == "Class" and container == "classes":
+                    class_elem = elem
+                continue
+            path.pop()
+            if class_elem is not None and elem is not class_elem:
+                continue
+            package = packages[-1] if packages else None
+            if elem is class_elem:
+                class_ = Class.from_xmi_dict(package, self.to_dict(elem))
+                package.classes[class_.name] = class_
+                class_elem = None
+            elif package_elems and elem is package_elems[-1]:
+                packages.pop()
+                package_elems.pop()
+                if packages:
+                    packages[-1].add_package(package)
+                else:
+                    model = package
+            elif path and path[-1] is package_elems[-1]:
+                if tag == "Documentation":
+                    package.documentation = self.text(elem)
+                elif tag == "taggedValues":
+                    package.add_tagged_values(self.to_dict(elem))
+            else:
+                continue
+            # release the XML of the converted element
+            elem.clear()
+            if path:
+                path[-1].remove(elem)
+        return model
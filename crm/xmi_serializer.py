@@ -0,0 +1,181 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import dataclasses
+import json
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from crm.xmi import (
+    Attribute,
+    Class,
+    Model,
+    ModelElement,
+    Operation,
+    Package,
+    Parameter,
+    Role,
+    TaggedValue,
+)
+
+
+@dataclass
+class ElementSpec:
+    """
+    the precompiled serialization of a ModelElement class
+
+    a record is the list of the values of the scalar fields followed by
+    the tagged values as [name, value] pairs and a list of child records
+    for each child dict
+    """
+
+    element_class: Type[ModelElement]
+    # the child dict fields with the spec of their elements and the key attribute
+    children: List[Tuple[str, "ElementSpec", str]] = field(default_factory=list)
+
+    def __post_init__(self):
+        child_names = {name for name, _spec, _key in self.children}
+        self.names = [
+            f.name
+            for f in dataclasses.fields(self.element_class)
+            if f.name != "tagged_values" and f.name not in child_names
+        ]
+        self.get_values: Callable[[ModelElement], Tuple] = attrgetter(*self.names)
+
+
+class ModelSerializer:
+    """
+    compact JSON serialization of Models
+
+    unlike dataclasses_json the fields are not inspected per element
+    but once per class and the elements are written as positional
+    records - loading restores the parent links, the packages_by_name
+    dicts, the lookup and the indexes
+    """
+
+    FORMAT = "smartcrm-xmi"
+    VERSION = 1
+
+    def __init__(self, model_class: Type[Model] = Model):
+        """
+        constructor
+
+        Args:
+            model_class (Type[Model]): the class of the loaded models
+        """
+        parameter = ElementSpec(Parameter)
+        attribute = ElementSpec(Attribute)
+        operation = ElementSpec(Operation, [("parameters", parameter, "name")])
+        role = ElementSpec(Role)
+        class_ = ElementSpec(
+            Class,
+            [
+                ("attributes", attribute, "name"),
+                ("operations", operation, "name"),
+                ("roles", role, "name"),
+            ],
+        )
+        package = ElementSpec(Package, [("classes", class_, "name")])
+        package.children.insert(0, ("packages", package, "id"))
+        self.model_spec = ElementSpec(model_class, package.children)
+        self.specs = [parameter, attribute, operation, role, class_, package]
+
+    def fields(self) -> Dict[str, List[str]]:
+        """
+        get the names of the scalar fields by class name
+        """
+        return {
+            spec.element_class.__name__: spec.names
+            for spec in self.specs + [self.model_spec]
+        }
+
+    def to_record(self, element: ModelElement, spec: ElementSpec) -> List:
+        record = list(spec.get_values(element))
+        record.append([[tv.name, tv.value] for tv in element.tagged_values.values()])
+        for field_name, child_spec, _key in spec.children:
+            record.append(
+                [
+                    self.to_record(child, child_spec)
+                    for child in getattr(element, field_name).values()
+                ]
+            )
+        return record
+
+    def from_record(
+        self, record: List, spec: ElementSpec, parent: ModelElement
+    ) -> ModelElement:
+        # the values are restored directly - bypassing the dataclass constructor
+        element = spec.element_class.__new__(spec.element_class)
+        element.__dict__.update(zip(spec.names, record))
+        n = len(spec.names)
+        element.tagged_values = {
+            name: TaggedValue(name=name, value=value) for name, value in record[n]
+        }
+        element.parent = parent
+        for i, (field_name, child_spec, key) in enumerate(spec.children, n + 1):
+            children = {}
+            for child_record in record[i]:
+                child = self.from_record(child_record, child_spec, element)
+                children[getattr(child, key)] = child
+            setattr(element, field_name, children)
+        if isinstance(element, Package):
+            element.packages_by_name = {
+                package.name: package for package in element.packages.values()
+            }
+        return element
+
+    def to_dict(self, model: Model) -> Dict[str, Any]:
+        return {
+            "format": self.FORMAT,
+            "version": self.VERSION,
+            "fields": self.fields(),
+            "model": self.to_record(model, self.model_spec),
+        }
+
+    def from_dict(self, data: Dict[str, Any]) -> Model:
+        """
+        get the model from the given serialized data
+
+        Raises:
+            ValueError: if the data has another format or fields
+        """
+        if data.get("format") != self.FORMAT or data.get("version") != self.VERSION:
+            raise ValueError(
+                f"expected {self.FORMAT} version {self.VERSION} but got {data.get('format')} version {data.get('version')}"
+            )
+        if data.get("fields") != self.fields():
+            raise ValueError(f"the fields of {self.FORMAT} data do not match")
+        model = self.from_record(data["model"], self.model_spec, None)
+        model.create_lookup()
+        return model
+
+    def dumps(self, model: Model, indent: int = None) -> str:
+        """
+        serialize the given model to JSON
+        """
+        separators = (",", ":") if indent is None else None
+        return json.dumps(
+            self.to_dict(model),
+            indent=indent,
+            separators=separators,
+            ensure_ascii=False,
+        )
+
+    def loads(self, text: str) -> Model:
+        """
+        get the model from the given JSON
+        """
+        return self.from_dict(json.loads(text))
+
+    def save(self, model: Model, file_path: str) -> str:
+        with open(file_path, "w", encoding="utf-8") as json_file:
+            json_file.write(self.dumps(model))
+        return file_path
+
+    def load(self, file_path: str) -> Model:
+        with open(file_path, "r", encoding="utf-8") as json_file:
+            return self.loads(json_file.read())
@@ -0,0 +1,268 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import json
+import os
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from ngwidgets.basetest import Basetest
+
+from crm.benchmark.synthetic_data import SyntheticDataGenerator
+from crm.smartcrm_adapter import SmartCRMAdapter
+from crm.sqlite_db import SQLiteDB
+from crm.xmi import Model
+
+
+class FakeDB:
+    """
+    stand in for crm.db.DB serving rows per table with a simulated latency
+    """
+
+    def __init__(self, tables: dict, latency: float = 0.0):
+        self.tables = tables
+        self.latency = latency
+
+    def iter_query(self, query: str, batch_size: int = 1000, params=None):
+        select, _, where = query.partition(" WHERE ")
+        table_name = select.split()[-1]
+        time.sleep(self.latency)
+        rows = self.tables.get(table_name, [])
+        if params:
+            # column >= %s
+            column = where.split()[0]
+            rows = [row for row in rows if row[column] >= params[0]]
+        yield from rows
+
+    def table_columns(self, table_name: str):
+        rows = self.tables.get(table_name, [])
+        return list(rows[0]) if rows else []
+
+    def execute_query(self, query: str, params=None):
+        # only SELECT COUNT(*) AS count FROM <table> is supported
+        table_name = query.split()[-1]
+        return [{"count": len(self.tables.get(table_name, []))}]
+
+
+class CountingDB(SQLiteDB):
+    """
+    SQLiteDB counting the queries
+    """
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path)
+        self.queries = 0
+
+    def iter_query(self, query: str, batch_size: int = 1000, params=None):
+        self.queries += 1
+        return super().iter_query(query, batch_size=batch_size, params=params)
+
+
+class PageCountingDB(CountingDB):
+    """
+    CountingDB also counting the page queries
+    """
+
+    def execute_query(self, query: str, params=None, connection=None):
+        if connection is None:
+            self.queries += 1
+        return super().execute_query(query, params, connection=connection)
+
+
+class XmiSample:
+    """
+    a small SmartCRM like model in the xq converted XMI JSON form
+    """
+
+    @classmethod
+    def attribute(cls, class_name: str, name: str, type_: str = "String") -> dict:
+        return {
+            "@name": f"Logical View::smartCRM::{class_name}::{name}",
+            "@id": f"{class_name}.{name}",
+            "@visibility": "private",
+            "@type": type_,
+            "Documentation": f"the {name} of the {class_name}",
+        }
+
+    @classmethod
+    def util_package(cls, class_count: int = 1) -> dict:
+        """
+        get a package whose single children are not wrapped in lists
+        """
+        classes = []
+        for i in range(class_count):
+            name = f"Util{i}" if i else "Util"
+            classes.append(
+                {
+                    "@name": f"Logical View::util::{name}",
+                    "@id": name,
+                    "@isAbstract": "true",
+                    "Documentation": f"helper {i}",
+                    "taggedValues": {"TaggedValue": {"@name": "generated"}},
+                    "attributes": {"Attribute": cls.attribute(name, "id", "int")},
+                }
+            )
+        return {
+            "@name": "Logical View::util",
+            "@id": "util",
+            "Documentation": None,
+            "classes": {"Class": classes[0] if class_count == 1 else classes},
+        }
+
+    @classmethod
+    def data(cls, util_class_count: int = 1) -> dict:
+        """
+        get the sample model
+
+        Args:
+            util_class_count (int): the number of classes of the util package
+        """
+        organisation = {
+            "@name": "Logical View::smartCRM::Organisation",
+            "@id": "Organisation",
+            "@stereotype": "entity",
+            "Documentation": "a company or institution",
+            "taggedValues": {
+                "TaggedValue": [{"@name": "table", "Value": "organisation"}]
+            },
+            "attributes": {
+                "Attribute": [
+                    cls.attribute("Organisation", "OrganisationNummer"),
+                    cls.attribute("Organisation", "Name"),
+                ]
+            },
+            "roles": {
+                "Role": {
+                    "@name": "Logical View::smartCRM::Organisation::persons",
+                    "@id": "Organisation.persons",
+                    "@multiplicity": "0..*",
+                    "@type": "Person",
+                }
+            },
+        }
+        person = {
+            "@name": "Logical View::smartCRM::Person",
+            "@id": "Person",
+            "Documentation": "a natural person",
+            "attributes": {"Attribute": [cls.attribute("Person", "PersonNummer")]},
+            "operations": {
+                "Operation": {
+                    "@name": "Logical View::smartCRM::Person::fullName",
+                    "@id": "Person.fullName",
+                    "parameters": {
+                        "Parameter": [
+                            {
+                                "@name": "return",
+                                "@id": "Person.fullName.return",
+                                "@type": "String",
+                            }
+                        ]
+                    },
+                }
+            },
+        }
+        return {
+            "Package": {
+                "@name": "Logical View",
+                "@id": "LogicalView",
+                "Documentation": "root",
+                "packages": {
+                    "Package": [
+                        {
+                            "@name": "Logical View::smartCRM",
+                            "@id": "smartCRM",
+                            "Documentation": "the SmartCRM entities",
+                            "classes": {"Class": [organisation, person]},
+                        },
+                        cls.util_package(util_class_count),
+                    ]
+                },
+            }
+        }
+
+    @classmethod
+    def write(cls, json_path: str, data: dict = None) -> str:
+        with open(json_path, "w") as json_file:
+            json.dump(data or cls.data(), json_file, indent=2)
+        return json_path
+
+    @classmethod
+    def to_xml(cls, parent: ET.Element, tag: str, value):
+        """
+        add the given XMI JSON value as child element(s) of the given parent
+        """
+        if isinstance(value, list):
+            for item in value:
+                cls.to_xml(parent, tag, item)
+            return
+        elem = ET.SubElement(parent, tag)
+        if isinstance(value, dict):
+            for key, child in value.items():
+                if key.startswith("@"):
+                    elem.set(key[1:], child)
+                else:
+                    cls.to_xml(elem, key, child)
+        elif value is not None:
+            elem.text = value
+
+    @classmethod
+    def write_xml(cls, xml_path: str, data: dict = None) -> str:
+        """
+        write the given model as the XMI file xq converts to it
+        """
+        root = ET.Element("root")
+        cls.to_xml(root, "Package", (data or cls.data())["Package"])
+        tree = ET.ElementTree(root[0])
+        ET.indent(tree)
+        tree.write(xml_path, encoding="utf-8", xml_declaration=True)
+        return xml_path
+
+
+class SyntheticDBTestCase(Basetest):
+    """
+    base test with a synthetic SmartCRM database in a temporary directory
+    """
+
+    # the parameters of the generated database - overridden by the tests
+    scale = 20
+    blob_size = 0
+    db_class = SQLiteDB
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "smartcrm.db")
+        self.generator = SyntheticDataGenerator(
+            scale=self.scale, blob_size=self.blob_size
+        )
+        self.generator.write_sqlite(self.db_path)
+        self.db = self.db_class(self.db_path)
+        self.topics = {topic.name: topic for topic in SmartCRMAdapter.get_topics()}
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp_dir.cleanup()
+        Basetest.tearDown(self)
+
+
+class XmiTestCase(Basetest):
+    """
+    base test for the XMI models with a temporary directory for the sample files
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        Basetest.tearDown(self)
+
+    def get_model(self, util_class_count: int = 1) -> Model:
+        json_path = os.path.join(self.tmp_dir.name, "model.json")
+        XmiSample.write(json_path, XmiSample.data(util_class_count))
+        return Model.from_xmi_json(json_path)
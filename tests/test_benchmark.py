@@ -0,0 +1,91 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import json
+import os
+import tempfile
+
+from ngwidgets.basetest import Basetest
+
+from crm.benchmark.crm_benchmark import CrmBenchmark, main
+from crm.benchmark.synthetic_data import SyntheticDataGenerator
+from crm.smartcrm_adapter import SmartCRMAdapter
+from crm.sqlite_db import SQLiteDB
+
+
+class TestBenchmark(Basetest):
+    """
+    test the synthetic SmartCRM data and the benchmark
+    """
+
+    def test_synthetic_data(self):
+        """
+        test that the JSON export and the SQLite database hold the same records
+        """
+        generator = SyntheticDataGenerator(scale=10)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_paths = generator.write_json(tmp_dir)
+            db_path = os.path.join(tmp_dir, "smartcrm.db")
+            generator.write_sqlite(db_path)
+            db = SQLiteDB(db_path)
+            for topic in SmartCRMAdapter.get_topics():
+                adapter = SmartCRMAdapter(topic=topic)
+                json_records = adapter.from_json_file(json_paths[topic.name])
+                db_records = adapter.from_db(db, lazy=True)
+                self.assertEqual(generator.count(topic), len(json_records))
+                self.assertEqual(json_records[0].keys(), db_records[0].keys())
+                for record in db_records:
+                    # all columns of the dataclass are present and convertible
+                    topic.dataclass.from_smartcrm(record)
+                if topic.name == "Organization":
+                    self.assertEqual(
+                        [
+                            topic.dataclass.from_smartcrm(record)
+                            for record in json_records
+                        ],
+                        [
+                            topic.dataclass.from_smartcrm(record)
+                            for record in db_records
+                        ],
+                    )
+            watermark = db_records[len(db_records) // 2]["lastmodified"]
+            since = list(adapter.iter_db(db, since=watermark))
+            self.assertTrue(all(r["lastmodified"] >= watermark for r in since))
+            self.assertLess(len(since), len(db_records))
+            db.close()
+        # reproducible
+        other = SyntheticDataGenerator(scale=10)
+        topic = SmartCRMAdapter.get_topics()[2]
+        self.assertEqual(generator.generate(topic), other.generate(topic))
+
+    def test_benchmark(self):
+        """
+        test a benchmark run on a small scale
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            generator = SyntheticDataGenerator(scale=20)
+            benchmark = CrmBenchmark(generator, tmp_dir)
+            result = benchmark.run()
+            for stage in [
+                "fetch",
+                "convert",
+                "graph_build",
+                "index_build",
+                "page_render",
+                "xmi",
+            ]:
+                self.assertIn(stage, result.stages)
+                if self.debug:
+                    print(f"{stage}: {result.total_secs(stage):.3f}s")
+            self.assertEqual(
+                60, result.counts["Person"] + result.counts["Organization"]
+            )
+            output = os.path.join(tmp_dir, "result.json")
+            self.assertEqual(0, main(["--scale", "5", "--output", output]))
+            with open(output) as json_file:
+                saved = json.load(json_file)
+            self.assertEqual(5, saved["scale"])
+            self.assertIn("page_render", saved["stages"])
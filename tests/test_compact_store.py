@@ -0,0 +1,100 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import pickle
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+from ngwidgets.basetest import Basetest
+
+from crm.benchmark.synthetic_data import SyntheticDataGenerator
+from crm.compact_store import CompactRecord, CompactStore
+from crm.crm_core import Organization
+from crm.graph_loader import GraphLoader
+from crm.node_query import NodeQuery, NodeQueryService
+
+
+class TestCompactStore(Basetest):
+    """
+    test the compact storage of the node properties
+    """
+
+    def load(self, store: CompactStore = None) -> GraphLoader:
+        """
+        load the synthetic records into a new graph
+        """
+        generator = SyntheticDataGenerator(scale=200)
+        loader = GraphLoader(MogwaiGraph(), db=None, store=store)
+        for topic in generator.topics:
+            for record in generator.generate(topic):
+                # a fresh dict and fresh strings per row as from a database driver
+                loader.upsert_record(
+                    topic,
+                    {
+                        key: (
+                            value.encode().decode() if isinstance(value, str) else value
+                        )
+                        for key, value in record.items()
+                    },
+                )
+        return loader
+
+    def test_compact_store(self):
+        """
+        test that compact records hold the same properties in less memory
+        """
+        plain = self.load()
+        store = CompactStore()
+        compact = self.load(store)
+        for node_id, props in compact.graph.nodes(data=True):
+            self.assertIsInstance(props, CompactRecord)
+            self.assertEqual(dict(plain.graph.nodes[node_id]), dict(props))
+        plain_report = CompactStore.memory_report(plain.graph)
+        compact_report = CompactStore.memory_report(compact.graph)
+        for topic, memory in compact_report.items():
+            if self.debug:
+                print(
+                    f"{topic}: {plain_report[topic].total_bytes} -> {memory.total_bytes}"
+                )
+            self.assertEqual(plain_report[topic].nodes, memory.nodes)
+            self.assertLess(memory.total_bytes, plain_report[topic].total_bytes)
+        if self.debug:
+            print(CompactStore.format_report(compact_report))
+        # interned values are shared
+        org_ids = compact.topic_node_ids("Organization")
+        cities = {id(compact.graph.nodes[node_id]["Ort"]) for node_id in org_ids}
+        self.assertLessEqual(len(cities), len(SyntheticDataGenerator.POOLS["Ort"]))
+        # the graph services work on compact records
+        page = NodeQueryService(compact.graph).query(
+            NodeQuery(node_type="Person", sort_by="PersonNummer", limit=5)
+        )
+        self.assertEqual(400, page.total)
+        self.assertEqual(5, len(page.rows))
+        node_id = compact.key_index.lookup("Organization", "1")
+        self.assertIsNotNone(node_id)
+
+    def test_compact_record(self):
+        """
+        test the mapping behavior of a compact record
+        """
+        store = CompactStore()
+        table = store.table("Organization")
+        record = CompactRecord(table, {"Land": "Deutschland", "Ort": "Köln"})
+        other = CompactRecord(table, {"Ort": "Berlin"})
+        self.assertEqual({"Ort": "Berlin"}, dict(other))
+        self.assertNotIn("Land", other)
+        self.assertIsNone(other.get("Land"))
+        other["Land"] = "".join(["Deutsch", "land"])
+        self.assertIs(record["Land"], other["Land"])
+        del record["Ort"]
+        self.assertEqual(1, len(record))
+        with self.assertRaises(KeyError):
+            record["Ort"]
+        record["new"] = 1
+        self.assertEqual(["Land", "new"], list(record))
+        restored = pickle.loads(pickle.dumps(record))
+        self.assertEqual({"Land": "Deutschland", "new": 1}, restored)
+        # the entities are slotted
+        self.assertFalse(hasattr(Organization.from_smartcrm({}), "__dict__"))
@@ -5,11 +5,13 @@ Created on 2024-01-12
 """
 
 import json
+from datetime import datetime
 from typing import Dict, List
 
 from ngwidgets.basetest import Basetest
 
-from crm.crm_core import Contact, Organization, Person
+from crm.benchmark.synthetic_data import SyntheticDataGenerator
+from crm.crm_core import ColumnConverter, Contact, Invoice, Organization, Person
 from crm.db import DB
 from crm.smartcrm_adapter import SmartCRMAdapter, Topic, smartCRMTopic
 
@@ -44,3 +46,53 @@ class TestCRM(Basetest):
             self.show_lod(topic, lod)
             lod = adapter.from_db(self.db, converter=converter)
             self.show_lod(topic, lod)
+
+
+class TestBatchConversion(Basetest):
+    """
+    test the column oriented conversion of SmartCRM records
+    """
+
+    def assert_same(self, cls, rows: List[Dict]):
+        """
+        assert that the per record and the batch conversion give the same result
+        """
+        expected = [cls.from_smartcrm(row) for row in rows]
+        self.assertEqual(expected, cls.from_smartcrm_batch(rows))
+
+    def test_synthetic_records(self):
+        """
+        test the batch conversion of synthetic records as fetched and as exported to JSON
+        """
+        generator = SyntheticDataGenerator(scale=20)
+        for topic in SmartCRMAdapter.get_topics():
+            rows = generator.generate(topic)
+            json_rows = [
+                {key: generator.to_export_value(value) for key, value in row.items()}
+                for row in rows
+            ]
+            self.assert_same(topic.dataclass, rows)
+            self.assert_same(topic.dataclass, json_rows)
+            self.assertEqual([], topic.dataclass.from_smartcrm_batch([]))
+
+    def test_edge_cases(self):
+        """
+        test values that need the per value fallback
+        """
+        rows = [
+            {
+                "createdAt": "2024-01-01",
+                "lastModified": "2024-01-01T10:00:00",
+                "Mitarbeiterzahl": "12",
+            },
+            {"createdAt": "", "lastModified": None, "Mitarbeiterzahl": "n/a"},
+            {"createdAt": "2024-01-01 10:00:00.5", "Mitarbeiterzahl": 7.0},
+            {"createdAt": "2024-01-01 10:00:00+01:00", "logo": None},
+            {"createdAt": datetime(2024, 1, 2), "Mitarbeiterzahl": True},
+        ]
+        self.assert_same(Organization, rows)
+        self.assert_same(Person, [{"perDu": "true"}, {"perDu": None}, {}])
+        self.assert_same(Invoice, [{"bezahltAm": "2024-02-29"}, {"netto": 1.5}])
+        self.assertEqual([1, 0], ColumnConverter.to_int_column(["1", "x"]))
+        with self.assertRaises(ValueError):
+            Organization.from_smartcrm_batch([{"createdAt": "2024-02-30"}])
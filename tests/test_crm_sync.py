@@ -0,0 +1,72 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import asyncio
+from datetime import datetime
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+from ngwidgets.basetest import Basetest
+
+from crm.crm_sync import IncrementalSync
+from crm.graph_loader import GraphLoader
+from crm.smartcrm_adapter import SmartCRMAdapter
+from tests.fixtures import FakeDB
+
+
+class TestIncrementalSync(Basetest):
+    """
+    test the incremental sync with lastModified watermarks
+    """
+
+    def test_sync(self):
+        """
+        test that only changed rows are fetched and upserted by key
+        """
+        topic = SmartCRMAdapter.get_topics()[1]  # Person
+        persons = [
+            {
+                "PersonNummer": f"p{i}",
+                "Name": f"Name{i}",
+                "lastModified": datetime(2024, 1, i + 1),
+            }
+            for i in range(3)
+        ]
+        db = FakeDB({"person": persons})
+        graph = MogwaiGraph()
+        loader = GraphLoader(graph, db, max_workers=1)
+        loader.load_topics([topic])
+        self.assertEqual(datetime(2024, 1, 3), loader.watermarks["Person"])
+        sync = IncrementalSync(loader)
+        updates = []
+        loader.node_listeners.append(lambda *args: updates.append(args))
+        # the row at the watermark is refetched but is not applied again
+        counts = sync.sync()
+        self.assertEqual(0, counts["Person"])
+        self.assertEqual([], updates)
+        self.assertEqual(3, len(graph.nodes))
+        # a change at the watermark is applied
+        persons[2]["Name"] = "Changed"
+        counts = sync.sync()
+        self.assertEqual(1, counts["Person"])
+        self.assertEqual(1, len(updates))
+        self.assertEqual(3, len(graph.nodes))
+        # modify one row and add another
+        persons[0]["Name"] = "Renamed"
+        persons[0]["lastModified"] = datetime(2024, 2, 1)
+        persons.append(
+            {
+                "PersonNummer": "p3",
+                "Name": "Name3",
+                "lastModified": datetime(2024, 2, 2),
+            }
+        )
+        counts = asyncio.run(sync.async_sync())
+        # only the two changes
+        self.assertEqual(2, counts["Person"])
+        self.assertEqual(4, len(graph.nodes))
+        node_id = loader.key_index.lookup("Person", "p0")
+        self.assertEqual("Renamed", graph.nodes[node_id]["Name"])
+        self.assertEqual(datetime(2024, 2, 2), loader.watermarks["Person"])
@@ -20,8 +20,8 @@ class TestDB(Basetest):
         Basetest.setUp(self, debug=debug, profile=profile)
         self.db = DB()
 
-    def check_query(self, sql_query, expected):
-        results = self.db.execute_query(sql_query)
+    def check_query(self, sql_query, expected, params=None):
+        results = self.db.execute_query(sql_query, params)
         if self.debug:
             for row in results:
                 row_str = json.dumps(row, indent=2, default=str)
@@ -34,9 +34,13 @@ class TestDB(Basetest):
         test database access
         """
         limit = 3
-        _results = self.check_query(f"SELECT * FROM person LIMIT {limit}", limit)
         _results = self.check_query(
-            f"SELECT * FROM person WHERE personnummer='wf04002101'", expected=1
+            "SELECT * FROM person LIMIT %s", limit, params=(limit,)
+        )
+        _results = self.check_query(
+            "SELECT * FROM person WHERE personnummer=%s",
+            expected=1,
+            params=("wf04002101",),
         )
 
     def test_show_tables(self):
@@ -46,3 +50,17 @@ class TestDB(Basetest):
         results = self.check_query("SHOW TABLES", 25)
         if self.debug:
             print(results)
+
+    def test_iter_query(self):
+        """
+        test streaming a query with a server side cursor
+        """
+        limit = 5
+        rows = list(
+            self.db.iter_query(
+                "SELECT * FROM person LIMIT %s", batch_size=2, params=(limit,)
+            )
+        )
+        self.assertEqual(limit, len(rows))
+        # the connection must be usable again after streaming
+        _results = self.check_query("SELECT * FROM person LIMIT 1", 1)
@@ -0,0 +1,128 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+from crm.lazy_columns import LazyColumnLoader
+from crm.sqlite_db import SQLiteDB
+from tests.fixtures import SyntheticDBTestCase
+
+
+class SlowDB(SQLiteDB):
+    """
+    SQLiteDB with a simulated latency per batch of rows
+    """
+
+    def __init__(self, db_path: str, latency: float):
+        super().__init__(db_path)
+        self.latency = latency
+        self.closed = threading.Event()
+
+    def iter_query(self, query: str, batch_size: int = 1000, params=None):
+        try:
+            for index, row in enumerate(super().iter_query(query, batch_size, params)):
+                if index % batch_size == 0:
+                    time.sleep(self.latency)
+                yield row
+        finally:
+            self.closed.set()
+
+
+class TestDBAsync(SyntheticDBTestCase):
+    """
+    test the async facade of the database classes
+    """
+
+    scale = 50
+    blob_size = 100
+
+    def test_aquery_does_not_block(self):
+        """
+        test that the event loop keeps running while a slow query is executed
+        """
+        db = SlowDB(self.db_path, latency=0.3)
+
+        async def run():
+            ticks = 0
+
+            async def heartbeat():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.create_task(heartbeat())
+            rows = await db.aquery(
+                "SELECT * FROM person WHERE PersonNummer = %s", ("42",)
+            )
+            task.cancel()
+            return rows, ticks
+
+        rows, ticks = asyncio.run(run())
+        db.close()
+        self.assertEqual(1, len(rows))
+        self.assertGreater(ticks, 10)
+
+    def test_timeout(self):
+        """
+        test that a query taking too long times out
+        """
+        db = SlowDB(self.db_path, latency=0.5)
+        # the builtin TimeoutError - not only asyncio.TimeoutError
+        with self.assertRaises(TimeoutError) as context:
+            asyncio.run(db.aquery("SELECT * FROM person", timeout=0.1))
+        self.assertIs(TimeoutError, type(context.exception))
+
+        async def stream():
+            return [
+                row async for row in db.astream("SELECT * FROM person", timeout=0.1)
+            ]
+
+        with self.assertRaises(TimeoutError):
+            asyncio.run(stream())
+        db.close()
+
+    def test_astream(self):
+        """
+        test streaming the rows and stopping the fetch early
+        """
+        db = SlowDB(self.db_path, latency=0.01)
+
+        async def stream(limit: int = None):
+            rows = []
+            async for row in db.astream("SELECT * FROM kontakt", batch_size=10):
+                rows.append(row)
+                if limit and len(rows) >= limit:
+                    break
+            return rows
+
+        async def stream_error():
+            async for _row in db.astream("SELECT * FROM no_such_table"):
+                pass
+
+        self.assertEqual(250, len(asyncio.run(stream())))
+        db.closed.clear()
+        self.assertEqual(15, len(asyncio.run(stream(limit=15))))
+        # the producer stops and releases the cursor
+        self.assertTrue(db.closed.wait(2.0))
+        with self.assertRaises(sqlite3.OperationalError):
+            asyncio.run(stream_error())
+        db.close()
+
+    def test_lazy_columns(self):
+        """
+        test loading lazy columns without blocking the event loop
+        """
+        db = SQLiteDB(self.db_path)
+        lazy_loader = LazyColumnLoader(db)
+        values = asyncio.run(lazy_loader.aget("Invoice", "1"))
+        self.assertEqual(100, len(values["document"]))
+        self.assertEqual(values, lazy_loader.get("Invoice", "1"))
+        self.assertEqual(1, lazy_loader.hits)
+        db.close()
@@ -0,0 +1,128 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import threading
+import time
+
+from ngwidgets.basetest import Basetest
+
+from crm.db_pool import ConnectionPool, PoolConfig, PoolError
+
+
+class FakeConnection:
+    """
+    stand in for a pymysql connection
+    """
+
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def ping(self, reconnect: bool = False):
+        if not self.alive:
+            raise ConnectionError("connection lost")
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(Basetest):
+    """
+    test the connection pool without a database
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.created = []
+
+    def connect(self) -> FakeConnection:
+        connection = FakeConnection()
+        self.created.append(connection)
+        return connection
+
+    def test_min_max_size(self):
+        """
+        test that the pool is prefilled and bounded
+        """
+        config = PoolConfig(min_size=2, max_size=3, checkout_timeout=0.1)
+        pool = ConnectionPool(self.connect, config)
+        self.assertEqual(2, len(self.created))
+        connections = [pool.acquire() for _ in range(3)]
+        self.assertEqual(3, pool.size)
+        with self.assertRaises(PoolError):
+            pool.acquire()
+        for connection in connections:
+            pool.release(connection)
+        self.assertEqual(3, len(pool.idle))
+
+    def test_ping_on_checkout(self):
+        """
+        test that a dropped connection is replaced on checkout
+        """
+        pool = ConnectionPool(self.connect, PoolConfig(min_size=1, max_size=1))
+        dead = self.created[0]
+        dead.alive = False
+        with pool.checkout() as connection:
+            self.assertIsNot(dead, connection)
+            self.assertTrue(dead.closed)
+        self.assertEqual(1, pool.size)
+
+    def test_idle_eviction(self):
+        """
+        test that surplus idle connections are closed
+        """
+        config = PoolConfig(min_size=1, max_size=4, idle_timeout=0.0)
+        pool = ConnectionPool(self.connect, config)
+        connections = [pool.acquire() for _ in range(3)]
+        for connection in connections:
+            pool.release(connection)
+        time.sleep(0.01)
+        with pool.checkout():
+            pass
+        self.assertEqual(1, pool.size)
+
+    def test_reconnect_backoff(self):
+        """
+        test that connecting is retried with backoff
+        """
+        failures = [ConnectionError("down"), ConnectionError("still down")]
+
+        def flaky_connect():
+            if failures:
+                raise failures.pop(0)
+            return self.connect()
+
+        config = PoolConfig(min_size=0, backoff_base=0.001, reconnect_attempts=2)
+        pool = ConnectionPool(flaky_connect, config)
+        with pool.checkout() as connection:
+            self.assertIsInstance(connection, FakeConnection)
+
+    def test_concurrent_checkout(self):
+        """
+        test that parallel callers get distinct connections
+        """
+        pool = ConnectionPool(self.connect, PoolConfig(min_size=0, max_size=4))
+        in_use = set()
+        lock = threading.Lock()
+        errors = []
+
+        def work():
+            with pool.checkout() as connection:
+                with lock:
+                    if id(connection) in in_use:
+                        errors.append("shared connection")
+                    in_use.add(id(connection))
+                time.sleep(0.01)
+                with lock:
+                    in_use.discard(id(connection))
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+        self.assertLessEqual(pool.size, 4)
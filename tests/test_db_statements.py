@@ -0,0 +1,122 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import sqlite3
+from datetime import datetime
+
+from crm.db_statements import StatementCache
+from crm.smartcrm_adapter import SmartCRMAdapter
+from crm.sqlite_db import SQLiteDB
+from tests.fixtures import SyntheticDBTestCase
+
+
+class TestDBStatements(SyntheticDBTestCase):
+    """
+    test parameterized queries and the reuse of prepared statements
+    """
+
+    scale = 10
+
+    def test_statement_cache(self):
+        """
+        test preparing, counting the placeholders and the LRU eviction
+        """
+        cache = StatementCache(max_size=2, translate=SQLiteDB.to_sqlite)
+        statement = cache.prepare(
+            "SELECT * FROM t WHERE a=%s AND b LIKE '%%x' AND c=%s"
+        )
+        self.assertEqual(2, statement.placeholders)
+        self.assertIs(statement, cache.prepare(statement.sql))
+        statement.check_params((1, 2))
+        statement.check_params(None)
+        # literal % signs in the SQL are escaped as %% when there are parameters
+        rows = self.db.execute_query("SELECT '100%%' AS escaped, %s AS param", (1,))
+        self.assertEqual([{"escaped": "100%", "param": 1}], rows)
+        # and passed unchanged without parameters as PyMySQL does
+        rows = self.db.execute_query("SELECT '100%%' AS escaped, '%s' AS quoted")
+        self.assertEqual([{"escaped": "100%%", "quoted": "%s"}], rows)
+        # a single value is accepted as parameter
+        rows = self.db.execute_query("SELECT %s AS param", "x")
+        self.assertEqual([{"param": "x"}], rows)
+        with self.assertRaises(ValueError):
+            statement.check_params((1,))
+        # the % operator of PyMySQL also formats quoted literals
+        statement = cache.prepare("SELECT '%s' AS a, %%s AS b, %s AS c")
+        self.assertEqual(2, statement.placeholders)
+        self.assertEqual("SELECT '?' AS a, %s AS b, ? AS c", statement.driver_sql)
+        self.assertEqual(statement.sql, statement.driver_query(None))
+        cache.prepare("SELECT 1")
+        cache.prepare("SELECT 2")
+        self.assertEqual(["SELECT 1", "SELECT 2"], list(cache.statements))
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(4, cache.misses)
+
+    def test_params(self):
+        """
+        test that values are passed as parameters and not formatted into the SQL
+        """
+        query = "SELECT * FROM person WHERE Name = %s"
+        evil = "x' OR '1'='1"
+        self.assertEqual([], self.db.execute_query(query, (evil,)))
+        person = self.generator.generate(self.topics["Person"])[0]
+        rows = self.db.execute_query(query, (person["Name"],))
+        self.assertTrue(
+            any(row["PersonNummer"] == person["PersonNummer"] for row in rows)
+        )
+        with self.assertRaises(ValueError):
+            self.db.execute_query(query, ())
+
+    def test_by_key(self):
+        """
+        test fetching single records by key reusing the prepared statement
+        """
+        adapter = SmartCRMAdapter(topic=self.topics["Person"])
+        persons = self.generator.generate(self.topics["Person"])
+        for person in persons:
+            record = adapter.by_key(self.db, person["PersonNummer"])
+            self.assertEqual(person["Name"], record["Name"])
+        self.assertIsNone(adapter.by_key(self.db, "unknown"))
+        self.assertEqual(len(persons), self.db.statements.hits)
+
+    def test_execute_many(self):
+        """
+        test the bulk execution of a statement
+        """
+        self.db.execute_query("CREATE TABLE tag (id INTEGER PRIMARY KEY, name TEXT)")
+        count = self.db.execute_many(
+            "INSERT INTO tag (id, name) VALUES (%s, %s)",
+            ((i, f"tag {i}") for i in range(100)),
+        )
+        self.assertEqual(100, count)
+        rows = self.db.execute_query("SELECT COUNT(*) AS count FROM tag")
+        self.assertEqual(100, rows[0]["count"])
+
+    def test_datetimes(self):
+        """
+        test that datetimes are stored as ISO text and read back as
+        datetimes without changing the sqlite3 module globally
+        """
+        modified = datetime(2027, 3, 4, 5, 6, 7)
+        self.db.execute_query("CREATE TABLE event (name TEXT, at DATETIME)")
+        self.db.execute_many(
+            "INSERT INTO event (name, at) VALUES (%s, %s)", [("a", modified)]
+        )
+        rows = self.db.execute_query("SELECT name, at FROM event")
+        self.assertEqual([{"name": "a", "at": modified}], rows)
+        rows = self.db.execute_query(
+            "SELECT name FROM event WHERE at >= %s", (modified,)
+        )
+        self.assertEqual(1, len(rows))
+        # other sqlite3 connections are not affected
+        connection = sqlite3.connect(
+            self.db.db_path, detect_types=sqlite3.PARSE_DECLTYPES
+        )
+        try:
+            (value,) = connection.execute("SELECT at FROM event").fetchone()
+            self.assertEqual("2027-03-04 05:06:07", value)
+        finally:
+            connection.close()
+        self.assertNotIn("DATETIME", sqlite3.converters)
@@ -0,0 +1,97 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import os
+
+from mogwai.core.mogwaigraph import MogwaiGraph, MogwaiGraphConfig
+from mogwai.schema.graph_schema import GraphSchema
+from ngwidgets.basetest import Basetest
+
+import crm
+from crm.graph_index import KeyIndex, NodeUpdater
+from crm.graph_loader import GraphLoader
+from crm.smartcrm_adapter import SmartCRMAdapter
+from tests.fixtures import FakeDB
+
+
+class TestKeyIndex(Basetest):
+    """
+    test the key field index
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        module_path = os.path.dirname(os.path.abspath(crm.__file__))
+        yaml_path = os.path.join(module_path, "resources", "crm-schema.yaml")
+        self.schema = GraphSchema.load(yaml_path=yaml_path)
+
+    def test_key_columns(self):
+        """
+        test that the configured key fields are mapped to the SmartCRM columns
+        """
+        key_index = KeyIndex.from_schema(self.schema)
+        expected = {
+            "NodeTypeConfig": "label",
+            "Organization": "OrganisationNummer",
+            "Person": "PersonNummer",
+            "Contact": "KontaktNummer",
+            "Invoice": "rechnungsID",
+        }
+        self.assertEqual(expected, key_index.key_columns)
+        # the key columns of the schema and the topics agree
+        for topic in SmartCRMAdapter.get_topics():
+            self.assertEqual(topic.key_column, key_index.key_column(topic.name))
+
+    def test_lookup(self):
+        """
+        test resolving business keys after load, rebuild and sync
+        """
+        graph = MogwaiGraph()
+        self.schema.add_to_graph(graph)
+        key_index = KeyIndex.from_schema(self.schema)
+        key_index.rebuild(graph)
+        self.assertIsNotNone(key_index.lookup("NodeTypeConfig", "Invoice"))
+        invoices = [{"rechnungsID": f"R{i}", "netto": i} for i in range(100)]
+        tables = {"rechnung": invoices}
+        loader = GraphLoader(graph, FakeDB(tables), key_index=key_index)
+        loader.load_topics([SmartCRMAdapter.get_topics()[3]])
+        node_id = key_index.lookup("Invoice", "R42")
+        self.assertEqual(42, graph.nodes[node_id]["netto"])
+        self.assertIsNone(key_index.lookup("Invoice", "R100"))
+        topic = loader.topics[0]
+        new_id = loader.upsert_record(topic, {"rechnungsID": "R100", "netto": 100})
+        self.assertEqual(new_id, key_index.lookup("Invoice", "R100"))
+        key_index.rebuild(graph)
+        self.assertEqual(node_id, key_index.lookup("Invoice", "R42"))
+
+
+class TestNodeUpdater(Basetest):
+    """
+    test updating node properties together with the SPOG index
+    """
+
+    def test_update_node(self):
+        """
+        test that old values leave the index once no node has them any more
+        """
+        config = MogwaiGraphConfig(name_field="_node_name", index_config="minimal")
+        graph = MogwaiGraph(config=config)
+        p1 = graph.add_labeled_node("Person", name="p1", properties={"Ort": "Bonn"})
+        p2 = graph.add_labeled_node("Person", name="p2", properties={"Ort": "Bonn"})
+        subjects = graph.spog_index.get_lookup("O", "S")
+        values = graph.spog_index.get_lookup("P", "O")
+        changed = NodeUpdater.update_node(graph, p1, {"Ort": "Köln", "Name": "Neu"})
+        self.assertEqual({"Ort": "Köln", "Name": "Neu"}, changed)
+        self.assertEqual("Köln", graph.nodes[p1]["Ort"])
+        self.assertEqual({p2}, subjects["Bonn"])
+        self.assertEqual({p1}, subjects["Köln"])
+        self.assertEqual({"Bonn", "Köln"}, values["Ort"])
+        self.assertEqual({}, NodeUpdater.update_node(graph, p1, {"Ort": "Köln"}))
+        NodeUpdater.update_node(graph, p2, {"Ort": "Köln"})
+        self.assertNotIn("Bonn", subjects)
+        self.assertEqual({"Köln"}, values["Ort"])
+        self.assertEqual({p1, p2}, subjects["Köln"])
+        self.assertEqual({"Neu"}, values["Name"])
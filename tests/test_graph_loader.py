@@ -0,0 +1,68 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import threading
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+from ngwidgets.basetest import Basetest
+
+from crm.graph_loader import GraphLoader
+from crm.smartcrm_adapter import SmartCRMAdapter
+from tests.fixtures import FakeDB
+
+
+class TestGraphLoader(Basetest):
+    """
+    test loading the SmartCRM topics into a graph
+    """
+
+    def test_parallel_load(self):
+        """
+        test that the topics are fetched concurrently and inserted by a single writer
+        """
+        topics = SmartCRMAdapter.get_topics()
+        tables = {topic.table_name: [{"no": i} for i in range(5)] for topic in topics}
+        db = FakeDB(tables)
+        # every fetcher waits for all others - a sequential load breaks the barrier
+        barrier = threading.Barrier(len(topics), timeout=10)
+        iter_query = db.iter_query
+
+        def concurrent_iter_query(query, batch_size=1000, params=None):
+            barrier.wait()
+            yield from iter_query(query, batch_size=batch_size, params=params)
+
+        db.iter_query = concurrent_iter_query
+        graph = MogwaiGraph()
+        writers = set()
+        loader = GraphLoader(graph, db, max_workers=len(topics), batch_size=2)
+        add_record = loader.add_record
+
+        def tracking_add_record(topic, record):
+            writers.add(threading.get_ident())
+            add_record(topic, record)
+
+        loader.add_record = tracking_add_record
+        stats = loader.load_topics(topics)
+        self.assertEqual(20, len(graph.nodes))
+        for topic in topics:
+            self.assertEqual(5, stats[topic.name].count)
+        self.assertEqual({threading.get_ident()}, writers)
+        self.assertFalse(barrier.broken)
+
+    def test_writer_error(self):
+        """
+        test that an error of the writer stops the fetchers instead of deadlocking
+        """
+        topics = SmartCRMAdapter.get_topics()
+        tables = {topic.table_name: [{"no": i} for i in range(100)] for topic in topics}
+        loader = GraphLoader(MogwaiGraph(), FakeDB(tables), batch_size=1, queue_size=1)
+
+        def failing_add_record(topic, record):
+            raise ValueError("invalid record")
+
+        loader.add_record = failing_add_record
+        with self.assertRaises(ValueError):
+            loader.load_topics(topics)
@@ -0,0 +1,84 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from datetime import datetime
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+from ngwidgets.basetest import Basetest
+
+from crm.crm_sync import IncrementalSync
+from crm.graph_loader import GraphLoader
+from crm.graph_relations import RelationBuilder
+from tests.fixtures import FakeDB
+
+
+class TestRelationBuilder(Basetest):
+    """
+    test building the relation edges between topics
+    """
+
+    def test_relations(self):
+        """
+        test the hash join of invoices to organizations and the dangling report
+        """
+        modified = datetime(2024, 1, 1)
+        tables = {
+            "organisation": [
+                {"OrganisationNummer": f"o{i}", "lastModified": modified}
+                for i in range(3)
+            ],
+            "rechnung": [
+                {
+                    "rechnungsID": f"r{i}",
+                    "Auftraggeber_OrganisationNummer": f"o{i % 4}",
+                    "lastmodified": modified,
+                }
+                for i in range(8)
+            ],
+            "person": [],
+            "kontakt": [],
+        }
+        loader = GraphLoader(MogwaiGraph(), FakeDB(tables))
+        loader.load_topics()
+        relations = RelationBuilder(loader.graph, loader.key_index)
+        stats = relations.build()
+        self.assertEqual(6, stats["invoices"].edges)
+        self.assertEqual(2, stats["invoices"].dangling)
+        self.assertEqual(["o3", "o3"], stats["invoices"].dangling_keys)
+        if self.debug:
+            print(relations.report())
+        o1 = loader.key_index.lookup("Organization", "o1")
+        related = relations.related(o1, "invoices")
+        self.assertEqual(2, len(related))
+        # the missing organization shows up in a sync and gets its invoices
+        tables["organisation"].append(
+            {"OrganisationNummer": "o3", "lastModified": datetime(2024, 2, 1)}
+        )
+        # an invoice moves to another organization
+        tables["rechnung"][1]["Auftraggeber_OrganisationNummer"] = "o2"
+        tables["rechnung"][1]["lastmodified"] = datetime(2024, 2, 1)
+        sync = IncrementalSync(loader, relations=relations)
+        sync.sync()
+        o3 = loader.key_index.lookup("Organization", "o3")
+        self.assertEqual(2, len(relations.related(o3, "invoices")))
+        self.assertEqual(1, len(relations.related(o1, "invoices")))
+        o2 = loader.key_index.lookup("Organization", "o2")
+        self.assertEqual(3, len(relations.related(o2, "invoices")))
+        r1 = loader.key_index.lookup("Invoice", "r1")
+        self.assertFalse(loader.graph.has_edge(o1, r1))
+        # the resolved keys and the moved edge are counted
+        self.assertEqual(8, stats["invoices"].edges)
+        self.assertEqual(0, stats["invoices"].dangling)
+        self.assertEqual([], stats["invoices"].dangling_keys)
+        # reloading a topic keeps its edges and the edges referencing it
+        for topic_name in ["Organization", "Invoice"]:
+            topic = next(topic for topic in loader.topics if topic.name == topic_name)
+            loader.reload_topic(topic)
+            relations.relink_topic(topic_name)
+            self.assertEqual(8, stats["invoices"].edges)
+            self.assertEqual(0, stats["invoices"].dangling)
+            o2 = loader.key_index.lookup("Organization", "o2")
+            self.assertEqual(3, len(relations.related(o2, "invoices")))
@@ -0,0 +1,75 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import os
+import tempfile
+from datetime import datetime
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+from ngwidgets.basetest import Basetest
+
+from crm.graph_loader import GraphLoader
+from crm.graph_snapshot import GraphSnapshot
+from crm.smartcrm_adapter import SmartCRMAdapter
+from tests.fixtures import FakeDB
+
+
+class TestGraphSnapshot(Basetest):
+    """
+    test saving and restoring graph snapshots
+    """
+
+    def test_warm_start(self):
+        """
+        test a warm start with a modified and a deleted row
+        """
+        topics = SmartCRMAdapter.get_topics()
+        tables = {topic.table_name: [] for topic in topics}
+        tables["organisation"] = [
+            {
+                "OrganisationNummer": f"o{i}",
+                "Ort": "Berlin",
+                "lastModified": datetime(2024, 1, i + 1),
+            }
+            for i in range(4)
+        ]
+        db = FakeDB(tables)
+        loader = GraphLoader(MogwaiGraph(), db)
+        loader.load_topics()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            snapshot = GraphSnapshot(os.path.join(tmp_dir, "crm_graph.snapshot"))
+            self.assertEqual(4, snapshot.save(loader))
+            # restore without changes
+            warm_loader = GraphLoader(MogwaiGraph(), db)
+            self.assertTrue(snapshot.warm_start(warm_loader))
+            self.assertEqual(4, len(warm_loader.topic_node_ids("Organization")))
+            self.assertEqual(
+                datetime(2024, 1, 4), warm_loader.watermarks["Organization"]
+            )
+            # modify one row - only the delta is synced
+            tables["organisation"][1]["Ort"] = "Bonn"
+            tables["organisation"][1]["lastModified"] = datetime(2024, 2, 1)
+            warm_loader = GraphLoader(MogwaiGraph(), db)
+            snapshot.warm_start(warm_loader)
+            node_id = warm_loader.key_index.lookup("Organization", "o1")
+            self.assertEqual("Bonn", warm_loader.graph.nodes[node_id]["Ort"])
+            # delete a row - the topic is reloaded
+            del tables["organisation"][0]
+            warm_loader = GraphLoader(MogwaiGraph(), db)
+            snapshot.warm_start(warm_loader)
+            self.assertEqual(3, len(warm_loader.topic_node_ids("Organization")))
+            self.assertIsNone(warm_loader.key_index.lookup("Organization", "o0"))
+            # the database is down - the restored graph is used
+            down_db = FakeDB(tables)
+
+            def unreachable(*_args, **_kwargs):
+                raise ConnectionError("SmartCRM is down")
+
+            down_db.iter_query = unreachable
+            down_db.execute_query = unreachable
+            warm_loader = GraphLoader(MogwaiGraph(), down_db)
+            self.assertTrue(snapshot.warm_start(warm_loader))
+            self.assertEqual(4, len(warm_loader.topic_node_ids("Organization")))
@@ -0,0 +1,104 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import json
+import os
+import tempfile
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+from ngwidgets.basetest import Basetest
+
+from crm.benchmark.synthetic_data import SyntheticDataGenerator
+from crm.graph_loader import GraphLoader
+from crm.json_stream import JsonStreamReader
+from crm.smartcrm_adapter import SmartCRMAdapter
+
+
+class TestJsonStream(Basetest):
+    """
+    test streaming the records of large SmartCRM JSON exports
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        Basetest.tearDown(self)
+
+    def write(self, data, name: str = "test.json") -> str:
+        json_path = os.path.join(self.tmp_dir.name, name)
+        with open(json_path, "w", encoding="utf-8") as json_file:
+            json.dump(data, json_file, ensure_ascii=False, indent=2)
+        return json_path
+
+    def test_iter_path(self):
+        """
+        test that the elements are the same for all window sizes
+        with and without memory mapping
+        """
+        records = [
+            {"no": i, "name": 'Müller "}]" ' * i, "amount": 1.5e3 + i}
+            for i in range(50)
+        ]
+        data = {
+            "@xmlns": {"skip": [1, 2, {"a": "}"}]},
+            "PersonManager": {"count": 50, "persons": {"Person": records}},
+        }
+        json_path = self.write(data)
+        path = ["PersonManager", "persons", "Person"]
+        for use_mmap in (True, False):
+            for chunk_size in (1, 3, 64, 1 << 20):
+                reader = JsonStreamReader(
+                    json_path, chunk_size=chunk_size, use_mmap=use_mmap
+                )
+                self.assertEqual(records, list(reader.iter_path(path)))
+
+    def test_edge_cases(self):
+        """
+        test single objects, empty arrays, missing members and truncated files
+        """
+        path = ["M", "p", "P"]
+        cases = [
+            ({"M": {"p": {"P": {"no": 1}}}}, [{"no": 1}]),
+            ({"M": {"p": {"P": []}}}, []),
+            ({"M": {"p": {"P": None}}}, []),
+            ({"M": {"p": {"P": [12345678]}}}, [12345678]),
+        ]
+        for data, expected in cases:
+            reader = JsonStreamReader(self.write(data), chunk_size=2)
+            self.assertEqual(expected, list(reader.iter_path(path)))
+        with self.assertRaises(KeyError):
+            list(JsonStreamReader(self.write({"M": {"x": 1}})).iter_path(path))
+        truncated = self.write({"M": {"p": {"P": [{"a": 1}, {"a": 2}]}}})
+        with open(truncated, "r+") as json_file:
+            # cut within the second record
+            json_file.truncate(json_file.read().index('"a": 2') + 3)
+        with self.assertRaises(json.JSONDecodeError):
+            list(JsonStreamReader(truncated, chunk_size=4).iter_path(path))
+
+    def test_smartcrm_exports(self):
+        """
+        test reading the synthetic SmartCRM exports and streaming them into a graph
+        """
+        generator = SyntheticDataGenerator(scale=10)
+        json_paths = generator.write_json(self.tmp_dir.name)
+        for topic in SmartCRMAdapter.get_topics():
+            adapter = SmartCRMAdapter(topic=topic)
+            with open(json_paths[topic.name]) as json_file:
+                data = json.load(json_file)
+            manager_name, plural_name, name = topic.node_path.split("/")
+            expected = data[manager_name][plural_name][name]
+            self.assertEqual(expected, adapter.from_json_file(json_paths[topic.name]))
+            instances = adapter.from_json_file(
+                json_paths[topic.name], converter=topic.dataclass.from_smartcrm_batch
+            )
+            self.assertEqual(len(expected), len(instances))
+        loader = GraphLoader(MogwaiGraph(), db=None, json_root=self.tmp_dir.name)
+        stats = loader.load_topics()
+        for topic in SmartCRMAdapter.get_topics():
+            self.assertEqual(generator.count(topic), stats[topic.name].count)
@@ -0,0 +1,94 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from crm.lazy_columns import LazyColumnLoader
+from crm.smartcrm_adapter import SmartCRMAdapter
+from tests.fixtures import CountingDB, SyntheticDBTestCase
+
+
+class TestLazyColumns(SyntheticDBTestCase):
+    """
+    test leaving out the large columns on list loads and loading them on demand
+    """
+
+    blob_size = 2000
+    db_class = CountingDB
+
+    def test_projection(self):
+        """
+        test that list loads leave out the lazy columns
+        """
+        for topic in self.topics.values():
+            adapter = SmartCRMAdapter(topic=topic)
+            records = adapter.from_db(self.db)
+            full_records = adapter.from_db(self.db, lazy=True)
+            self.assertEqual(len(full_records), len(records))
+            for column in topic.lazy_columns:
+                self.assertNotIn(column, records[0])
+                self.assertIn(column, full_records[0])
+            size = sum(
+                len(str(value)) for record in records for value in record.values()
+            )
+            full_size = sum(
+                len(str(value)) for record in full_records for value in record.values()
+            )
+            if self.debug:
+                print(f"{topic.name}: {full_size} -> {size}")
+            if topic.lazy_columns:
+                self.assertLess(size * 3, full_size)
+
+    def test_table_columns(self):
+        """
+        test that columns the dataclass does not map are still selected
+        """
+        topic = self.topics["Organization"]
+        self.db.execute_query("ALTER TABLE organisation ADD COLUMN rating INTEGER")
+        adapter = SmartCRMAdapter(topic=topic)
+        query = adapter.select_query(self.db)
+        self.assertIn("rating", query)
+        self.assertNotIn("logo", query)
+        records = adapter.from_db(self.db)
+        self.assertIn("rating", records[0])
+        self.assertNotIn("logo", records[0])
+
+    def test_from_db_converter(self):
+        """
+        test that from_db converters get a list they may measure and iterate twice
+        """
+        adapter = SmartCRMAdapter(topic=self.topics["Person"])
+
+        def converter(records):
+            self.assertIsInstance(records, list)
+            return [len(records), len(list(records))]
+
+        count = self.generator.count(self.topics["Person"])
+        self.assertEqual([count, count], adapter.from_db(self.db, converter=converter))
+
+    def test_load_on_demand(self):
+        """
+        test loading the lazy columns in batches with a LRU cache
+        """
+        lazy_loader = LazyColumnLoader(self.db, cache_size=10, batch_size=4)
+        invoices = self.generator.generate(self.topics["Invoice"])
+        keys = [invoice["rechnungsID"] for invoice in invoices[:10]]
+        loaded = lazy_loader.load("Invoice", keys + ["unknown"])
+        self.assertEqual(set(keys), set(loaded))
+        self.assertEqual(invoices[0]["document"], loaded[keys[0]]["document"])
+        # 11 keys in batches of 4
+        self.assertEqual(3, self.db.queries)
+        self.assertEqual(
+            invoices[1]["document"], lazy_loader.get("Invoice", keys[1])["document"]
+        )
+        self.assertEqual(3, self.db.queries)
+        self.assertEqual(1, lazy_loader.hits)
+        # the least recently used entry is evicted
+        lazy_loader.get("Contact", "1")
+        self.assertEqual(10, len(lazy_loader.cache))
+        self.assertNotIn(("Invoice", keys[0]), lazy_loader.cache)
+        self.assertIn(("Invoice", keys[1]), lazy_loader.cache)
+        lazy_loader.on_node_changed("Invoice", None, {"rechnungsID": keys[1]})
+        self.assertNotIn(("Invoice", keys[1]), lazy_loader.cache)
+        self.assertEqual({}, lazy_loader.load("Person", ["1"]))
@@ -0,0 +1,184 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import asyncio
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+from ngwidgets.basetest import Basetest
+
+from crm.graph_loader import GraphLoader
+from crm.node_query import NodeQuery, NodeQueryService, TopicNodeQueryService
+from tests.fixtures import PageCountingDB, SyntheticDBTestCase
+
+
+class TestNodeQuery(Basetest):
+    """
+    test server side pagination, sorting and filtering of nodes
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.graph = MogwaiGraph()
+        cities = ["Berlin", "Bonn", "Köln"]
+        for i in range(10):
+            self.graph.add_labeled_node(
+                "Organization",
+                name=f"Organization-{i}",
+                properties={"OrganisationNummer": f"o{i:02d}", "Ort": cities[i % 3]},
+            )
+        self.graph.add_labeled_node(
+            "Person", name="Person-0", properties={"Ort": "Bonn"}
+        )
+        self.service = NodeQueryService(self.graph)
+
+    def test_paging(self):
+        """
+        test that only the requested page is returned
+        """
+        page = self.service.query(NodeQuery("Organization", page=3, limit=4))
+        self.assertEqual(10, page.total)
+        self.assertEqual(2, len(page.rows))
+        self.assertIn("node_id", page.rows[0])
+
+    def test_sort_and_filter(self):
+        """
+        test sorting by a field combined with a text filter
+        """
+        node_query = NodeQuery(
+            "Organization", sort_by="OrganisationNummer", descending=True, text="BONN"
+        )
+        page = self.service.query(node_query)
+        self.assertEqual(3, page.total)
+        numbers = [row["OrganisationNummer"] for row in page.rows]
+        self.assertEqual(["o07", "o04", "o01"], numbers)
+
+    def test_missing_and_mixed_values(self):
+        """
+        test that missing values come last in both directions and that
+        values of different types can be sorted
+        """
+        values = [3, None, "b", 1.5, "a", None]
+        for i, value in enumerate(values):
+            self.graph.add_labeled_node(
+                "Contact", name=f"Contact-{i}", properties={"no": i, "value": value}
+            )
+        for descending, expected in [
+            (False, [1.5, 3, "a", "b", None, None]),
+            (True, ["b", "a", 3, 1.5, None, None]),
+        ]:
+            node_query = NodeQuery("Contact", sort_by="value", descending=descending)
+            page = self.service.query(node_query)
+            self.assertEqual(expected, [row["value"] for row in page.rows])
+
+    def test_cached_selection(self):
+        """
+        test that pages of the same selection are served from the cache until it is invalidated
+        """
+        node_query = NodeQuery("Organization", sort_by="OrganisationNummer", limit=4)
+        self.service.query(node_query)
+        self.assertEqual(1, len(self.service.selections))
+        node_query.page = 2
+        page = self.service.query(node_query)
+        self.assertEqual(1, len(self.service.selections))
+        self.assertEqual("o04", page.rows[0]["OrganisationNummer"])
+        node_id = page.rows[0]["node_id"]
+        self.graph.nodes[node_id]["OrganisationNummer"] = "o99"
+        self.service.invalidate("Organization", node_id, self.graph.nodes[node_id])
+        page = self.service.query(node_query)
+        self.assertEqual("o05", page.rows[0]["OrganisationNummer"])
+
+
+class TestTopicNodeQuery(SyntheticDBTestCase):
+    """
+    test the node table pages queried from the database with keyset cursors
+    """
+
+    db_class = PageCountingDB
+
+    def setUp(self, debug=False, profile=True):
+        SyntheticDBTestCase.setUp(self, debug=debug, profile=profile)
+        self.loader = GraphLoader(MogwaiGraph(), db=self.db)
+        self.loader.load_topics()
+        self.service = TopicNodeQueryService(
+            self.loader.graph, db=self.db, key_index=self.loader.key_index
+        )
+        self.graph_service = NodeQueryService(self.loader.graph)
+
+    def keys(self, page) -> list:
+        return [row["PersonNummer"] for row in page.rows]
+
+    def test_pages(self):
+        """
+        test that the database pages match the pages sorted in python
+        """
+        node_query = NodeQuery("Person", limit=7, sort_by="Name", descending=True)
+        persons = self.db.execute_query("SELECT * FROM person")
+        persons.sort(key=lambda row: (row["Name"], row["PersonNummer"]), reverse=True)
+        expected = [row["PersonNummer"] for row in persons]
+        pages = []
+        for page_number in range(1, len(expected) // 7 + 2):
+            node_query.page = page_number
+            page = self.service.query(node_query)
+            self.assertEqual(len(persons), page.total)
+            pages.extend(self.keys(page))
+        self.assertEqual(expected, pages)
+        # paging back and jumping ahead use the known cursors
+        queries = self.db.queries
+        node_query.page = 2
+        self.assertEqual(expected[7:14], self.keys(self.service.query(node_query)))
+        self.assertEqual(queries + 1, self.db.queries)
+        node_query.page = 100
+        self.assertEqual([], self.service.query(node_query).rows)
+        fresh = TopicNodeQueryService(
+            self.loader.graph, db=self.db, key_index=self.loader.key_index
+        )
+        # a page without a known cursor is reached with a single offset query
+        node_query.page = 3
+        queries = self.db.queries
+        self.assertEqual(expected[14:21], self.keys(fresh.query(node_query)))
+        self.assertEqual(queries + 2, self.db.queries)
+        node_query.page = 4
+        self.assertEqual(expected[21:28], self.keys(fresh.query(node_query)))
+        self.assertEqual(queries + 3, self.db.queries)
+        for row in fresh.query(node_query).rows:
+            props = self.loader.graph.nodes[row["node_id"]]
+            self.assertEqual(props["PersonNummer"], row["PersonNummer"])
+
+    def test_aquery(self):
+        """
+        test that the async pages match the sync ones
+        """
+        node_query = NodeQuery("Person", limit=6, sort_by="Name")
+        for page_number in [1, 4, 2, 5]:
+            node_query.page = page_number
+            page = asyncio.run(self.service.aquery(node_query))
+            self.assertEqual(self.service.query(node_query), page)
+        node_query = NodeQuery("Person", limit=6, sort_by="_node_name")
+        page = asyncio.run(self.service.aquery(node_query))
+        self.assertEqual(self.graph_service.query(node_query), page)
+
+    def test_text_filter(self):
+        """
+        test that the text filter matches the graph based one
+        """
+        name = self.db.execute_query("SELECT Name FROM person LIMIT 1")[0]["Name"]
+        for text in [name.upper(), name[1:4], "%", "no such text"]:
+            node_query = NodeQuery("Person", limit=100, text=text)
+            page = self.service.query(node_query)
+            graph_page = self.graph_service.query(node_query)
+            self.assertEqual(graph_page.total, page.total, text)
+            self.assertEqual(sorted(self.keys(graph_page)), self.keys(page), text)
+
+    def test_fallback(self):
+        """
+        test that unmapped columns and unknown node types are served from the graph
+        """
+        node_query = NodeQuery("Person", limit=5, sort_by="_node_name")
+        self.assertEqual(
+            self.graph_service.query(node_query), self.service.query(node_query)
+        )
+        node_query = NodeQuery("Unknown")
+        self.assertEqual(0, self.service.query(node_query).total)
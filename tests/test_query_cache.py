@@ -0,0 +1,140 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from datetime import datetime
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+from ngwidgets.basetest import Basetest
+
+from crm.graph_loader import GraphLoader
+from crm.query_cache import QueryCache
+from crm.smartcrm_adapter import SmartCRMAdapter
+from tests.fixtures import CountingDB, SyntheticDBTestCase
+
+
+class FakeClock:
+    """
+    manually advanced time source
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestQueryCache(Basetest):
+    """
+    test the TTL and LRU query result cache
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.clock = FakeClock()
+
+    def test_key(self):
+        """
+        test that whitespace and parameter container types do not change the key
+        """
+        cache = QueryCache()
+        self.assertEqual(
+            cache.key("SELECT *\n  FROM person;", [1, "a"]),
+            cache.key("SELECT * FROM person", (1, "a")),
+        )
+        self.assertEqual(
+            cache.key("SELECT 1", {"b": 2, "a": [1]}),
+            cache.key("SELECT 1", {"a": (1,), "b": 2}),
+        )
+        self.assertNotEqual(cache.key("SELECT 1", (1,)), cache.key("SELECT 1", (2,)))
+        self.assertEqual(
+            {"person", "kontakt"},
+            cache.tables("SELECT * FROM Person p JOIN `kontakt` k ON p.id=k.id"),
+        )
+
+    def test_ttl(self):
+        """
+        test that entries expire after their time to live
+        """
+        cache = QueryCache(ttl=10, clock=self.clock)
+        cache.put("SELECT 1", None, [{"a": 1}])
+        cache.put("SELECT 2", None, [{"a": 2}], ttl=100)
+        self.assertEqual([{"a": 1}], cache.get("SELECT 1"))
+        self.clock.now = 10
+        self.assertIsNone(cache.get("SELECT 1"))
+        self.assertEqual([{"a": 2}], cache.get("SELECT 2"))
+        self.assertEqual(1, cache.stats.expirations)
+        self.assertEqual(2, cache.stats.hits)
+        self.assertEqual(1, cache.stats.misses)
+        self.assertEqual(1, cache.row_count)
+
+    def test_lru(self):
+        """
+        test the eviction of the least recently used entries by entries and rows
+        """
+        cache = QueryCache(max_entries=2, max_rows=5, clock=self.clock)
+        cache.put("SELECT 1", None, [{}])
+        cache.put("SELECT 2", None, [{}])
+        cache.get("SELECT 1")
+        cache.put("SELECT 3", None, [{}])
+        self.assertIsNotNone(cache.get("SELECT 1"))
+        self.assertIsNone(cache.get("SELECT 2"))
+        # evicts both older entries to stay within max_rows
+        cache.put("SELECT 4", None, [{}] * 4)
+        self.assertEqual(["SELECT 1", "SELECT 4"], [key[0] for key in cache.entries])
+        self.assertEqual(5, cache.row_count)
+        # too large to be cached at all
+        cache.put("SELECT 5", None, [{}] * 6)
+        self.assertIsNone(cache.get("SELECT 5"))
+        self.assertEqual(2, cache.stats.evictions)
+
+    def test_copies(self):
+        """
+        test that the callers get their own copies of the cached rows
+        """
+        cache = QueryCache(clock=self.clock)
+        rows = [{"Ort": "Bonn"}]
+        cache.put("SELECT Ort FROM organisation", None, rows)
+        rows[0]["Ort"] = "changed"
+        cached = cache.get("SELECT Ort FROM organisation")
+        self.assertEqual([{"Ort": "Bonn"}], cached)
+        cached[0]["Ort"] = "changed"
+        self.assertEqual([{"Ort": "Bonn"}], cache.get("SELECT Ort FROM organisation"))
+
+
+class TestQueryCacheDB(SyntheticDBTestCase):
+    """
+    test the query cache in front of a database
+    """
+
+    scale = 10
+    db_class = CountingDB
+
+    def test_from_db(self):
+        """
+        test caching the SmartCRM queries and the invalidation by the sync watermark
+        """
+        cache = QueryCache(clock=FakeClock())
+        db = self.db
+        person = SmartCRMAdapter(topic=self.topics["Person"])
+        organization = SmartCRMAdapter(topic=self.topics["Organization"])
+        persons = person.from_db(db, cache=cache)
+        self.assertEqual(persons, person.from_db(db, cache=cache))
+        self.assertEqual(persons, person.from_db(db))
+        organization.from_db(db, cache=cache)
+        self.assertEqual(3, db.queries)
+        self.assertEqual(1, cache.stats.hits)
+
+        loader = GraphLoader(MogwaiGraph(), db=None)
+        loader.watermark_listeners.append(cache.on_watermark)
+        record = dict(persons[0])
+        record["lastModified"] = datetime(2030, 1, 1)
+        loader.upsert_record(self.topics["Person"], record)
+        self.assertEqual(1, cache.stats.invalidations)
+        person.from_db(db, cache=cache)
+        organization.from_db(db, cache=cache)
+        self.assertEqual(4, db.queries)
+        self.assertGreater(cache.stats.hit_ratio, 0.3)
@@ -0,0 +1,125 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+from ngwidgets.basetest import Basetest
+
+from crm.search_index import SearchIndex
+
+
+class TestSearchIndex(Basetest):
+    """
+    test the full text search index
+    """
+
+    def setUp(self, debug=False, profile=True):
+        Basetest.setUp(self, debug=debug, profile=profile)
+        self.graph = MogwaiGraph()
+        self.index = SearchIndex()
+        persons = [
+            ("Fahl", "Wolfgang", "wf@bitplan.com"),
+            ("Fahlmann", "Peter", "peter@example.com"),
+            ("Meier", "Anna", "anna.meier@example.com"),
+        ]
+        for i, (name, first_name, email) in enumerate(persons):
+            props = {
+                "PersonNummer": f"p{i}",
+                "Name": name,
+                "Vorname": first_name,
+                "email": email,
+            }
+            node_id = self.graph.add_labeled_node(
+                "Person", name=f"Person-{i}", properties=props
+            )
+            self.index.add_node("Person", node_id, props)
+        props = {"KontaktNummer": "k1", "Thema": "Angebot Meier", "Kommentar": None}
+        node_id = self.graph.add_labeled_node(
+            "Contact", name="Contact-0", properties=props
+        )
+        self.index.add_node("Contact", node_id, props)
+
+    def names(self, result):
+        return [self.graph.nodes[hit.node_id]["Name"] for hit in result.hits]
+
+    def test_exact_and_prefix(self):
+        """
+        test that exact matches rank before prefix matches
+        """
+        result = self.index.search("fahl")
+        self.assertEqual(2, result.total)
+        self.assertEqual(["Fahl", "Fahlmann"], self.names(result))
+
+    def test_multiple_terms_and_type(self):
+        """
+        test that all terms must match and the type restriction
+        """
+        self.assertEqual(2, self.index.search("meier").total)
+        result = self.index.search("meier", node_type="Person")
+        self.assertEqual(["Meier"], self.names(result))
+        self.assertEqual(1, self.index.search("anna example").total)
+        self.assertEqual(0, self.index.search("anna bitplan").total)
+
+    def test_fuzzy(self):
+        """
+        test trigram matching of a misspelled term
+        """
+        result = self.index.search("wolfgan")
+        self.assertEqual(["Fahl"], self.names(result))
+        result = self.index.search("bitplam")
+        self.assertEqual(["Fahl"], self.names(result))
+
+    def test_reindex_and_rebuild(self):
+        """
+        test that a changed node is reindexed and rebuild gives the same results
+        """
+        node_id = self.index.search("anna").hits[0].node_id
+        props = dict(self.graph.nodes[node_id])
+        props["Name"] = "Schulz"
+        props["email"] = "anna.schulz@example.com"
+        self.graph.nodes[node_id].update(props)
+        self.index.add_node("Person", node_id, props)
+        self.assertEqual(1, self.index.search("meier").total)
+        self.assertEqual(1, self.index.search("schulz").total)
+        rebuilt = SearchIndex()
+        rebuilt.rebuild(self.graph)
+        self.assertEqual(1, rebuilt.search("schulz").total)
+        self.assertEqual(2, rebuilt.search("fahl").total)
+
+    def test_large_index(self):
+        """
+        test queries on a larger index - the query times are measured
+        by the search stage of crm.benchmark.crm_benchmark
+        """
+        index = SearchIndex()
+        count = 20000
+        for i in range(count):
+            props = {
+                "PersonNummer": f"p{i}",
+                "Name": f"name{i % 5000}",
+                "Vorname": f"first{i % 300}",
+                "email": f"user{i}@example.com",
+            }
+            index.add_node("Person", i, props)
+        index.flush()
+        # broad queries hit every node
+        queries = [
+            "name42",
+            "first1 name4",
+            "user19999",
+            "nam42",
+            "name",
+            "example com",
+        ]
+        for query in queries:
+            result = index.search(query)
+            if self.debug:
+                print(f"{query}: {result.total} hits")
+            self.assertGreater(result.total, 0, query)
+        self.assertEqual(count, index.search("example com").total)
+        # nodes added to a large index are found after the flush
+        index.add_node("Person", count, {"Name": "Zebra"})
+        index.flush()
+        self.assertEqual([count], [hit.node_id for hit in index.search("zebra").hits])
@@ -0,0 +1,131 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import os
+from datetime import datetime
+
+from mogwai.core.mogwaigraph import MogwaiGraph
+
+from crm.crm_sync import IncrementalSync
+from crm.graph_loader import GraphLoader
+from crm.smartcrm_adapter import SmartCRMAdapter
+from crm.sqlite_mirror import SQLiteMirror
+from tests.fixtures import SyntheticDBTestCase
+
+
+class TestSQLiteMirror(SyntheticDBTestCase):
+    """
+    test mirroring the SmartCRM tables to a local SQLite file
+    """
+
+    # the synthetic SmartCRM database stands in for MySQL
+    blob_size = 50
+
+    def setUp(self, debug=False, profile=True):
+        SyntheticDBTestCase.setUp(self, debug=debug, profile=profile)
+        self.source = self.db
+        self.mirror_path = os.path.join(self.tmp_dir.name, "mirror.db")
+        self.mirror = SQLiteMirror(
+            self.mirror_path, source_factory=lambda: self.source, batch_size=7
+        )
+
+    def test_full_copy(self):
+        """
+        test the initial bulk copy including the lazy columns and the indexes
+        """
+        counts = self.mirror.refresh()
+        db = self.mirror.open()
+        try:
+            for topic in self.topics.values():
+                expected = self.generator.count(topic)
+                self.assertEqual(expected, counts[topic.name])
+                adapter = SmartCRMAdapter(topic=topic)
+                self.assertEqual(
+                    adapter.from_db(self.source, lazy=True),
+                    adapter.from_db(db, lazy=True),
+                )
+            indexes = {
+                row["name"]
+                for row in db.execute_query(
+                    "SELECT name FROM sqlite_master WHERE type = %s", ("index",)
+                )
+            }
+            self.assertIn("idx_kontakt_meinePerson_PersonNummer", indexes)
+            self.assertIn("idx_rechnung_Auftraggeber_OrganisationNummer", indexes)
+            self.assertIn("idx_person_lastModified", indexes)
+        finally:
+            db.close()
+
+    def test_incremental_refresh(self):
+        """
+        test that a refresh only copies the rows modified since the mirror watermark
+        """
+        self.mirror.refresh()
+        modified = datetime(2027, 1, 1)
+        self.source.execute_query(
+            "UPDATE person SET Name = %s, lastModified = %s WHERE PersonNummer = %s",
+            ("Neumann", modified, "3"),
+        )
+        counts = self.mirror.refresh()
+        # the rows at the previous watermark are copied again
+        self.assertIn(counts["Person"], (1, 2))
+        self.assertLessEqual(counts["Contact"], 1)
+        db = self.mirror.open()
+        try:
+            person = SmartCRMAdapter(topic=self.topics["Person"]).by_key(db, "3")
+            self.assertEqual("Neumann", person["Name"])
+            self.assertEqual(modified, person["lastModified"])
+        finally:
+            db.close()
+
+    def test_source_down(self):
+        """
+        test that the mirror keeps serving reads while the source is unreachable
+        """
+        self.mirror.refresh()
+
+        def unreachable():
+            raise ConnectionError("SmartCRM is down")
+
+        mirror = SQLiteMirror(self.mirror_path, source_factory=unreachable)
+        with self.assertRaises(ConnectionError):
+            mirror.refresh()
+        db = mirror.open()
+        try:
+            persons = SmartCRMAdapter(topic=self.topics["Person"]).from_db(db)
+            self.assertEqual(self.generator.count(self.topics["Person"]), len(persons))
+        finally:
+            db.close()
+
+    def test_deleted_rows(self):
+        """
+        test that the periodic full refresh of a sync drops the deleted rows
+        """
+        self.mirror.refresh()
+        self.source.execute_query("DELETE FROM person WHERE PersonNummer = %s", ("3",))
+        db = self.mirror.open()
+        try:
+            loader = GraphLoader(MogwaiGraph(), db=db)
+            loader.load_topics([self.topics["Person"]])
+            sync = IncrementalSync(
+                loader=loader,
+                mirror=self.mirror,
+                mirror_full_every=2,
+            )
+            person = SmartCRMAdapter(topic=self.topics["Person"])
+            sync.sync()
+            self.assertIsNotNone(person.by_key(db, "3"))
+            self.assertIsNotNone(loader.key_index.lookup("Person", "3"))
+            sync.sync()
+            self.assertIsNone(person.by_key(db, "3"))
+            # the deleted row also leaves the graph
+            self.assertIsNone(loader.key_index.lookup("Person", "3"))
+            self.assertEqual(
+                self.generator.count(self.topics["Person"]) - 1,
+                len(person.from_db(db)),
+            )
+        finally:
+            db.close()
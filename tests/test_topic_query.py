@@ -0,0 +1,142 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+from datetime import datetime
+
+from crm.smartcrm_adapter import SmartCRMAdapter
+from crm.topic_query import FieldFilter, TopicQuery
+from tests.fixtures import SyntheticDBTestCase
+
+
+class TestTopicQuery(SyntheticDBTestCase):
+    """
+    test pushing the filters, the sort order and the pagination into SQL
+    """
+
+    scale = 40
+    blob_size = 10
+
+    def test_build(self):
+        """
+        test the translation of the dataclass fields to parameterized SQL
+        """
+        adapter = SmartCRMAdapter(topic=self.topics["Invoice"])
+        topic_query = TopicQuery(
+            filters=[
+                FieldFilter("year_assignment", value="2024"),
+                FieldFilter("division", "in", ["a", "b"]),
+            ],
+            sort_by="invoice_date",
+            descending=True,
+            limit=10,
+            after=(datetime(2026, 1, 1), "17"),
+        )
+        sql, params = adapter.query_builder(self.db).build(topic_query)
+        self.assertNotIn("document", sql)
+        self.assertIn("zuordnungJahr = %s AND zuordnungSparte IN (%s, %s)", sql)
+        self.assertTrue(
+            sql.endswith("ORDER BY rechnungsdatum DESC, rechnungsID DESC LIMIT %s")
+        )
+        self.assertEqual(sql.count("%s"), len(params))
+        self.assertEqual("2024", params[0])
+        for field_filter in [
+            FieldFilter("rechnungsID; DROP TABLE rechnung", value=1),
+            FieldFilter("year_assignment", "; DROP", 1),
+        ]:
+            with self.assertRaises(ValueError):
+                adapter.query_builder(self.db).build(TopicQuery(filters=[field_filter]))
+
+    def test_filters(self):
+        """
+        test that the database returns the same records as filtering in python
+        """
+        topic = self.topics["Invoice"]
+        adapter = SmartCRMAdapter(topic=topic)
+        invoices = self.generator.generate(topic)
+        start, end = datetime(2025, 1, 1), datetime(2026, 1, 1)
+        topic_query = TopicQuery(
+            filters=[
+                FieldFilter("year_assignment", value="2024"),
+                FieldFilter("invoice_date", ">=", start),
+                FieldFilter("invoice_date", "<", end),
+            ],
+            limit=1000,
+        )
+        expected = {
+            invoice["rechnungsID"]
+            for invoice in invoices
+            if invoice["zuordnungJahr"] == "2024"
+            and start <= invoice["rechnungsdatum"] < end
+        }
+        page = adapter.query(self.db, topic_query)
+        self.assertEqual(expected, {row["rechnungsID"] for row in page.rows})
+        self.assertEqual(len(expected), adapter.count(self.db, topic_query))
+        self.assertIsNone(page.after)
+
+        contacts = SmartCRMAdapter(topic=self.topics["Contact"])
+        topic_query = TopicQuery(
+            filters=[FieldFilter("responsible", value="wf")], limit=1000
+        )
+        rows = contacts.query(self.db, topic_query).rows
+        self.assertTrue(rows)
+        self.assertTrue(all(row["Verantwortlicher"] == "wf" for row in rows))
+
+    def test_keyset_pagination(self):
+        """
+        test that paging with the after cursor visits all records once in order
+        - including the records without a sort value
+        """
+        topic = self.topics["Invoice"]
+        adapter = SmartCRMAdapter(topic=topic)
+        self.db.execute_query(
+            "UPDATE rechnung SET rechnungsdatum = NULL WHERE rechnungsID IN (%s, %s, %s)",
+            ("3", "5", "8"),
+        )
+        total = adapter.count(self.db, TopicQuery())
+        for descending in (False, True):
+            expected = [
+                row["rechnungsID"]
+                for row in self.db.execute_query(
+                    "SELECT rechnungsID FROM rechnung ORDER BY rechnungsdatum"
+                    + (" DESC, rechnungsID DESC" if descending else ", rechnungsID")
+                )
+            ]
+            topic_query = TopicQuery(
+                sort_by="invoice_date", descending=descending, limit=7
+            )
+            keys = []
+            while True:
+                page = adapter.query(self.db, topic_query)
+                keys.extend(row["rechnungsID"] for row in page.rows)
+                if page.after is None:
+                    break
+                topic_query.after = page.after
+            self.assertEqual(total, len(keys))
+            self.assertEqual(expected, keys)
+            # an offset after the first page's cursor skips whole pages
+            topic_query = TopicQuery(
+                sort_by="invoice_date", descending=descending, limit=7
+            )
+            topic_query.after = adapter.query(self.db, topic_query).after
+            topic_query.offset = 14
+            page = adapter.query(self.db, topic_query)
+            self.assertEqual(expected[21:28], [row["rechnungsID"] for row in page.rows])
+
+    def test_from_dict(self):
+        """
+        test the JSON form of a query with a bounded limit and a text filter
+        """
+        topic_query = TopicQuery.from_dict({"limit": "500", "text": "50%_"})
+        self.assertEqual(TopicQuery.MAX_LIMIT, topic_query.limit)
+        self.assertEqual(25, TopicQuery.from_dict({}).limit)
+        for limit in ["many", None, [1]]:
+            with self.assertRaises((TypeError, ValueError)):
+                TopicQuery.from_dict({"limit": limit})
+        adapter = SmartCRMAdapter(topic=self.topics["Person"])
+        sql, params = adapter.query_builder(self.db).build(topic_query)
+        self.assertIn("LOWER(Name) LIKE %s ESCAPE '!'", sql)
+        self.assertEqual("%50!%!_%", params[0])
+        self.assertEqual([], self.db.execute_query(sql, params))
@@ -0,0 +1,135 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import math
+import sqlite3
+from dataclasses import replace
+from datetime import datetime
+
+from crm.db import DB
+from crm.smartcrm_adapter import SmartCRMAdapter
+from tests.fixtures import SyntheticDBTestCase
+
+
+class TestWriteBack(SyntheticDBTestCase):
+    """
+    test writing edited entities back to the database in batched upserts
+    """
+
+    scale = 200
+    blob_size = 20
+
+    def load(self, topic_name: str):
+        topic = self.topics[topic_name]
+        adapter = SmartCRMAdapter(topic=topic)
+        return adapter, adapter.from_db(
+            self.db, converter=topic.dataclass.from_smartcrm_batch
+        )
+
+    def test_upsert_query(self):
+        """
+        test the MySQL and SQLite upsert statements
+        """
+        columns = ["KontaktNummer", "Verantwortlicher"]
+        mysql = DB.upsert_query(None, "kontakt", columns, "KontaktNummer")
+        self.assertEqual(
+            "INSERT INTO kontakt (KontaktNummer, Verantwortlicher) VALUES (%s, %s)"
+            " ON DUPLICATE KEY UPDATE Verantwortlicher=VALUES(Verantwortlicher)",
+            mysql,
+        )
+        sqlite = self.db.upsert_query("kontakt", columns, "KontaktNummer")
+        self.assertIn(
+            "ON CONFLICT(KontaktNummer) DO UPDATE SET Verantwortlicher=excluded.Verantwortlicher",
+            sqlite,
+        )
+        adapter = SmartCRMAdapter(topic=self.topics["Contact"])
+        self.assertEqual(
+            "UPDATE kontakt SET Verantwortlicher=%s, lastmodified=%s"
+            " WHERE KontaktNummer IN (%s, %s)",
+            adapter.update_query(["Verantwortlicher", "lastmodified"], 2),
+        )
+
+    def test_bulk_reassign(self):
+        """
+        test reassigning all contacts to a new responsible in batched transactions
+        """
+        adapter, contacts = self.load("Contact")
+        self.assertEqual(self.generator.count(self.topics["Contact"]), len(contacts))
+        for contact in contacts:
+            contact.responsible = "neu"
+        start_time = datetime.now().replace(microsecond=0)
+        statements = []
+        with self.db.checkout() as connection:
+            connection.set_trace_callback(statements.append)
+        count = adapter.write_db(
+            self.db, contacts, field_names=["responsible"], transaction_size=100
+        )
+        with self.db.checkout() as connection:
+            connection.set_trace_callback(None)
+        # a single UPDATE per transaction - not one per contact
+        updates = [sql for sql in statements if sql.startswith("UPDATE")]
+        self.assertEqual(math.ceil(len(contacts) / 100), len(updates))
+        self.assertEqual(len(contacts), count)
+        rows = self.db.execute_query(
+            "SELECT Verantwortlicher, COUNT(*) AS count FROM kontakt GROUP BY Verantwortlicher"
+        )
+        self.assertEqual([{"Verantwortlicher": "neu", "count": len(contacts)}], rows)
+        # the change is stamped so that the sync picks it up
+        rows = self.db.execute_query("SELECT MIN(lastmodified) AS oldest FROM kontakt")
+        self.assertGreaterEqual(datetime.fromisoformat(rows[0]["oldest"]), start_time)
+        # a subset of the fields is not inserted for an unknown key
+        new_contact = replace(contacts[0], contact_number="new")
+        count = adapter.write_db(self.db, [new_contact], field_names=["responsible"])
+        self.assertEqual(0, count)
+        self.assertIsNone(adapter.by_key(self.db, "new"))
+
+    def test_round_trip(self):
+        """
+        test that the written fields read back unchanged and that
+        the lazy columns are kept
+        """
+        adapter, persons = self.load("Person")
+        edited = [
+            replace(person, personal=not person.personal, name="Neu")
+            for person in persons[:10]
+        ]
+        start_time = datetime.now().replace(microsecond=0)
+        adapter.write_db(self.db, edited)
+        _adapter, reloaded = self.load("Person")
+        for person in reloaded[:10]:
+            self.assertGreaterEqual(person.last_modified, start_time)
+        self.assertEqual(
+            edited,
+            [
+                replace(person, last_modified=original.last_modified)
+                for person, original in zip(reloaded[:10], edited)
+            ],
+        )
+        self.assertEqual(persons[10:], reloaded[10:])
+
+        adapter, invoices = self.load("Invoice")
+        documents = self.db.execute_query("SELECT document FROM rechnung")
+        new_invoice = replace(invoices[0], invoice_id="new", comment="neu")
+        adapter.write_db(self.db, invoices[:5] + [new_invoice], transaction_size=2)
+        self.assertEqual(
+            documents, self.db.execute_query("SELECT document FROM rechnung")[:-1]
+        )
+        self.assertEqual("neu", adapter.by_key(self.db, "new")["bemerkung"])
+        with self.assertRaises(ValueError):
+            adapter.write_db(self.db, invoices, field_names=["unknown"])
+
+    def test_rollback(self):
+        """
+        test that a failing transaction is rolled back while the earlier ones stay committed
+        """
+        self.db.execute_query("CREATE TABLE tag (name TEXT UNIQUE)")
+        names = [("a",), ("b",), ("c",), ("c",)]
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.execute_many(
+                "INSERT INTO tag (name) VALUES (%s)", names, transaction_size=2
+            )
+        rows = self.db.execute_query("SELECT name FROM tag ORDER BY name")
+        self.assertEqual([{"name": "a"}, {"name": "b"}], rows)
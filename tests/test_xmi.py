@@ -9,6 +9,7 @@ from pathlib import Path
 from ngwidgets.basetest import Basetest
 
 from crm.xmi import Model
+from crm.xmi_serializer import ModelSerializer
 
 
 class TestXMI(Basetest):
@@ -43,7 +44,7 @@ class TestXMI(Basetest):
                         f"{model_id}:{element.__class__.__name__}:{element.short_name}"
                     )
         plant_uml = model.to_plant_uml()
-        xmi_json = model.to_json(indent=2)
+        xmi_json = ModelSerializer().dumps(model, indent=2)
         for file_path, text in [
             ("/tmp/smartcrm.puml", plant_uml),
             ("/tmp/smartcrm_xmi.json", xmi_json),
@@ -0,0 +1,64 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import os
+import time
+
+from crm.xmi import Class, Model, Role
+from crm.xmi_cache import XmiModelCache
+from tests.fixtures import XmiSample, XmiTestCase
+
+
+class TestXmiCache(XmiTestCase):
+    """
+    test the binary cache of parsed XMI models
+    """
+
+    def setUp(self, debug=False, profile=True):
+        XmiTestCase.setUp(self, debug=debug, profile=profile)
+        self.json_path = XmiSample.write(os.path.join(self.tmp_dir.name, "model.json"))
+        self.cache = XmiModelCache(cache_dir=os.path.join(self.tmp_dir.name, "cache"))
+
+    def test_cached_model(self):
+        """
+        test that the cached model equals the parsed one including parents and lookup
+        """
+        parsed = Model.from_xmi_json(self.json_path)
+        self.assertEqual(
+            parsed.to_plant_uml(), self.cache.load(self.json_path).to_plant_uml()
+        )
+        model = self.cache.load(self.json_path)
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+        self.assertEqual(set(parsed.lookup), set(model.lookup))
+        person = model.lookup["Person"]
+        self.assertIsInstance(person, Class)
+        self.assertIs(person, model.lookup["Person.PersonNummer"].parent)
+        role = model.lookup["Organisation.persons"]
+        self.assertIsInstance(role, Role)
+        self.assertIs(model.lookup["Organisation"], role.parent)
+        self.assertEqual(parsed.to_plant_uml(), model.to_plant_uml())
+
+    def test_invalidation(self):
+        """
+        test that a changed source is parsed again while a touched one is not
+        """
+        self.cache.load(self.json_path)
+        # same content with a new mtime
+        later = time.time() + 10
+        os.utime(self.json_path, (later, later))
+        self.cache.load(self.json_path)
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+        data = XmiSample.data()
+        data["Package"]["Documentation"] = "changed"
+        XmiSample.write(self.json_path, data)
+        model = self.cache.load(self.json_path)
+        self.assertEqual("changed", model.documentation)
+        self.assertEqual((1, 2), (self.cache.hits, self.cache.misses))
+        # a corrupt cache file is replaced
+        with open(self.cache.cache_path(self.json_path), "wb") as cache_file:
+            cache_file.write(b"garbage")
+        self.assertEqual("changed", self.cache.load(self.json_path).documentation)
+        self.assertEqual(3, self.cache.misses)
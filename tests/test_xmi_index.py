@@ -0,0 +1,80 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import os
+
+from crm.xmi import Attribute, Class, Model
+from tests.fixtures import XmiSample, XmiTestCase
+
+
+class TestXmiIndex(XmiTestCase):
+    """
+    test the secondary indexes of XMI models
+    """
+
+    def setUp(self, debug=False, profile=True):
+        XmiTestCase.setUp(self, debug=debug, profile=profile)
+        data = XmiSample.data(util_class_count=3)
+        # a role to a class which is not part of the model
+        organisation = data["Package"]["packages"]["Package"][0]["classes"]["Class"][0]
+        organisation["roles"]["Role"] = [
+            organisation["roles"]["Role"],
+            {
+                "@name": "Logical View::smartCRM::Organisation::owner",
+                "@id": "Organisation.owner",
+                "@type": "Logical View::external::Owner",
+            },
+        ]
+        json_path = XmiSample.write(os.path.join(self.tmp_dir.name, "model.json"), data)
+        self.model = Model.from_xmi_json(json_path)
+
+    def test_indexes(self):
+        """
+        test finding elements by short name, stereotype and type
+        """
+        model = self.model
+        person = model.lookup["Person"]
+        self.assertEqual([person], model.find_by_short_name("Person"))
+        ids = model.find_by_short_name("id")
+        self.assertEqual(3, len(ids))
+        self.assertTrue(all(isinstance(element, Attribute) for element in ids))
+        self.assertEqual([], model.find_by_short_name("id", Class))
+        self.assertEqual(
+            [model.lookup["Organisation"]], model.find_by_stereotype("entity")
+        )
+        self.assertEqual(ids, model.find_by_type("int"))
+        self.assertEqual(
+            [model.lookup["Organisation.persons"]], model.find_by_type("Person")
+        )
+        self.assertEqual([], model.find_by_type("unknown"))
+
+    def test_find_class(self):
+        """
+        test resolving classes by id, qualified name and short name
+        """
+        model = self.model
+        util2 = model.lookup["Util2"]
+        self.assertIs(util2, model.find_class("Util2"))
+        self.assertIs(util2, model.find_class("Logical View::util::Util2"))
+        self.assertIs(util2, model.find_class("Other View::Util2"))
+        self.assertIsNone(model.find_class("Person.PersonNummer"))
+        self.assertIsNone(model.find_class(None))
+
+    def test_roles(self):
+        """
+        test the incoming and outgoing roles of the classes
+        """
+        model = self.model
+        organisation = model.lookup["Organisation"]
+        person = model.lookup["Person"]
+        persons = model.lookup["Organisation.persons"]
+        owner = model.lookup["Organisation.owner"]
+        self.assertIs(person, model.target_class(persons))
+        self.assertIsNone(model.target_class(owner))
+        self.assertEqual([persons, owner], model.outgoing_roles(organisation))
+        self.assertEqual([persons], model.incoming_roles(person))
+        self.assertEqual([], model.incoming_roles(organisation))
+        self.assertEqual([], model.outgoing_roles(person))
@@ -0,0 +1,109 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import io
+import os
+
+from crm.xmi import Model
+from tests.fixtures import XmiSample, XmiTestCase
+
+
+class TestXmiPlantUml(XmiTestCase):
+    """
+    test the streaming PlantUML rendering of XMI models
+    """
+
+    def test_write_plant_uml(self):
+        """
+        test that the streamed diagram is the same as the string one
+        """
+        model = self.get_model()
+        stream = io.StringIO()
+        model.write_plant_uml(stream)
+        plant_uml = model.to_plant_uml()
+        self.assertEqual(plant_uml, stream.getvalue())
+        self.assertTrue(plant_uml.startswith("@startuml\n"))
+        self.assertTrue(plant_uml.endswith("@enduml"))
+        self.assertIn(' Organisation "0" -- "*" Person : persons\n', plant_uml)
+
+    def test_package_diagrams(self):
+        """
+        test saving a diagram per package sequentially and in parallel
+        """
+        model = self.get_model(util_class_count=3)
+        contents = []
+        for parallel in (False, True):
+            output_dir = os.path.join(self.tmp_dir.name, f"parallel_{parallel}")
+            file_paths = model.save_plant_uml_packages(output_dir, parallel=parallel)
+            self.assertEqual(
+                ["Logical View::smartCRM", "Logical View::util"], list(file_paths)
+            )
+            self.assertEqual(
+                "Logical_View.smartCRM.puml",
+                os.path.basename(file_paths["Logical View::smartCRM"]),
+            )
+            texts = {}
+            for name, file_path in file_paths.items():
+                with open(file_path) as puml_file:
+                    texts[name] = puml_file.read()
+            contents.append(texts)
+        self.assertEqual(contents[0], contents[1])
+        crm = contents[0]["Logical View::smartCRM"]
+        util = contents[0]["Logical View::util"]
+        self.assertIn("class Person {", crm)
+        self.assertIn('Organisation "0" -- "*" Person : persons', crm)
+        self.assertNotIn("class Util", crm)
+        self.assertIn("class Util2 {", util)
+        self.assertNotIn("persons", util)
+
+    def test_large_model(self):
+        """
+        test that the streamed diagram of a large model is the same as the
+        string one - the rendering time is measured by the xmi stage of
+        crm.benchmark.crm_benchmark
+        """
+        model = self.get_model(util_class_count=1000)
+        file_path = os.path.join(self.tmp_dir.name, "model_1000.puml")
+        model.save_plant_uml(file_path)
+        with open(file_path) as puml_file:
+            self.assertEqual(model.to_plant_uml(), puml_file.read())
+
+    def test_same_named_packages(self):
+        """
+        test that the diagrams of same named packages in different parent
+        packages do not overwrite each other
+        """
+        data = XmiSample.data()
+        crm_package = data["Package"]["packages"]["Package"][0]
+        crm_package["packages"] = {
+            "Package": {
+                "@name": "util",
+                "@id": "smartCRM.util",
+                "Documentation": None,
+                "classes": {
+                    "Class": {
+                        "@name": "Logical View::smartCRM::util::Address",
+                        "@id": "Address",
+                        "Documentation": "a postal address",
+                    }
+                },
+            }
+        }
+        json_path = XmiSample.write(os.path.join(self.tmp_dir.name, "model.json"), data)
+        model = Model.from_xmi_json(json_path)
+        output_dir = os.path.join(self.tmp_dir.name, "packages")
+        file_paths = model.save_plant_uml_packages(output_dir)
+        self.assertEqual(
+            "Logical_View.smartCRM.util.puml",
+            os.path.basename(file_paths["Logical View::smartCRM::util"]),
+        )
+        self.assertEqual(
+            "Logical_View.util.puml",
+            os.path.basename(file_paths["Logical View::util"]),
+        )
+        self.assertEqual(len(file_paths), len(set(file_paths.values())))
+        with open(file_paths["Logical View::smartCRM::util"]) as puml_file:
+            self.assertIn("class Address", puml_file.read())
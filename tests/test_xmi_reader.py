@@ -0,0 +1,73 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import os
+import time
+
+from crm.xmi import Model
+from crm.xmi_reader import XmiXmlReader
+from tests.fixtures import XmiSample, XmiTestCase
+
+
+class TestXmiReader(XmiTestCase):
+    """
+    test reading XMI files directly
+    """
+
+    def read_both(self, data: dict):
+        json_path = XmiSample.write(os.path.join(self.tmp_dir.name, "model.json"), data)
+        xml_path = XmiSample.write_xml(
+            os.path.join(self.tmp_dir.name, "model.xmi"), data
+        )
+        start = time.time()
+        json_model = Model.from_xmi(json_path)
+        json_secs = time.time() - start
+        start = time.time()
+        xml_model = Model.from_xmi(xml_path)
+        xml_secs = time.time() - start
+        if self.debug:
+            print(
+                f"{len(xml_model.lookup)} elements json: {json_secs:.3f}s xml: {xml_secs:.3f}s"
+            )
+        return json_model, xml_model
+
+    def test_same_model(self):
+        """
+        test that the XMI file is read into the same model as its JSON conversion
+        """
+        json_model, xml_model = self.read_both(XmiSample.data())
+        self.assertIsInstance(xml_model, Model)
+        self.assertEqual(json_model.to_dict(), xml_model.to_dict())
+        self.assertEqual(list(json_model.lookup), list(xml_model.lookup))
+        self.assertEqual(json_model.to_plant_uml(), xml_model.to_plant_uml())
+        for element_id, element in xml_model.lookup.items():
+            json_parent = json_model.lookup[element_id].parent
+            if json_parent is None:
+                self.assertIsNone(element.parent)
+            else:
+                self.assertEqual(json_parent.id, element.parent.id)
+        util = xml_model.packages_by_name["Logical View::util"]
+        self.assertIs(util, xml_model.packages["util"])
+        self.assertEqual("true", xml_model.lookup["Util"].is_abstract)
+        self.assertIn("generated", xml_model.lookup["Util"].tagged_values)
+
+    def test_large_model(self):
+        """
+        test a model with many classes
+        """
+        json_model, xml_model = self.read_both(XmiSample.data(util_class_count=2000))
+        self.assertEqual(json_model.to_dict(), xml_model.to_dict())
+        self.assertEqual(2000, len(xml_model.packages["util"].classes))
+
+    def test_invalid(self):
+        """
+        test that an XML file which is not an XMI model is rejected
+        """
+        xml_path = os.path.join(self.tmp_dir.name, "invalid.xml")
+        with open(xml_path, "w") as xml_file:
+            xml_file.write("<Model><Package/></Model>")
+        with self.assertRaises(ValueError):
+            XmiXmlReader(xml_path).read()
@@ -0,0 +1,75 @@
+"""
+Created on 2026-10-18
+
+@author: wf
+"""
+
+import os
+
+from crm.xmi import Model
+from crm.xmi_serializer import ModelSerializer
+from tests.fixtures import XmiTestCase
+
+
+class TestXmiSerializer(XmiTestCase):
+    """
+    test the compact JSON serialization of XMI models
+    """
+
+    def setUp(self, debug=False, profile=True):
+        XmiTestCase.setUp(self, debug=debug, profile=profile)
+        self.serializer = ModelSerializer()
+
+    def test_round_trip(self):
+        """
+        test that a loaded model equals the saved one including
+        parents, lookup and indexes
+        """
+        model = self.get_model(util_class_count=2)
+        file_path = self.serializer.save(
+            model, os.path.join(self.tmp_dir.name, "model.xmi.json")
+        )
+        loaded = self.serializer.load(file_path)
+        self.assertIsInstance(loaded, Model)
+        self.assertEqual(model.to_dict(), loaded.to_dict())
+        self.assertEqual(model.to_plant_uml(), loaded.to_plant_uml())
+        self.assertEqual(list(model.lookup), list(loaded.lookup))
+        for element_id, element in loaded.lookup.items():
+            self.assertEqual(type(model.lookup[element_id]), type(element))
+            original_parent = model.lookup[element_id].parent
+            if original_parent is None:
+                self.assertIsNone(element.parent)
+            else:
+                self.assertIs(loaded.lookup[original_parent.id], element.parent)
+        util = loaded.packages["util"]
+        self.assertIs(util, loaded.packages_by_name["Logical View::util"])
+        self.assertIn("table", loaded.lookup["Organisation"].tagged_values)
+        self.assertIs(
+            loaded.lookup["Person"],
+            loaded.target_class(loaded.lookup["Organisation.persons"]),
+        )
+        # pretty printed JSON loads the same
+        pretty = self.serializer.dumps(model, indent=2)
+        self.assertEqual(model.to_dict(), self.serializer.loads(pretty).to_dict())
+
+    def test_incompatible(self):
+        """
+        test that data of another version or with other fields is rejected
+        """
+        data = self.serializer.to_dict(self.get_model())
+        for key, value in [("version", 0), ("format", "other")]:
+            with self.assertRaises(ValueError):
+                self.serializer.from_dict({**data, key: value})
+        fields = {**data["fields"], "Role": ["name"]}
+        with self.assertRaises(ValueError):
+            self.serializer.from_dict({**data, "fields": fields})
+
+    def test_large_model(self):
+        """
+        test the round trip of a larger model - the speed compared to
+        dataclasses_json is measured by the xmi stage of crm.benchmark.crm_benchmark
+        """
+        model = self.get_model(util_class_count=2000)
+        loaded = self.serializer.loads(self.serializer.dumps(model))
+        self.assertEqual(model.to_plant_uml(), loaded.to_plant_uml())
+        self.assertEqual(model.lookup.keys(), loaded.lookup.keys())